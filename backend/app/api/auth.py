@@ -0,0 +1,29 @@
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException
+from app.config import settings
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def verify_admin_token(token: Optional[str]) -> bool:
+    """Constant-time check of a presented token against ADMIN_TOKEN"""
+    if not settings.admin_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
+
+
+async def require_admin(
+    x_admin_token: Optional[str] = Header(None, alias=ADMIN_TOKEN_HEADER),
+) -> None:
+    """
+    Dependency guarding admin-only endpoints
+
+    Raises:
+        HTTPException: 404 when no ADMIN_TOKEN is configured (the surface
+            does not exist), 403 when the token is missing or wrong
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not verify_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
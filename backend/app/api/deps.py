@@ -0,0 +1,14 @@
+from typing import Optional
+from fastapi import Request
+from app.services.post_store import PostStore
+
+
+def get_post_store(request: Request) -> Optional[PostStore]:
+    """
+    Dependency returning the post store opened by the app's lifespan
+
+    Returns:
+        The PostStore, or None when SQLITE_PATH is unset or the app was not
+        started through its lifespan
+    """
+    return getattr(request.app.state, "post_store", None)
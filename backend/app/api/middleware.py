@@ -0,0 +1,92 @@
+import json
+from urllib.parse import parse_qs
+
+from app.api.auth import ADMIN_TOKEN_HEADER, verify_admin_token
+from app.config import settings
+from app.utils.logger import logger
+from app.utils.profiling import (
+    PROFILE_FORMATS,
+    RequestSampler,
+    to_collapsed,
+    to_speedscope,
+)
+
+
+async def _send_body(send, status: int, body: bytes, content_type: str, extra=()):
+    headers = [
+        (b"content-type", content_type.encode()),
+        (b"content-length", str(len(body)).encode()),
+        *extra,
+    ]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class ProfilingMiddleware:
+    """
+    Profile a single request with `?profile=true` and a valid admin token
+
+    The request runs normally while its tasks on the event loop and the
+    worker threads it starts are sampled (see RequestSampler); the profile
+    replaces the response body (the original status is reported
+    in X-Profiled-Status). `profile_format` picks speedscope (default) or
+    collapsed stacks. Without ADMIN_TOKEN configured the parameter is
+    ignored.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.admin_token
+            or b"profile=" not in scope.get("query_string", b"")
+        ):
+            return await self.app(scope, receive, send)
+
+        params = parse_qs(scope["query_string"].decode())
+        if params.get("profile", [""])[0].lower() != "true":
+            return await self.app(scope, receive, send)
+
+        headers = {k.decode().lower(): v.decode() for k, v in scope["headers"]}
+        if not verify_admin_token(headers.get(ADMIN_TOKEN_HEADER.lower())):
+            body = json.dumps({"detail": "Invalid admin token"}).encode()
+            return await _send_body(send, 403, body, "application/json")
+
+        profile_format = params.get("profile_format", ["speedscope"])[0]
+        if profile_format not in PROFILE_FORMATS:
+            body = json.dumps(
+                {
+                    "detail": f"profile_format must be one of {', '.join(PROFILE_FORMATS)}"
+                }
+            ).encode()
+            return await _send_body(send, 400, body, "application/json")
+
+        status = {"code": 500}
+
+        async def capture(message):
+            # Swallow the real response, keep its status
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        sampler = RequestSampler().start()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            sampler.stop()
+
+        name = f"{scope['method']} {scope['path']}"
+        logger.info(
+            "Profiled %s: %s samples in %.3fs",
+            name,
+            sum(sampler.samples.values()),
+            sampler.duration,
+        )
+        extra = [(b"x-profiled-status", str(status["code"]).encode())]
+        if profile_format == "collapsed":
+            body = to_collapsed(sampler.samples).encode()
+            await _send_body(send, 200, body, "text/plain; charset=utf-8", extra)
+        else:
+            body = json.dumps(to_speedscope(sampler, name)).encode()
+            await _send_body(send, 200, body, "application/json", extra)
@@ -0,0 +1,73 @@
+from typing import List, Optional, Set, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+# Upper bound on IDs accepted by batch endpoints
+MAX_BATCH_IDS = 100
+
+
+def parse_id_list(
+    raw: Optional[str], name: str, extra_id: Optional[int] = None
+) -> List[int]:
+    """
+    Parse a comma-separated list of integer IDs from a query parameter
+
+    Args:
+        raw: Raw parameter value, e.g. "1,2,3"
+        name: Parameter name used in error messages
+        extra_id: ID from a single-ID parameter (e.g. user_id) to merge in,
+            counted towards the limit
+
+    Returns:
+        De-duplicated list of IDs in request order
+
+    Raises:
+        HTTPException: 400 if the value is malformed or has too many IDs
+    """
+    try:
+        ids = [int(part) for part in (raw or "").split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail=f"{name} must be a comma-separated list of integers"
+        )
+    if extra_id is not None:
+        ids.append(extra_id)
+
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"{name} accepts at most {MAX_BATCH_IDS} IDs"
+        )
+    return ids
+
+
+def parse_field_list(
+    raw: Optional[str], model: Type[BaseModel], name: str = "fields"
+) -> Optional[Set[str]]:
+    """
+    Parse a comma-separated projection of a model's fields
+
+    Args:
+        raw: Raw parameter value, e.g. "id,userId,title"
+        model: Model whose fields may be selected
+        name: Parameter name used in error messages
+
+    Returns:
+        Selected field names, or None to keep every field
+
+    Raises:
+        HTTPException: 400 if a field does not exist on the model
+    """
+    if not raw:
+        return None
+
+    fields = {part.strip() for part in raw.split(",") if part.strip()}
+    unknown = sorted(fields - set(model.model_fields))
+    if unknown or not fields:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{name} must be a comma-separated subset of "
+            f"{', '.join(model.model_fields)}",
+        )
+    return fields
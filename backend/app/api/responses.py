@@ -0,0 +1,73 @@
+from typing import Callable, Hashable, Optional, Set, Type, Union
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.services.snapshot_service import AnalyticsSnapshot, snapshot_store
+from app.utils.compression import PayloadCache, negotiate_encoding, render_json
+
+# Rendered and compressed snapshot responses, dropped on every refresh
+snapshot_payloads = PayloadCache()
+
+
+def projection(
+    collection: str, item_model: Type[BaseModel], fields: Optional[Set[str]]
+) -> Optional[dict]:
+    """
+    Build a model_dump exclude spec for a ?fields= projection
+
+    Args:
+        collection: Response field holding the projected items, e.g. "posts"
+        item_model: Model of those items
+        fields: Selected item fields, or None to keep every field
+
+    Returns:
+        Exclude spec dropping the unselected fields of every item, or None
+    """
+    if fields is None:
+        return None
+    return {collection: {"__all__": set(item_model.model_fields) - fields}}
+
+
+def json_response(
+    model: BaseModel, exclude: Optional[dict] = None
+) -> Union[BaseModel, Response]:
+    """Serialize a live response, leaving unprojected models to FastAPI"""
+    if exclude is None:
+        return model
+    return Response(content=render_json(model, exclude), media_type="application/json")
+
+
+def snapshot_response(
+    request: Request,
+    key: Hashable,
+    snapshot: AnalyticsSnapshot,
+    render: Callable[[], BaseModel],
+    exclude: Optional[dict] = None,
+) -> Response:
+    """
+    Serve a response derived from a snapshot, serialized and compressed once
+
+    Args:
+        request: Incoming request, for Accept-Encoding
+        key: Identifies the response within the snapshot (route and params)
+        snapshot: Snapshot the response is built from
+        render: Builds the response model on a cache miss
+        exclude: Projection applied when serializing (part of the key)
+
+    Returns:
+        JSON response in the best encoding the client accepts
+    """
+    payload = snapshot_payloads.get_or_render(key, snapshot.version, render, exclude)
+    body, encoding = payload.encoded(
+        negotiate_encoding(request.headers.get("accept-encoding"))
+    )
+
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Republishing a version (e.g. after a restart) must not serve stale bodies
+snapshot_store.add_listener(lambda previous, current: snapshot_payloads.clear())
@@ -0,0 +1,67 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.auth import require_admin
+from app.utils.logger import logger
+from app.utils.profiling import (
+    PROFILE_FORMATS,
+    StackSampler,
+    to_collapsed,
+    to_speedscope,
+)
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+MAX_PROFILE_SECONDS = 60.0
+
+# Only one process-wide profile may run at a time
+_profile_running = False
+
+
+@router.get("/profile")
+async def profile_process(
+    seconds: float = Query(5.0, gt=0, le=MAX_PROFILE_SECONDS, description="Window"),
+    profile_format: str = Query(
+        "speedscope", alias="format", description="speedscope or collapsed"
+    ),
+    interval_ms: float = Query(5.0, ge=1, le=100, description="Sampling interval"),
+):
+    """
+    Sample every thread of this process for a time window
+
+    Requires the X-Admin-Token header.
+
+    Args:
+        seconds: Length of the window to sample
+        profile_format: "speedscope" JSON or "collapsed" stacks (flamegraph.pl input)
+        interval_ms: Milliseconds between samples
+
+    Returns:
+        The profile in the requested format
+    """
+    global _profile_running
+
+    if profile_format not in PROFILE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(PROFILE_FORMATS)}",
+        )
+    if _profile_running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    _profile_running = True
+    try:
+        logger.info("Profiling process for %.1fs", seconds)
+        sampler = StackSampler(interval=interval_ms / 1000).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+    finally:
+        _profile_running = False
+
+    if profile_format == "collapsed":
+        return PlainTextResponse(to_collapsed(sampler.samples))
+    return JSONResponse(to_speedscope(sampler, "process"))
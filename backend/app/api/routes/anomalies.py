@@ -1,50 +1,291 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from app.models import AnomaliesResponse
+import asyncio
+from collections import Counter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.api.deps import get_post_store
+from app.api.params import parse_field_list, parse_id_list
+from app.api.responses import json_response, projection, snapshot_response
+from app.config import settings
+from app.models import AnomaliesResponse, Anomaly, Post, TopRiskUsersResponse
 from app.services.jsonplaceholder_service import jsonplaceholder_service
-from app.services.anomaly_detector import anomaly_detector
+from app.services.anomaly_detector import AnomalyTracker, anomaly_detector
+from app.services.anomaly_stream import anomaly_broadcaster
+from app.services.post_store import PostStore
+from app.services.risk_index import UserRiskIndex, risk_index, risk_stats
+from app.services.snapshot_service import snapshot_store
+from app.services.spill_analyzer import SpilledAnomalyTracker, analyze_batches
+from app.utils.concurrency import analysis_coalescer, analysis_limiter
+from app.utils.errors import QueryTooExpensiveError, ServiceUnavailableError
 from app.utils.logger import logger
+from app.utils.query_cost import ANOMALY_COST, query_cost_estimator
 
 router = APIRouter(prefix="/anomalies", tags=["anomalies"])
 
 
+async def _detect_anomalies(
+    limit: Optional[int],
+    user_ids: List[int],
+    include_details: bool = True,
+    store: Optional[PostStore] = None,
+) -> AnomaliesResponse:
+    if store is not None and store.ready:
+        # Indexed queries over the persisted posts; anomalies are per user,
+        # so filtering the analyzed posts by user is equivalent
+        anomalies = await asyncio.to_thread(
+            store.detect_anomalies, limit, user_ids, include_details
+        )
+    else:
+        # Analyze each batch while the rest of the feed is still downloading
+        # (always all posts, for proper duplicate detection)
+        anomalies = await analyze_batches(
+            jsonplaceholder_service.stream_posts(limit=limit),
+            AnomalyTracker(anomaly_detector, include_details),
+            lambda: SpilledAnomalyTracker(
+                anomaly_detector, include_details, settings.spill_dir
+            ),
+            lambda tracker: tracker.anomalies(),
+        )
+
+        # Filter by user IDs if specified
+        if user_ids:
+            wanted = set(user_ids)
+            anomalies = [a for a in anomalies if a.userId in wanted]
+
+    # Generate summary
+    summary = anomaly_detector.get_anomaly_summary(anomalies)
+
+    return AnomaliesResponse(anomalies=anomalies, total=len(anomalies), summary=summary)
+
+
+async def compute_anomalies(
+    limit: Optional[int],
+    user_ids: List[int],
+    include_details: bool = True,
+    store: Optional[PostStore] = None,
+) -> AnomaliesResponse:
+    """
+    Detect anomalies on demand, bounded and shared by identical requests
+
+    Args:
+        limit: Optional limit on number of posts to analyze
+        user_ids: User IDs to keep anomalies for (empty for all)
+        include_details: Whether to format anomaly details
+        store: Optional post store to query instead of upstream
+
+    Returns:
+        AnomaliesResponse without snapshot metadata
+
+    Raises:
+        ServiceUnavailableError: If the analysis queue is full
+    """
+    key = ("anomalies", limit or None, tuple(sorted(user_ids)), include_details)
+    return await analysis_coalescer.run(
+        key,
+        lambda: analysis_limiter.run(
+            lambda: _detect_anomalies(limit, user_ids, include_details, store)
+        ),
+    )
+
+
 @router.get("/", response_model=AnomaliesResponse)
 async def get_anomalies(
-    limit: Optional[int] = Query(None, description="Limit number of posts to analyze"),
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=0, description="Limit number of posts to analyze"
+    ),
     user_id: Optional[int] = Query(None, description="Filter anomalies by user ID"),
+    user_ids: Optional[str] = Query(
+        None, description="Comma-separated user IDs to filter anomalies by"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated anomaly fields to return, e.g. id,reason"
+    ),
+    store: Optional[PostStore] = Depends(get_post_store),
 ):
     """
     Detect anomalies in posts from JSONPlaceholder API
 
+    Queries whose estimated cost exceeds the route's budget are rejected
+    with 400; the estimated and actual cost are returned in X-Query-Cost-*
+    headers.
+
     Args:
         limit: Optional limit on number of posts to analyze
         user_id: Optional user ID to filter anomalies
+        user_ids: Optional comma-separated user IDs (batch variant of user_id)
+        fields: Optional comma-separated anomaly fields to return
 
     Returns:
         AnomaliesResponse with list of anomalies and summary statistics
     """
+    ids = parse_id_list(user_ids, "user_ids", extra_id=user_id)
+    selected = parse_field_list(fields, Anomaly)
+    exclude = projection("anomalies", Anomaly, selected)
+    fields_key = tuple(sorted(selected or ()))
+
     try:
-        logger.info(f"Detecting anomalies with limit: {limit}, user_id: {user_id}")
+        logger.info(
+            "Detecting anomalies with limit: %s, user_ids: %s", limit, ids or None
+        )
 
-        # Fetch posts (always fetch all for proper anomaly detection)
-        posts = await jsonplaceholder_service.get_posts(limit=limit)
+        # Serve the precomputed snapshot when analyzing the full dataset
+        snapshot = snapshot_store.current
+        if snapshot is not None and not limit:
+            query_cost_estimator.observe_dataset_size(len(snapshot.posts))
+            total = (
+                sum(len(snapshot.anomalies_by_user.get(uid, ())) for uid in ids)
+                if ids
+                else len(snapshot.anomalies)
+            )
+            cost = query_cost_estimator.plan_anomalies(0, total, analyze=False)
 
-        # Detect anomalies
-        anomalies = anomaly_detector.detect_anomalies(posts)
+            def render() -> AnomaliesResponse:
+                if ids:
+                    anomalies = [
+                        anomaly
+                        for uid in ids
+                        for anomaly in snapshot.anomalies_by_user.get(uid, ())
+                    ]
+                    summary = anomaly_detector.get_anomaly_summary(anomalies)
+                else:
+                    anomalies = list(snapshot.anomalies)
+                    summary = snapshot.anomaly_summary
 
-        # Filter by user_id if specified
-        if user_id:
-            anomalies = [a for a in anomalies if a.userId == user_id]
+                return AnomaliesResponse(
+                    anomalies=anomalies,
+                    total=len(anomalies),
+                    summary=summary,
+                    generatedAt=snapshot.generated_at,
+                    snapshotVersion=snapshot.version,
+                )
 
-        # Generate summary
-        summary = anomaly_detector.get_anomaly_summary(anomalies)
+            key = ("anomalies", tuple(ids), fields_key)
+            cost.actual = cost.estimate
+            return cost.apply(
+                snapshot_response(request, key, snapshot, render, exclude), response
+            )
 
-        return AnomaliesResponse(
-            anomalies=anomalies, total=len(anomalies), summary=summary
-        )
+        posts = query_cost_estimator.posts_to_analyze(limit)
+        cost = query_cost_estimator.plan_anomalies(posts)
 
+        # Identical concurrent requests share one bounded computation
+        include_details = selected is None or "details" in selected
+        result = await compute_anomalies(limit, ids, include_details, store)
+        # The analyzed posts are not reported back, so they count as planned
+        cost.actual = cost.estimate + result.total * ANOMALY_COST
+        return cost.apply(json_response(result, exclude), response)
+
+    except QueryTooExpensiveError as e:
+        logger.warning("Rejecting anomalies request: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting anomalies request: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
-        logger.error(f"Error detecting anomalies: {str(e)}")
+        logger.error("Error detecting anomalies: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to detect anomalies: {str(e)}"
         )
+
+
+def _risk_index_for(posts: List[Post]) -> UserRiskIndex:
+    anomalies = anomaly_detector.detect_anomalies(posts, include_details=False)
+
+    index = UserRiskIndex()
+    index.replace(risk_stats(Counter(post.userId for post in posts), anomalies))
+    return index
+
+
+async def _build_risk_index() -> UserRiskIndex:
+    posts = await jsonplaceholder_service.get_posts()
+    # Detection is CPU bound, keep it off the event loop
+    return await asyncio.to_thread(_risk_index_for, posts)
+
+
+@router.get("/top-users", response_model=TopRiskUsersResponse)
+async def get_top_risk_users(
+    request: Request,
+    k: int = Query(10, ge=1, le=100, description="Number of users to return"),
+):
+    """
+    Rank users by anomaly risk score
+
+    The score adds a user's short-title ratio, duplicate-title ratio and
+    number of bot-like title clusters. Scores are kept in an index that is
+    updated on every snapshot refresh, so this reads the top k entries.
+
+    Args:
+        k: Number of riskiest users to return
+
+    Returns:
+        TopRiskUsersResponse with users ordered by descending score
+    """
+    try:
+        logger.info("Ranking top %s users by risk", k)
+
+        snapshot = snapshot_store.current
+        if snapshot is not None:
+            await risk_index.settled()
+
+            def render() -> TopRiskUsersResponse:
+                index = risk_index.frozen()
+                if index.version != snapshot.version:
+                    # Only the snapshot listener updates the shared index;
+                    # rendering an older or newer snapshot must not rewind it
+                    index = UserRiskIndex()
+                    index.apply_snapshot(snapshot)
+                return TopRiskUsersResponse(
+                    users=index.top(k),
+                    totalUsers=len(index),
+                    generatedAt=snapshot.generated_at,
+                    snapshotVersion=snapshot.version,
+                )
+
+            return snapshot_response(request, ("top-users", k), snapshot, render)
+
+        index = await analysis_coalescer.run(
+            ("risk-index",), lambda: analysis_limiter.run(_build_risk_index)
+        )
+        return TopRiskUsersResponse(users=index.top(k), totalUsers=len(index))
+
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting top users request: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except Exception as e:
+        logger.error("Error ranking users by risk: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to rank users by risk: {str(e)}"
+        )
+
+
+@router.get("/stream")
+async def stream_anomalies():
+    """
+    Push anomaly changes as Server-Sent Events
+
+    Sends a full "snapshot" event on connect, then "delta" events with added
+    and cleared anomalies and summary counter changes whenever a refreshed
+    snapshot is published. Deltas are computed once and shared by all clients.
+
+    Returns:
+        StreamingResponse with a text/event-stream body
+    """
+    logger.info(
+        "Opening anomaly stream (%s open)", anomaly_broadcaster.subscriber_count
+    )
+
+    return StreamingResponse(
+        anomaly_broadcaster.events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
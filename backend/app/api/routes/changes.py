@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.models import ChangesResponse
+from app.services.change_log import VersionGoneError, change_log
+from app.services.snapshot_service import snapshot_store
+from app.utils.logger import logger
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+@router.get("/", response_model=ChangesResponse)
+async def get_changes(
+    since: int = Query(..., ge=0, description="Snapshot version last seen"),
+):
+    """
+    List posts and anomalies that changed since a snapshot version
+
+    Posts are compared by content digest: added, removed (as they were) and
+    modified (as they are now). Anomalies are raised (new or changed) or
+    cleared. Only the last CHANGE_LOG_VERSIONS refreshes are retained.
+
+    Args:
+        since: Snapshot version the caller last processed
+
+    Returns:
+        ChangesResponse with the net changes up to the current snapshot
+    """
+    snapshot = snapshot_store.current
+    if snapshot is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Change tracking needs a published snapshot "
+            "(REFRESH_INTERVAL_SECONDS > 0)",
+        )
+
+    try:
+        logger.info("Listing changes since version %s", since)
+        await change_log.settled()
+        changes = change_log.changes_since(since)
+
+    except VersionGoneError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error listing changes: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to list changes: {str(e)}")
+
+    return ChangesResponse(
+        sinceVersion=changes.since_version,
+        snapshotVersion=changes.version,
+        added=changes.added,
+        removed=changes.removed,
+        modified=changes.modified,
+        anomaliesRaised=changes.anomalies_raised,
+        anomaliesCleared=changes.anomalies_cleared,
+        generatedAt=snapshot.generated_at,
+    )
@@ -0,0 +1,164 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Iterable, List, Optional, Sequence, Tuple
+from app.api.deps import get_post_store
+from app.api.params import parse_id_list
+from app.api.routes.anomalies import compute_anomalies
+from app.services.jsonplaceholder_service import jsonplaceholder_service
+from app.services.post_store import PostStore
+from app.services.snapshot_service import snapshot_store
+from app.utils.errors import ServiceUnavailableError
+from app.utils.export import (
+    ANOMALY_COLUMNS,
+    MEDIA_TYPES,
+    POST_COLUMNS,
+    export_formats,
+    iter_export,
+)
+from app.utils.logger import logger
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+FORMAT_DESCRIPTION = "csv, arrow (Arrow IPC stream) or parquet (requires pyarrow)"
+
+FILE_EXTENSIONS = {"csv": "csv", "arrow": "arrows", "parquet": "parquet"}
+
+
+def _parse_format(raw: str) -> str:
+    fmt = raw.lower()
+    if fmt not in export_formats():
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(export_formats())}",
+        )
+    return fmt
+
+
+def _export_response(
+    name: str,
+    fmt: str,
+    columns: Sequence[Tuple[str, str]],
+    rows: Iterable[Sequence],
+) -> StreamingResponse:
+    # No Content-Length: the body is sent with chunked transfer encoding
+    filename = f"{name}.{FILE_EXTENSIONS[fmt]}"
+    return StreamingResponse(
+        iter_export(fmt, columns, rows),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/posts")
+async def export_posts(
+    format: str = Query("csv", description=FORMAT_DESCRIPTION),
+    user_ids: Optional[str] = Query(
+        None, description="Comma-separated user IDs to export posts for"
+    ),
+    store: Optional[PostStore] = Depends(get_post_store),
+):
+    """
+    Stream every post in a bulk format
+
+    Rows are read from the current snapshot, the post store or the upstream
+    feed, in that order of preference, without building Post objects.
+
+    Args:
+        format: Output format
+        user_ids: Optional comma-separated user IDs to export
+
+    Returns:
+        StreamingResponse with the encoded posts
+    """
+    fmt = _parse_format(format)
+    ids = parse_id_list(user_ids, "user_ids")
+
+    try:
+        logger.info("Exporting posts as %s, user_ids: %s", fmt, ids or None)
+
+        snapshot = snapshot_store.current
+        if snapshot is not None:
+            if ids:
+                posts = [
+                    post
+                    for user_id in ids
+                    for post in snapshot.posts_by_user.get(user_id, ())
+                ]
+            else:
+                posts = snapshot.posts
+            rows = ((p.userId, p.id, p.title, p.body) for p in posts)
+        elif store is not None and store.ready:
+            rows = await asyncio.to_thread(store.get_post_rows, None, ids)
+        else:
+            posts_data = await jsonplaceholder_service.get_posts_data()
+            wanted = set(ids)
+            rows = (
+                (p["userId"], p["id"], p["title"], p["body"])
+                for p in posts_data
+                if not wanted or p["userId"] in wanted
+            )
+
+        return _export_response("posts", fmt, POST_COLUMNS, rows)
+
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting posts export: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except Exception as e:
+        logger.error("Error exporting posts: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to export posts: {str(e)}")
+
+
+@router.get("/anomalies")
+async def export_anomalies(
+    format: str = Query("csv", description=FORMAT_DESCRIPTION),
+    user_ids: Optional[str] = Query(
+        None, description="Comma-separated user IDs to export anomalies for"
+    ),
+    store: Optional[PostStore] = Depends(get_post_store),
+):
+    """
+    Stream every detected anomaly in a bulk format
+
+    Args:
+        format: Output format
+        user_ids: Optional comma-separated user IDs to export
+
+    Returns:
+        StreamingResponse with the encoded anomalies
+    """
+    fmt = _parse_format(format)
+    ids = parse_id_list(user_ids, "user_ids")
+
+    try:
+        logger.info("Exporting anomalies as %s, user_ids: %s", fmt, ids or None)
+
+        snapshot = snapshot_store.current
+        if snapshot is not None:
+            anomalies: List = (
+                [a for uid in ids for a in snapshot.anomalies_by_user.get(uid, ())]
+                if ids
+                else snapshot.anomalies
+            )
+        else:
+            anomalies = (await compute_anomalies(None, ids, store=store)).anomalies
+
+        rows = ((a.userId, a.id, a.title, a.reason, a.details) for a in anomalies)
+        return _export_response("anomalies", fmt, ANOMALY_COLUMNS, rows)
+
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting anomalies export: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except Exception as e:
+        logger.error("Error exporting anomalies: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to export anomalies: {str(e)}"
+        )
@@ -1,55 +1,152 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import Optional
-from app.models import PostsResponse
+from app.api.deps import get_post_store
+from app.api.params import parse_field_list, parse_id_list
+from app.api.responses import json_response, projection, snapshot_response
+from app.models import Post, PostsResponse
 from app.services.jsonplaceholder_service import jsonplaceholder_service
+from app.services.post_store import PostStore
+from app.services.snapshot_service import snapshot_store
+from app.utils.errors import ServiceUnavailableError
 from app.utils.logger import logger
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+FIELDS_DESCRIPTION = "Comma-separated post fields to return, e.g. id,userId,title"
+
 
 @router.get("/", response_model=PostsResponse)
 async def get_posts(
+    request: Request,
     limit: Optional[int] = Query(None, description="Limit number of posts to fetch"),
+    user_ids: Optional[str] = Query(
+        None, description="Comma-separated user IDs to fetch posts for in one call"
+    ),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    store: Optional[PostStore] = Depends(get_post_store),
 ):
     """
     Fetch posts from JSONPlaceholder API
 
     Args:
         limit: Optional limit on number of posts to fetch
+        user_ids: Optional comma-separated user IDs (batch alternative to /{user_id})
+        fields: Optional comma-separated post fields to return
 
     Returns:
         PostsResponse with list of posts and total count
     """
+    ids = parse_id_list(user_ids, "user_ids")
+    selected = parse_field_list(fields, Post)
+    exclude = projection("posts", Post, selected)
+
     try:
-        logger.info(f"Fetching posts with limit: {limit}")
-        posts = await jsonplaceholder_service.get_posts(limit=limit)
+        logger.info("Fetching posts with limit: %s, user_ids: %s", limit, ids or None)
+
+        snapshot = snapshot_store.current
+        if snapshot is not None:
+
+            def render() -> PostsResponse:
+                if ids:
+                    posts = [
+                        post
+                        for user_id in ids
+                        for post in snapshot.posts_by_user.get(user_id, ())
+                    ]
+                else:
+                    posts = list(snapshot.posts)
+                posts = posts[:limit] if limit else posts
+                return PostsResponse(
+                    posts=posts,
+                    total=len(posts),
+                    generatedAt=snapshot.generated_at,
+                    snapshotVersion=snapshot.version,
+                )
 
-        return PostsResponse(posts=posts, total=len(posts))
+            key = ("posts", limit or None, tuple(ids), tuple(sorted(selected or ())))
+            return snapshot_response(request, key, snapshot, render, exclude)
 
+        if store is not None and store.ready:
+            include_body = selected is None or "body" in selected
+            posts = await asyncio.to_thread(store.get_posts, limit, ids, include_body)
+        elif ids:
+            posts = await jsonplaceholder_service.get_posts_by_users(ids)
+            posts = posts[:limit] if limit else posts
+        else:
+            posts = await jsonplaceholder_service.get_posts(limit=limit)
+
+        return json_response(PostsResponse(posts=posts, total=len(posts)), exclude)
+
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting posts request: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
-        logger.error(f"Error fetching posts: {str(e)}")
+        logger.error("Error fetching posts: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch posts: {str(e)}")
 
 
 @router.get("/{user_id}", response_model=PostsResponse)
-async def get_posts_by_user(user_id: int):
+async def get_posts_by_user(
+    user_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    store: Optional[PostStore] = Depends(get_post_store),
+):
     """
     Fetch posts for a specific user
 
     Args:
         user_id: The user ID to fetch posts for
+        fields: Optional comma-separated post fields to return
 
     Returns:
         PostsResponse with list of posts for the user and total count
     """
+    selected = parse_field_list(fields, Post)
+    exclude = projection("posts", Post, selected)
+
     try:
-        logger.info(f"Fetching posts for user {user_id}")
-        posts = await jsonplaceholder_service.get_posts_by_user(user_id)
+        logger.info("Fetching posts for user %s", user_id)
+
+        snapshot = snapshot_store.current
+        if snapshot is not None:
+
+            def render() -> PostsResponse:
+                posts = list(snapshot.posts_by_user.get(user_id, ()))
+                return PostsResponse(
+                    posts=posts,
+                    total=len(posts),
+                    generatedAt=snapshot.generated_at,
+                    snapshotVersion=snapshot.version,
+                )
 
-        return PostsResponse(posts=posts, total=len(posts))
+            key = ("posts", None, (user_id,), tuple(sorted(selected or ())))
+            return snapshot_response(request, key, snapshot, render, exclude)
 
+        if store is not None and store.ready:
+            include_body = selected is None or "body" in selected
+            posts = await asyncio.to_thread(
+                store.get_posts, None, [user_id], include_body
+            )
+        else:
+            posts = await jsonplaceholder_service.get_posts_by_user(user_id)
+
+        return json_response(PostsResponse(posts=posts, total=len(posts)), exclude)
+
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting posts request for user %s: %s", user_id, e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
-        logger.error(f"Error fetching posts for user {user_id}: {str(e)}")
+        logger.error("Error fetching posts for user %s: %s", user_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch posts for user {user_id}: {str(e)}",
@@ -0,0 +1,73 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from app.api.deps import get_post_store
+from app.models import Post, SearchResponse
+from app.services.jsonplaceholder_service import jsonplaceholder_service
+from app.services.post_store import PostStore
+from app.services.search_index import search_index
+from app.services.snapshot_service import snapshot_store
+from app.utils.concurrency import analysis_coalescer, analysis_limiter
+from app.utils.errors import ServiceUnavailableError
+from app.utils.logger import logger
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+async def _refresh_index() -> None:
+    # Without background refreshes, sync the index with the live dataset;
+    # unchanged posts make this a cheap no-op
+    posts = await jsonplaceholder_service.get_posts()
+    await asyncio.to_thread(search_index.update, posts)
+
+
+async def _search(
+    q: str, user_id: Optional[int], limit: int, store: Optional[PostStore]
+) -> List[Post]:
+    if snapshot_store.current is None or not search_index.ready:
+        if store is not None and store.ready:
+            return await asyncio.to_thread(store.search, q, user_id, limit)
+        await analysis_coalescer.run(
+            ("search-index",), lambda: analysis_limiter.run(_refresh_index)
+        )
+
+    return [post for post, _ in search_index.search(q, user_id, limit)]
+
+
+@router.get("/", response_model=SearchResponse)
+async def search_posts(
+    q: str = Query(
+        ..., min_length=1, description="Words to search for; separate clauses by OR"
+    ),
+    user_id: Optional[int] = Query(None, description="Only search posts by this user"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    store: Optional[PostStore] = Depends(get_post_store),
+):
+    """
+    Full-text search over post titles and bodies
+
+    Args:
+        q: Search text; every word must match, "a b OR c" matches either clause
+        user_id: Optional author filter
+        limit: Maximum number of results
+
+    Returns:
+        SearchResponse with matching posts, best match first
+    """
+    try:
+        logger.info("Searching posts for %r, user_id: %s", q, user_id)
+
+        results = await _search(q, user_id, limit, store)
+
+        return SearchResponse(query=q, results=results, total=len(results))
+
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting search request: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except Exception as e:
+        logger.error("Error searching posts: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to search posts: {str(e)}")
@@ -1,60 +1,242 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from app.models import SummaryResponse
+import asyncio
+import math
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Dict, Optional, Tuple
+from app.api.params import parse_field_list
+from app.config import settings
+from app.api.responses import json_response, projection, snapshot_response
+from app.models import SummaryResponse, UserSummary
 from app.services.jsonplaceholder_service import jsonplaceholder_service
-from app.services.text_analyzer import text_analyzer
+from app.services.snapshot_service import AnalyticsSnapshot, snapshot_store
+from app.services.spill_analyzer import SpilledTextStats, analyze_batches
+from app.services.text_analyzer import TextStats, text_analyzer
+from app.services.text_profiles import DEFAULT_PROFILE
+from app.utils.concurrency import analysis_coalescer, analysis_limiter
+from app.utils.errors import ServiceUnavailableError
 from app.utils.logger import logger
+from app.utils.query_cost import (
+    USER_COST,
+    USER_WITH_WORDS_COST,
+    WORD_COST,
+    BatchSampler,
+    query_cost_estimator,
+)
 
 router = APIRouter(prefix="/summary", tags=["summary"])
 
+# Statistics of the current snapshot per (version, profile, sample stride);
+# the default profile is precomputed in the snapshot itself
+_profile_stats: Dict[Tuple[int, str, int], TextStats] = {}
+
+
+async def _snapshot_profile_stats(
+    snapshot: AnalyticsSnapshot, profile: str, sample_stride: int
+) -> TextStats:
+    key = (snapshot.version, profile, sample_stride)
+    stats = _profile_stats.get(key)
+    if stats is not None:
+        return stats
+
+    def analyze() -> TextStats:
+        stats = TextStats(text_analyzer, profile)
+        stats.add(snapshot.posts[::sample_stride])
+        return stats
+
+    # Analyzed once per key, off the event loop, shared by concurrent requests
+    stats = await analysis_coalescer.run(
+        ("profile-stats",) + key,
+        lambda: analysis_limiter.run(lambda: asyncio.to_thread(analyze)),
+    )
+    if snapshot_store.current is snapshot:
+        _profile_stats[key] = stats
+    return stats
+
+
+# Drop the previous version's statistics on every refresh
+snapshot_store.add_listener(lambda previous, current: _profile_stats.clear())
+
+
+async def _summarize(
+    limit: Optional[int],
+    top_users: Optional[int],
+    top_words: Optional[int],
+    include_words: bool = True,
+    profile: str = DEFAULT_PROFILE,
+    sample_stride: int = 1,
+) -> SummaryResponse:
+    sampler = BatchSampler(sample_stride)
+
+    def finish(stats: TextStats) -> SummaryResponse:
+        return SummaryResponse(
+            topUsers=stats.top_users(top_users, include_words),
+            mostFrequentWords=stats.word_frequencies()[:top_words],
+            # Approximate summaries still count every post they sampled from
+            totalPosts=sampler.seen,
+            totalUsers=stats.total_users,
+        )
+
+    # Analyze each batch while the rest of the feed is still downloading
+    return await analyze_batches(
+        sampler.sample(jsonplaceholder_service.stream_posts(limit=limit)),
+        TextStats(text_analyzer, profile),
+        lambda: SpilledTextStats(text_analyzer, settings.spill_dir, profile=profile),
+        finish,
+    )
+
+
+def _actual_cost(
+    summary: SummaryResponse, include_words: bool, sample_stride: int
+) -> int:
+    user_cost = USER_WITH_WORDS_COST if include_words else USER_COST
+    return (
+        math.ceil(summary.totalPosts / sample_stride)
+        + len(summary.topUsers) * user_cost
+        + len(summary.mostFrequentWords) * WORD_COST
+    )
+
 
 @router.get("/", response_model=SummaryResponse)
 async def get_summary(
-    limit: Optional[int] = Query(None, description="Limit number of posts to analyze"),
-    top_users: Optional[int] = Query(3, description="Number of top users to return"),
-    top_words: Optional[int] = Query(20, description="Number of top words to return"),
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=0, description="Limit number of posts to analyze"
+    ),
+    top_users: int = Query(3, ge=1, description="Number of top users to return"),
+    top_words: int = Query(20, ge=1, description="Number of top words to return"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated top user fields to return, e.g. userId,uniqueWordCount",
+    ),
+    text_profile: Optional[str] = Query(
+        None, description="Text normalization profile, e.g. english (default: default)"
+    ),
 ):
     """
     Get summary analysis of posts including word frequency and user insights
 
+    The query's cost is estimated up front (see app.utils.query_cost). Over
+    budget, top_users is capped and then the analysis switches to an evenly
+    spaced sample of the posts; the X-Query-Downgraded header lists what was
+    applied, next to the estimated and actual cost.
+
     Args:
         limit: Optional limit on number of posts to analyze
         top_users: Number of top users to return (default: 3)
         top_words: Number of top words to return (default: 20)
+        fields: Optional comma-separated fields of each top user to return
+        text_profile: Optional normalization profile (stop words, folding,
+            stemming)
 
     Returns:
         SummaryResponse with top users, word frequencies, and statistics
     """
+    selected = parse_field_list(fields, UserSummary)
+    exclude = projection("topUsers", UserSummary, selected)
+    include_words = selected is None or "uniqueWords" in selected
+    profile = text_profile or DEFAULT_PROFILE
+    if profile not in text_analyzer.profiles:
+        raise HTTPException(
+            status_code=400,
+            detail=f"text_profile must be one of {', '.join(text_analyzer.profiles)}",
+        )
+
     try:
         logger.info(
-            f"Getting summary with limit: {limit}, top_users: {top_users}, top_words: {top_words}"
+            "Getting summary with limit: %s, top_users: %s, top_words: %s, profile: %s",
+            limit,
+            top_users,
+            top_words,
+            profile,
         )
 
-        # Fetch posts
-        posts = await jsonplaceholder_service.get_posts(limit=limit)
-
-        if not posts:
-            return SummaryResponse(
-                topUsers=[], mostFrequentWords=[], totalPosts=0, totalUsers=0
+        # Serve the precomputed snapshot when analyzing the full dataset
+        snapshot = snapshot_store.current
+        if snapshot is not None and not limit:
+            query_cost_estimator.observe_dataset_size(len(snapshot.posts))
+            cost = query_cost_estimator.plan_summary(
+                len(snapshot.posts),
+                top_users,
+                top_words,
+                include_words,
+                analyze=profile != DEFAULT_PROFILE,
+            )
+            admitted_users = cost.top_users
+            stats = (
+                None
+                if profile == DEFAULT_PROFILE
+                else await _snapshot_profile_stats(
+                    snapshot, profile, cost.sample_stride
+                )
             )
 
-        # Calculate word frequency
-        word_frequencies = text_analyzer.calculate_word_frequency(posts)
-        top_word_frequencies = word_frequencies[:top_words]
+            def render() -> SummaryResponse:
+                if stats is None:
+                    user_summaries = snapshot.user_summaries[:admitted_users]
+                    word_frequencies = snapshot.word_frequencies[:top_words]
+                else:
+                    user_summaries = stats.top_users(admitted_users, include_words)
+                    # Capped like the precomputed default-profile words
+                    word_frequencies = stats.word_frequencies()[:top_words]
+                return SummaryResponse(
+                    topUsers=list(user_summaries),
+                    mostFrequentWords=list(word_frequencies),
+                    totalPosts=len(snapshot.posts),
+                    totalUsers=snapshot.total_users,
+                    generatedAt=snapshot.generated_at,
+                    snapshotVersion=snapshot.version,
+                )
 
-        # Get top users by unique words
-        top_users_list = text_analyzer.get_top_users_by_unique_words(posts, top_users)
+            key = (
+                "summary",
+                admitted_users,
+                top_words,
+                tuple(sorted(selected or ())),
+                profile,
+                cost.sample_stride,
+            )
+            # Sizes of precomputed results are known up front
+            cost.actual = cost.estimate
+            return cost.apply(
+                snapshot_response(request, key, snapshot, render, exclude), response
+            )
 
-        # Calculate total unique users
-        unique_users = len(set(post.userId for post in posts))
+        posts = query_cost_estimator.posts_to_analyze(limit)
+        cost = query_cost_estimator.plan_summary(
+            posts, top_users, top_words, include_words
+        )
+        admitted_users, stride = cost.top_users, cost.sample_stride
 
-        return SummaryResponse(
-            topUsers=top_users_list,
-            mostFrequentWords=top_word_frequencies,
-            totalPosts=len(posts),
-            totalUsers=unique_users,
+        # Identical concurrent requests share one bounded computation
+        key = (
+            "summary",
+            limit or None,
+            admitted_users,
+            top_words,
+            include_words,
+            profile,
+            stride,
+        )
+        summary = await analysis_coalescer.run(
+            key,
+            lambda: analysis_limiter.run(
+                lambda: _summarize(
+                    limit, admitted_users, top_words, include_words, profile, stride
+                )
+            ),
         )
+        if not limit:
+            query_cost_estimator.observe_dataset_size(summary.totalPosts)
+        cost.actual = _actual_cost(summary, include_words, stride)
+        return cost.apply(json_response(summary, exclude), response)
 
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting summary request: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
-        logger.error(f"Error getting summary: {str(e)}")
+        logger.error("Error getting summary: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get summary: {str(e)}")
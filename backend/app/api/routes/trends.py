@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Query
+from app.models import TrendsResponse
+from app.services.jsonplaceholder_service import jsonplaceholder_service
+from app.services.snapshot_service import snapshot_store
+from app.services.trends import trend_tracker
+from app.utils.concurrency import analysis_coalescer, analysis_limiter
+from app.utils.errors import ServiceUnavailableError
+from app.utils.logger import logger
+
+router = APIRouter(prefix="/trends", tags=["trends"])
+
+
+async def _ingest_live() -> None:
+    # Without background refreshes, record whatever is new upstream now
+    posts = await jsonplaceholder_service.get_posts()
+    await asyncio.to_thread(trend_tracker.ingest, posts)
+
+
+@router.get("/", response_model=TrendsResponse)
+async def get_trends(
+    window_minutes: float = Query(
+        60, gt=0, description="Window length; compared with the preceding window"
+    ),
+    top: int = Query(10, ge=1, le=100, description="Number of words/users to return"),
+):
+    """
+    Show rising words and users whose anomaly rate is spiking
+
+    Compares posts ingested in the last window with the window before it.
+
+    Args:
+        window_minutes: Window length in minutes
+        top: Maximum number of rising words and spiking users
+
+    Returns:
+        TrendsResponse with rising words and spiking users
+    """
+    window_seconds = window_minutes * 60
+    if window_seconds > trend_tracker.max_window_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"window_minutes must be at most {trend_tracker.max_window_seconds / 60:g}",
+        )
+
+    try:
+        logger.info("Computing trends for a %g minute window", window_minutes)
+
+        if snapshot_store.current is None:
+            await analysis_coalescer.run(
+                ("trends-ingest",), lambda: analysis_limiter.run(_ingest_live)
+            )
+
+        current, previous, rising, spiking = trend_tracker.trends(window_seconds, top)
+
+        return TrendsResponse(
+            windowMinutes=window_minutes,
+            postsInWindow=current.total_posts,
+            postsInPreviousWindow=previous.total_posts,
+            risingWords=rising,
+            spikingUsers=spiking,
+            generatedAt=datetime.now(timezone.utc),
+        )
+
+    except ServiceUnavailableError as e:
+        logger.warning("Rejecting trends request: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except Exception as e:
+        logger.error("Error computing trends: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to compute trends: {str(e)}"
+        )
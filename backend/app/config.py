@@ -1,4 +1,5 @@
 import os
+from typing import Callable, Optional
 from pydantic import BaseModel
 
 
@@ -6,6 +7,71 @@ class Settings(BaseModel):
     server_port: int = 8000
     server_host: str = "0.0.0.0"
     log_level: str = "INFO"
+    # "text" for humans, "json" for log shippers
+    log_format: str = "text"
+    # Fraction of hot-path debug events kept when LOG_LEVEL=DEBUG
+    log_debug_sample_rate: float = 0.1
+    # Enables the profiling surface (?profile=true, /api/admin) for this token
+    admin_token: Optional[str] = None
+    # Worker processes for `python -m app.serve`; >1 fetches and analyzes once
+    # for all workers, but each worker still holds its own decoded snapshot
+    workers: int = 1
+    # Set by the supervisor for workers attaching to shared snapshot generations
+    shared_snapshot_dir: Optional[str] = None
+    # Seconds between background refreshes of the analytics snapshot (0 disables)
+    refresh_interval_seconds: float = 300.0
+    # Concurrency guard for on-demand analysis (anomalies/summary)
+    max_concurrent_analyses: int = 4
+    max_queued_analyses: int = 32
+    analysis_queue_timeout_seconds: float = 5.0
+    # Working-set budget for on-demand analysis; above it, aggregates spill
+    # to temporary files (0 disables)
+    memory_budget_mb: float = 256.0
+    # Directory for spill files (unset uses the system temp directory)
+    spill_dir: Optional[str] = None
+    # Posts parsed per batch when streaming the upstream feed into analysis
+    ingest_batch_size: int = 500
+    # JSON file of named text normalization profiles (unset: built-ins only)
+    text_profiles_file: Optional[str] = None
+    # Snapshot refreshes whose changes stay available to /api/changes
+    change_log_versions: int = 8
+    # Estimated-cost budgets of on-demand queries (0 disables); see query_cost
+    query_budget_summary: int = 200_000
+    query_budget_anomalies: int = 500_000
+    # Shared cache (e.g. redis://cache:6379/0); unset keeps caching in-process
+    cache_url: Optional[str] = None
+    # SQLite file for persisting ingested posts and indexed queries (unset disables)
+    sqlite_path: Optional[str] = None
+    # Seconds the stored dataset is served after its last ingestion; keep it
+    # above REFRESH_INTERVAL_SECONDS so refreshes keep the store in use
+    sqlite_max_age_seconds: float = 900.0
+    # Upstream API client resilience
+    upstream_base_url: str = "https://jsonplaceholder.typicode.com"
+    upstream_attempt_timeout_seconds: float = 3.0
+    upstream_max_retries: int = 2
+    upstream_hedging_enabled: bool = False
+    upstream_circuit_failure_threshold: int = 5
+    upstream_circuit_reset_seconds: float = 30.0
+
+
+def _get_number_env(name: str, cast: Callable, default):
+    """Read a non-negative number from the environment, keeping the default if invalid"""
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def _get_bool_env(name: str, default: bool) -> bool:
+    """Read a boolean flag (1/true/yes/on) from the environment"""
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
 
 
 def load_config() -> Settings:
@@ -27,6 +93,95 @@ def load_config() -> Settings:
         if log_level in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
             settings.log_level = log_level
 
+    if os.getenv("LOG_FORMAT"):
+        log_format = os.getenv("LOG_FORMAT").lower()
+        if log_format in ["text", "json"]:
+            settings.log_format = log_format
+
+    settings.log_debug_sample_rate = min(
+        1.0,
+        _get_number_env("LOG_DEBUG_SAMPLE_RATE", float, settings.log_debug_sample_rate),
+    )
+
+    if os.getenv("ADMIN_TOKEN"):
+        settings.admin_token = os.getenv("ADMIN_TOKEN")
+
+    settings.workers = max(1, _get_number_env("WORKERS", int, settings.workers))
+
+    if os.getenv("SHARED_SNAPSHOT_DIR"):
+        settings.shared_snapshot_dir = os.getenv("SHARED_SNAPSHOT_DIR")
+
+    settings.refresh_interval_seconds = _get_number_env(
+        "REFRESH_INTERVAL_SECONDS", float, settings.refresh_interval_seconds
+    )
+    settings.max_concurrent_analyses = _get_number_env(
+        "MAX_CONCURRENT_ANALYSES", int, settings.max_concurrent_analyses
+    )
+    settings.max_queued_analyses = _get_number_env(
+        "MAX_QUEUED_ANALYSES", int, settings.max_queued_analyses
+    )
+    settings.analysis_queue_timeout_seconds = _get_number_env(
+        "ANALYSIS_QUEUE_TIMEOUT_SECONDS", float, settings.analysis_queue_timeout_seconds
+    )
+
+    settings.memory_budget_mb = _get_number_env(
+        "MEMORY_BUDGET_MB", float, settings.memory_budget_mb
+    )
+
+    if os.getenv("SPILL_DIR"):
+        settings.spill_dir = os.getenv("SPILL_DIR")
+
+    settings.ingest_batch_size = max(
+        1, _get_number_env("INGEST_BATCH_SIZE", int, settings.ingest_batch_size)
+    )
+
+    settings.change_log_versions = max(
+        1, _get_number_env("CHANGE_LOG_VERSIONS", int, settings.change_log_versions)
+    )
+
+    settings.query_budget_summary = _get_number_env(
+        "QUERY_BUDGET_SUMMARY", int, settings.query_budget_summary
+    )
+    settings.query_budget_anomalies = _get_number_env(
+        "QUERY_BUDGET_ANOMALIES", int, settings.query_budget_anomalies
+    )
+
+    if os.getenv("TEXT_PROFILES_FILE"):
+        settings.text_profiles_file = os.getenv("TEXT_PROFILES_FILE")
+
+    if os.getenv("CACHE_URL"):
+        settings.cache_url = os.getenv("CACHE_URL")
+
+    if os.getenv("SQLITE_PATH"):
+        settings.sqlite_path = os.getenv("SQLITE_PATH")
+
+    settings.sqlite_max_age_seconds = _get_number_env(
+        "SQLITE_MAX_AGE_SECONDS", float, settings.sqlite_max_age_seconds
+    )
+
+    if os.getenv("UPSTREAM_BASE_URL"):
+        settings.upstream_base_url = os.getenv("UPSTREAM_BASE_URL").rstrip("/")
+
+    settings.upstream_attempt_timeout_seconds = _get_number_env(
+        "UPSTREAM_ATTEMPT_TIMEOUT_SECONDS",
+        float,
+        settings.upstream_attempt_timeout_seconds,
+    )
+    settings.upstream_max_retries = _get_number_env(
+        "UPSTREAM_MAX_RETRIES", int, settings.upstream_max_retries
+    )
+    settings.upstream_hedging_enabled = _get_bool_env(
+        "UPSTREAM_HEDGING_ENABLED", settings.upstream_hedging_enabled
+    )
+    settings.upstream_circuit_failure_threshold = _get_number_env(
+        "UPSTREAM_CIRCUIT_FAILURE_THRESHOLD",
+        int,
+        settings.upstream_circuit_failure_threshold,
+    )
+    settings.upstream_circuit_reset_seconds = _get_number_env(
+        "UPSTREAM_CIRCUIT_RESET_SECONDS", float, settings.upstream_circuit_reset_seconds
+    )
+
     return settings
 
 
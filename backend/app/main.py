@@ -1,23 +1,75 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.config import settings
+from app.services.cache_backend import cache_backend
+from app.services.jsonplaceholder_service import jsonplaceholder_service
+from app.services.post_store import open_post_store
+from app.services.snapshot_service import snapshot_store
+from app.utils.logger import logger
+from app.utils.profiling import instrument_loop
+
+from app.api.middleware import ProfilingMiddleware
+from app.utils.compression import CompressionMiddleware
 
 # Import API routes
-from app.api.routes import posts, anomalies, summary
+from app.api.routes import (
+    posts,
+    anomalies,
+    summary,
+    search,
+    trends,
+    admin,
+    export,
+    changes,
+)
+
+
+async def warm_up() -> None:
+    """Open pooled resources so the first request does not pay for them"""
+    await jsonplaceholder_service.client.open()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown events"""
     # Startup
-    print("Starting Ad Insights Explorer API")
-    print("Server is ready to serve requests")
+    logger.info("Starting Ad Insights Explorer API")
+    if settings.admin_token:
+        # Before any to_thread call creates the stock default executor
+        instrument_loop(asyncio.get_running_loop())
+    # Opened here rather than at import; routes reach it via get_post_store
+    app.state.post_store = open_post_store()
+    jsonplaceholder_service.store = app.state.post_store
+    # Warm up in the background: /health answers at once, /ready once warm
+    warm_up_task = asyncio.create_task(warm_up())
+    shared_reader = None
+    if settings.shared_snapshot_dir:
+        # Multi-worker mode: the supervisor refreshes, workers only attach
+        from app.services.shared_snapshot import SharedSnapshotReader
+
+        shared_reader = SharedSnapshotReader(settings.shared_snapshot_dir)
+        shared_reader.start()
+    elif settings.refresh_interval_seconds > 0:
+        snapshot_store.start(settings.refresh_interval_seconds)
+    logger.info("Server is ready to serve requests")
 
     yield
 
     # Shutdown
-    print("Shutting down Ad Insights Explorer API")
+    warm_up_task.cancel()
+    if shared_reader is not None:
+        await shared_reader.stop()
+    await snapshot_store.stop()
+    await jsonplaceholder_service.aclose()
+    await cache_backend.aclose()
+    jsonplaceholder_service.store = None
+    if app.state.post_store is not None:
+        app.state.post_store.close()
+    logger.info("Shutting down Ad Insights Explorer API")
 
 
 # Create FastAPI app with lifespan
@@ -28,6 +80,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Opt-in per-request profiling (?profile=true with X-Admin-Token)
+app.add_middleware(ProfilingMiddleware)
+
+# gzip/brotli for responses that were not compressed by their route
+app.add_middleware(CompressionMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +99,11 @@ app.add_middleware(
 app.include_router(posts.router, prefix="/api")
 app.include_router(anomalies.router, prefix="/api")
 app.include_router(summary.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(trends.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(export.router, prefix="/api")
+app.include_router(changes.router, prefix="/api")
 
 
 @app.get("/")
@@ -54,6 +117,8 @@ async def root():
             "posts": "/api/posts",
             "anomalies": "/api/anomalies",
             "summary": "/api/summary",
+            "search": "/api/search",
+            "trends": "/api/trends",
         },
     }
 
@@ -64,6 +129,23 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once warm-up finished and the first snapshot is loaded"""
+    expects_snapshot = (
+        bool(settings.shared_snapshot_dir) or settings.refresh_interval_seconds > 0
+    )
+    checks = {
+        "upstreamClient": jsonplaceholder_service.client.is_open,
+        "snapshot": snapshot_store.current is not None or not expects_snapshot,
+    }
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "starting", "checks": checks},
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
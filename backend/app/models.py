@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -18,6 +19,8 @@ class Post(BaseModel):
 class PostsResponse(BaseModel):
     posts: List[Post]
     total: int
+    generatedAt: Optional[datetime] = None
+    snapshotVersion: Optional[int] = None
 
 
 # Anomaly-related models
@@ -39,6 +42,35 @@ class AnomaliesResponse(BaseModel):
     anomalies: List[Anomaly]
     total: int
     summary: dict
+    generatedAt: Optional[datetime] = None
+    snapshotVersion: Optional[int] = None
+
+
+class UserRisk(BaseModel):
+    userId: int
+    score: float
+    totalPosts: int
+    shortTitles: int
+    duplicatePosts: int
+    botClusters: int
+
+
+class ChangesResponse(BaseModel):
+    sinceVersion: int
+    snapshotVersion: int
+    added: List[Post]
+    removed: List[Post]
+    modified: List[Post]
+    anomaliesRaised: List[Anomaly]
+    anomaliesCleared: List[Anomaly]
+    generatedAt: Optional[datetime] = None
+
+
+class TopRiskUsersResponse(BaseModel):
+    users: List[UserRisk]
+    totalUsers: int
+    generatedAt: Optional[datetime] = None
+    snapshotVersion: Optional[int] = None
 
 
 # Summary-related models
@@ -46,7 +78,8 @@ class UserSummary(BaseModel):
     userId: int
     uniqueWordCount: int
     totalPosts: int
-    uniqueWords: List[str]
+    # None only when excluded by a ?fields= projection
+    uniqueWords: Optional[List[str]] = None
 
 
 class WordFrequency(BaseModel):
@@ -59,3 +92,38 @@ class SummaryResponse(BaseModel):
     mostFrequentWords: List[WordFrequency]
     totalPosts: int
     totalUsers: int
+    generatedAt: Optional[datetime] = None
+    snapshotVersion: Optional[int] = None
+
+
+# Search-related models
+class SearchResponse(BaseModel):
+    query: str
+    results: List[Post]
+    total: int
+
+
+# Trend-related models
+class WordTrend(BaseModel):
+    word: str
+    count: int
+    previousCount: int
+    growth: float
+
+
+class UserAnomalyTrend(BaseModel):
+    userId: int
+    posts: int
+    anomalies: int
+    # Anomalies per post ingested in the window
+    anomalyRate: float
+    previousAnomalyRate: float
+
+
+class TrendsResponse(BaseModel):
+    windowMinutes: float
+    postsInWindow: int
+    postsInPreviousWindow: int
+    risingWords: List[WordTrend]
+    spikingUsers: List[UserAnomalyTrend]
+    generatedAt: datetime
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+
+import uvicorn
+
+from app.config import settings
+from app.services.shared_snapshot import SharedSnapshotWriter
+from app.services.snapshot_service import snapshot_store
+from app.utils.logger import logger
+
+
+def _shared_directory() -> str:
+    if settings.shared_snapshot_dir:
+        return settings.shared_snapshot_dir
+    # Prefer RAM-backed storage so generations never touch the disk
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    return tempfile.mkdtemp(prefix="ad-insights-", dir=base)
+
+
+async def _refresh_forever() -> None:
+    if settings.refresh_interval_seconds > 0:
+        snapshot_store.start(settings.refresh_interval_seconds)
+        await asyncio.Event().wait()
+    else:
+        await snapshot_store.refresh()
+
+
+def main() -> None:
+    """
+    Serve the API, optionally as a multi-worker supervisor
+
+    With WORKERS > 1 this process fetches and analyzes the dataset once per
+    refresh and publishes each snapshot generation to a private directory
+    (RAM-backed when available); the uvicorn workers load those generations
+    instead of calling upstream, each keeping its own decoded copy.
+    """
+    if settings.workers <= 1:
+        uvicorn.run(
+            "app.main:app", host=settings.server_host, port=settings.server_port
+        )
+        return
+
+    owns_directory = not settings.shared_snapshot_dir
+    directory = _shared_directory()
+    # Inherited by the worker processes, switching them to attach mode
+    os.environ["SHARED_SNAPSHOT_DIR"] = directory
+
+    writer = SharedSnapshotWriter(directory)
+    snapshot_store.add_listener(writer.on_snapshot)
+    threading.Thread(
+        target=asyncio.run, args=(_refresh_forever(),), daemon=True
+    ).start()
+
+    logger.info(
+        "Starting %s workers sharing snapshots in %s", settings.workers, directory
+    )
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.server_host,
+            port=settings.server_port,
+            workers=settings.workers,
+        )
+    finally:
+        if owns_directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from collections import defaultdict
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple
 from app.models import Post, Anomaly
+from app.utils.logger import debug_event
 
 
 class AnomalyDetector:
@@ -10,12 +11,16 @@ class AnomalyDetector:
         self.short_title_threshold = 15
         self.bot_detection_threshold = 5
 
-    def detect_anomalies(self, posts: List[Post]) -> List[Anomaly]:
+    def detect_anomalies(
+        self, posts: List[Post], include_details: bool = True
+    ) -> List[Anomaly]:
         """
         Detect all types of anomalies in posts
 
         Args:
             posts: List of posts to analyze
+            include_details: Format the human-readable details (skip for
+                projections that do not return them)
 
         Returns:
             List of Anomaly objects
@@ -23,26 +28,29 @@ class AnomalyDetector:
         anomalies = []
 
         # Detect short titles
-        short_title_anomalies = self._detect_short_titles(posts)
+        short_title_anomalies = self._detect_short_titles(posts, include_details)
         anomalies.extend(short_title_anomalies)
 
         # Detect duplicate titles
-        duplicate_anomalies = self._detect_duplicate_titles(posts)
+        duplicate_anomalies = self._detect_duplicate_titles(posts, include_details)
         anomalies.extend(duplicate_anomalies)
 
         # Detect bot-like behavior
-        bot_anomalies = self._detect_bot_like_behavior(posts)
+        bot_anomalies = self._detect_bot_like_behavior(posts, include_details)
         anomalies.extend(bot_anomalies)
 
-        print(f"Detected {len(anomalies)} total anomalies")
+        debug_event("anomalies.detected", total=len(anomalies), posts=len(posts))
         return anomalies
 
-    def _detect_short_titles(self, posts: List[Post]) -> List[Anomaly]:
+    def _detect_short_titles(
+        self, posts: List[Post], include_details: bool = True
+    ) -> List[Anomaly]:
         """
         Detect posts with titles shorter than the threshold
 
         Args:
             posts: List of posts to analyze
+            include_details: Format the details message
 
         Returns:
             List of Anomaly objects for short titles
@@ -56,19 +64,24 @@ class AnomalyDetector:
                     id=post.id,
                     title=post.title,
                     reason="short_title",
-                    details=f"Title length ({len(post.title)}) is below threshold ({self.short_title_threshold})",
+                    details=f"Title length ({len(post.title)}) is below threshold ({self.short_title_threshold})"
+                    if include_details
+                    else None,
                 )
                 anomalies.append(anomaly)
 
-        print(f"Detected {len(anomalies)} posts with short titles")
+        debug_event("anomalies.short_titles", count=len(anomalies))
         return anomalies
 
-    def _detect_duplicate_titles(self, posts: List[Post]) -> List[Anomaly]:
+    def _detect_duplicate_titles(
+        self, posts: List[Post], include_details: bool = True
+    ) -> List[Anomaly]:
         """
         Detect posts with duplicate titles by the same user
 
         Args:
             posts: List of posts to analyze
+            include_details: Format the details message
 
         Returns:
             List of Anomaly objects for duplicate titles
@@ -94,20 +107,25 @@ class AnomalyDetector:
                     id=post.id,
                     title=post.title,
                     reason="duplicate_title",
-                    details=f"User has {len(user_posts_with_same_title)} posts with identical title",
+                    details=f"User has {len(user_posts_with_same_title)} posts with identical title"
+                    if include_details
+                    else None,
                 )
                 anomalies.append(anomaly)
 
-        print(f"Detected {len(anomalies)} posts with duplicate titles")
+        debug_event("anomalies.duplicate_titles", count=len(anomalies))
         return anomalies
 
-    def _detect_bot_like_behavior(self, posts: List[Post]) -> List[Anomaly]:
+    def _detect_bot_like_behavior(
+        self, posts: List[Post], include_details: bool = True
+    ) -> List[Anomaly]:
         """
         Detect users with more than threshold posts having similar titles
         Simplified: Just check for exact duplicate titles per user
 
         Args:
             posts: List of posts to analyze
+            include_details: Format the details message
 
         Returns:
             List of Anomaly objects for bot-like behavior
@@ -135,11 +153,13 @@ class AnomalyDetector:
                             id=post.id,
                             title=post.title,
                             reason="bot_like_behavior",
-                            details=f"User has {count} posts with identical title",
+                            details=f"User has {count} posts with identical title"
+                            if include_details
+                            else None,
                         )
                         anomalies.append(anomaly)
 
-        print(f"Detected {len(anomalies)} posts with bot-like behavior")
+        debug_event("anomalies.bot_like", count=len(anomalies))
         return anomalies
 
     def get_anomaly_summary(self, anomalies: List[Anomaly]) -> Dict:
@@ -170,5 +190,84 @@ class AnomalyDetector:
         return summary
 
 
+class AnomalyTracker:
+    """
+    Anomaly detection built incrementally from batches of posts
+
+    Short titles are found as posts arrive; duplicate and bot-like titles
+    need every post of a user, so only (index, id) per user and title is
+    kept until the end. Produces the same anomalies, in the same order, as
+    AnomalyDetector.detect_anomalies.
+    """
+
+    def __init__(self, detector: AnomalyDetector, include_details: bool = True):
+        self.detector = detector
+        self.include_details = include_details
+        self.short_titles: List[Anomaly] = []
+        # Users, then their titles, in order of first appearance
+        self.user_titles: Dict[int, Dict[str, List[Tuple[int, int]]]] = {}
+        self.total_posts = 0
+
+    def add(self, posts: List[Post]) -> None:
+        threshold = self.detector.short_title_threshold
+        for post in posts:
+            if len(post.title) < threshold:
+                self.short_titles.append(
+                    Anomaly(
+                        userId=post.userId,
+                        id=post.id,
+                        title=post.title,
+                        reason="short_title",
+                        details=f"Title length ({len(post.title)}) is below threshold ({threshold})"
+                        if self.include_details
+                        else None,
+                    )
+                )
+            titles = self.user_titles.setdefault(post.userId, {})
+            titles.setdefault(post.title, []).append((self.total_posts, post.id))
+            self.total_posts += 1
+
+    def anomalies(self) -> List[Anomaly]:
+        duplicates: List[Tuple[int, Anomaly]] = []
+        bot_like: List[Anomaly] = []
+
+        for user_id, titles in self.user_titles.items():
+            for title, entries in titles.items():
+                count = len(entries)
+                if count < 2:
+                    continue
+                details = (
+                    f"User has {count} posts with identical title"
+                    if self.include_details
+                    else None
+                )
+                for index, post_id in entries:
+                    duplicates.append(
+                        (
+                            index,
+                            Anomaly(
+                                userId=user_id,
+                                id=post_id,
+                                title=title,
+                                reason="duplicate_title",
+                                details=details,
+                            ),
+                        )
+                    )
+                    if count >= self.detector.bot_detection_threshold:
+                        bot_like.append(
+                            Anomaly(
+                                userId=user_id,
+                                id=post_id,
+                                title=title,
+                                reason="bot_like_behavior",
+                                details=details,
+                            )
+                        )
+
+        duplicates.sort(key=lambda item: item[0])
+        return self.short_titles + [a for _, a in duplicates] + bot_like
+
+
 # Global service instance
 anomaly_detector = AnomalyDetector()
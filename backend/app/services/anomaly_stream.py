@@ -0,0 +1,235 @@
+import asyncio
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from app.models import Anomaly
+from app.services.snapshot_service import AnalyticsSnapshot, snapshot_store
+from app.utils.logger import logger
+
+# Queue marker telling a lagging subscriber to resynchronize from the snapshot
+RESYNC = None
+
+
+def _anomaly_key(anomaly: Anomaly) -> Tuple[int, str]:
+    return anomaly.id, anomaly.reason
+
+
+def _counter_delta(before: Dict, after: Dict) -> Dict:
+    delta = {}
+    for key in set(before) | set(after):
+        change = after.get(key, 0) - before.get(key, 0)
+        if change:
+            delta[key] = change
+    return delta
+
+
+def compute_anomaly_delta(
+    previous: Optional[AnalyticsSnapshot], current: AnalyticsSnapshot
+) -> Dict:
+    """
+    Compute anomalies raised and cleared between two snapshots
+
+    Anomalies are identified by (post id, reason); an anomaly whose title or
+    details changed is reported as added so clients replace it in place.
+
+    Args:
+        previous: Snapshot the clients currently hold (None for the first one)
+        current: Newly published snapshot
+
+    Returns:
+        Dictionary with added/cleared anomalies and summary counter deltas
+    """
+    before = {_anomaly_key(a): a for a in previous.anomalies} if previous else {}
+    after = {_anomaly_key(a): a for a in current.anomalies}
+
+    added = [a for key, a in after.items() if before.get(key) != a]
+    cleared = [a for key, a in before.items() if key not in after]
+
+    before_summary = previous.anomaly_summary if previous else {}
+    after_summary = current.anomaly_summary
+
+    return {
+        "snapshotVersion": current.version,
+        "previousVersion": previous.version if previous else None,
+        "generatedAt": current.generated_at.isoformat(),
+        "added": [a.model_dump() for a in added],
+        "cleared": [a.model_dump() for a in cleared],
+        "summaryDelta": {
+            "total_anomalies": after_summary.get("total_anomalies", 0)
+            - before_summary.get("total_anomalies", 0),
+            "unique_users_affected": after_summary.get("unique_users_affected", 0)
+            - before_summary.get("unique_users_affected", 0),
+            "by_reason": _counter_delta(
+                before_summary.get("by_reason", {}), after_summary.get("by_reason", {})
+            ),
+            "by_user": _counter_delta(
+                before_summary.get("by_user", {}), after_summary.get("by_user", {})
+            ),
+        },
+    }
+
+
+def format_sse(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """Encode a payload as a single Server-Sent Events message"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """A single connected client with its own bounded event queue"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, message: str) -> bool:
+        """
+        Enqueue a message without blocking the broadcaster
+
+        When the client has fallen behind, its backlog is dropped and replaced
+        by a single resync marker so memory per client stays bounded.
+
+        Returns:
+            False if the client overflowed and will be resynchronized
+        """
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return False
+
+
+class AnomalyBroadcaster:
+    """Fans out anomaly deltas computed once per snapshot to all subscribers"""
+
+    def __init__(self):
+        self.queue_size = 16
+        self.heartbeat_interval = 15.0
+        self._subscriptions: Set[Subscription] = set()
+        self._snapshot_event: Optional[Tuple[int, str]] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="anomaly-stream"
+        )
+        self._pending: Optional[Future] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def _fan_out(self, message: str) -> None:
+        lagging = sum(1 for s in self._subscriptions if not s.offer(message))
+
+        if lagging:
+            logger.warning("%s stream subscribers lagging, forcing resync", lagging)
+
+    def _broadcast(
+        self,
+        previous: Optional[AnalyticsSnapshot],
+        current: AnalyticsSnapshot,
+        loop: Optional[asyncio.AbstractEventLoop],
+    ) -> None:
+        delta = compute_anomaly_delta(previous, current)
+        if not delta["added"] and not delta["cleared"]:
+            return
+
+        message = format_sse("delta", delta, event_id=current.version)
+        # Subscriber queues belong to the event loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._fan_out, message)
+        else:
+            self._fan_out(message)
+
+    def _log_failure(self, future: Future) -> None:
+        if future.exception() is not None:
+            logger.error("Anomaly delta broadcast failed: %s", future.exception())
+
+    def on_snapshot(
+        self, previous: Optional[AnalyticsSnapshot], current: AnalyticsSnapshot
+    ) -> None:
+        """
+        Snapshot listener: compute and encode the delta once, then fan out
+
+        The delta is computed and encoded on a worker thread; only handing
+        the finished message to subscriber queues runs on the event loop.
+        """
+        if not self._subscriptions:
+            return
+
+        try:
+            loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        self._pending = self._executor.submit(self._broadcast, previous, current, loop)
+        self._pending.add_done_callback(self._log_failure)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until deltas of snapshots published so far have been sent"""
+        if self._pending is not None:
+            self._pending.exception(timeout)
+
+    def snapshot_message(self, snapshot: AnalyticsSnapshot) -> str:
+        """Full-state event for new or resynchronizing clients, cached per version"""
+        cached = self._snapshot_event
+        if cached is None or cached[0] != snapshot.version:
+            data = {
+                "snapshotVersion": snapshot.version,
+                "generatedAt": snapshot.generated_at.isoformat(),
+                "anomalies": [a.model_dump() for a in snapshot.anomalies],
+                "summary": snapshot.anomaly_summary,
+            }
+            cached = (
+                snapshot.version,
+                format_sse("snapshot", data, event_id=snapshot.version),
+            )
+            self._snapshot_event = cached
+        return cached[1]
+
+    async def events(self) -> AsyncIterator[str]:
+        """
+        Subscribe and yield SSE messages until the client disconnects
+
+        Yields:
+            Encoded SSE messages and keep-alive comments
+        """
+        subscription = self.subscribe()
+        try:
+            snapshot = snapshot_store.current
+            if snapshot is not None:
+                yield self.snapshot_message(snapshot)
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=self.heartbeat_interval
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if message is RESYNC:
+                    snapshot = snapshot_store.current
+                    if snapshot is not None:
+                        yield self.snapshot_message(snapshot)
+                else:
+                    yield message
+        finally:
+            self.unsubscribe(subscription)
+
+
+# Global service instance
+anomaly_broadcaster = AnomalyBroadcaster()
+snapshot_store.add_listener(anomaly_broadcaster.on_snapshot)
@@ -0,0 +1,320 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import time
+import uuid
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.config import settings
+from app.utils.logger import logger
+
+# One-byte header so the payload format can evolve without flushing caches
+PAYLOAD_FORMAT = b"\x01"
+
+UNLOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+
+def dump_payload(value: Any) -> bytes:
+    """Serialize plain data as compact JSON (the uncompressed payload)"""
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def compress_payload(raw: bytes) -> bytes:
+    """Frame and compress the output of dump_payload"""
+    return PAYLOAD_FORMAT + zlib.compress(raw, 6)
+
+
+def encode_payload(value: Any) -> bytes:
+    """Serialize plain data as compact, compressed binary"""
+    return compress_payload(dump_payload(value))
+
+
+def decode_payload(data: bytes) -> Any:
+    """Inverse of encode_payload"""
+    if data[:1] != PAYLOAD_FORMAT:
+        raise ValueError("Unsupported cache payload format")
+    return json.loads(zlib.decompress(data[1:]))
+
+
+class CacheBackend(ABC):
+    """Interface for caches shared by the upstream client and analytics"""
+
+    # True when the cache is visible to other replicas
+    is_shared = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        """Try to take a lock; return its token, or None if it is held"""
+
+    @abstractmethod
+    async def release_lock(self, name: str, token: str) -> None:
+        """Release a lock only if it is still held with the given token"""
+
+    async def aclose(self) -> None:
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local cache with TTLs, used standalone or as a fallback"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._entries: Dict[str, Tuple[Any, Optional[float]]] = {}
+
+    def _live(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (value, self._clock() + ttl)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._live(key) or 0) + 1
+        self._entries[key] = (value, None)
+        return value
+
+    async def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        key = f"lock:{name}"
+        if self._live(key) is not None:
+            return None
+        token = uuid.uuid4().hex
+        self._entries[key] = (token, self._clock() + ttl)
+        return token
+
+    async def release_lock(self, name: str, token: str) -> None:
+        key = f"lock:{name}"
+        if self._live(key) == token:
+            del self._entries[key]
+
+
+class RedisProtocolError(Exception):
+    """Raised when the Redis server replies with an error"""
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Minimal Redis (RESP2) client implementing CacheBackend
+
+    Commands are serialized over one connection. When the server is
+    unreachable, every operation degrades to an in-process fallback so the
+    API keeps working (without cross-replica sharing). After a failed
+    connect, reconnecting is not attempted again for an exponentially
+    growing backoff, so requests do not each wait for the connect timeout.
+    """
+
+    is_shared = True
+
+    # Bounds of the delay before reconnecting after a failed connect
+    min_backoff = 1.0
+    max_backoff = 30.0
+
+    def __init__(self, url: str, timeout: float = 1.0, clock=time.monotonic):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.fallback = InMemoryCacheBackend()
+        self._clock = clock
+        self._backoff = self.min_backoff
+        self._retry_at = 0.0
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+        # Locks taken from the fallback, released there rather than in Redis
+        self._local_locks: Dict[str, str] = {}
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", self.db)
+
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, rest = line[:1], line[1:-2]
+
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisProtocolError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            if count < 0:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise RedisProtocolError(f"Unexpected reply type {kind!r}")
+
+    async def _roundtrip(self, *args) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _execute(self, *args) -> Any:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                if self._writer is None or self._writer.is_closing():
+                    await self._reconnect()
+                return await asyncio.wait_for(self._roundtrip(*args), self.timeout)
+            except RedisProtocolError:
+                raise  # The error reply was read in full
+            except BaseException:
+                # Also on cancellation: an unread reply left on the socket
+                # would be returned to the next command
+                self._reset()
+                raise
+
+    async def _reconnect(self) -> None:
+        now = self._clock()
+        if now < self._retry_at:
+            raise ConnectionError("Redis reconnect backing off")
+        try:
+            await asyncio.wait_for(self._connect(), self.timeout)
+        except (OSError, ConnectionError, asyncio.TimeoutError):
+            self._retry_at = now + self._backoff
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+            raise
+        self._backoff = self.min_backoff
+
+    def _reset(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _call(self, fallback: Callable[[], Awaitable], *args) -> Any:
+        try:
+            return await self._execute(*args)
+        except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+            logger.warning(
+                "Redis unavailable (%s), using local cache", type(e).__name__
+            )
+            return await fallback()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._call(lambda: self.fallback.get(key), "GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ttl_ms = max(1, int(ttl * 1000))
+        await self._call(
+            lambda: self.fallback.set(key, value, ttl), "SET", key, value, "PX", ttl_ms
+        )
+
+    async def delete(self, key: str) -> None:
+        await self._call(lambda: self.fallback.delete(key), "DEL", key)
+
+    async def incr(self, key: str) -> int:
+        return await self._call(lambda: self.fallback.incr(key), "INCR", key)
+
+    async def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        ttl_ms = max(1, int(ttl * 1000))
+        local = False
+
+        async def acquire_locally() -> Optional[str]:
+            nonlocal local
+            local = True
+            return await self.fallback.acquire_lock(name, ttl)
+
+        reply = await self._call(
+            acquire_locally,
+            "SET",
+            f"lock:{name}",
+            token,
+            "NX",
+            "PX",
+            ttl_ms,
+        )
+        if local:
+            # The lock lives in the fallback, so it must be released there
+            if reply is not None:
+                self._local_locks[name] = reply
+            return reply
+        return token if reply == "OK" else None
+
+    async def release_lock(self, name: str, token: str) -> None:
+        if self._local_locks.get(name) == token:
+            del self._local_locks[name]
+            await self.fallback.release_lock(name, token)
+            return
+        await self._call(
+            lambda: self.fallback.release_lock(name, token),
+            "EVAL",
+            UNLOCK_SCRIPT,
+            1,
+            f"lock:{name}",
+            token,
+        )
+
+    async def aclose(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+        self._reader = self._writer = None
+
+
+def create_cache_backend(url: Optional[str]) -> CacheBackend:
+    """Build the configured backend: Redis for redis:// URLs, else in-process"""
+    scheme = urlparse(url).scheme if url else ""
+    if scheme in ("redis", "tcp"):
+        return RedisCacheBackend(url)
+    if url:
+        logger.warning(
+            "Unsupported CACHE_URL scheme %r (TLS is not supported), "
+            "using the in-process cache",
+            scheme,
+        )
+    return InMemoryCacheBackend()
+
+
+# Global cache instance
+cache_backend = create_cache_backend(settings.cache_url)
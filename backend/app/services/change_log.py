@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models import Anomaly, Post
+from app.services.snapshot_service import AnalyticsSnapshot, snapshot_store
+from app.utils.logger import debug_event, logger
+
+AnomalyKey = Tuple[int, str]
+
+
+def post_digest(post: Post) -> bytes:
+    """Content hash of a post; equal digests mean an unchanged post"""
+    content = f"{post.userId}\x1f{post.title}\x1f{post.body}".encode()
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+class VersionGoneError(Exception):
+    """The requested version is older than the retained history"""
+
+
+@dataclass(frozen=True)
+class VersionDelta:
+    """Entries that differ between two consecutive versions, as (before, after)"""
+
+    from_version: int
+    to_version: int
+    posts: Dict[int, Tuple[Optional[Post], Optional[Post]]] = field(
+        default_factory=dict
+    )
+    anomalies: Dict[AnomalyKey, Tuple[Optional[Anomaly], Optional[Anomaly]]] = field(
+        default_factory=dict
+    )
+
+
+@dataclass
+class DatasetChanges:
+    """Net changes between a past version and the current one"""
+
+    since_version: int
+    version: int
+    added: List[Post] = field(default_factory=list)
+    removed: List[Post] = field(default_factory=list)
+    modified: List[Post] = field(default_factory=list)
+    anomalies_raised: List[Anomaly] = field(default_factory=list)
+    anomalies_cleared: List[Anomaly] = field(default_factory=list)
+
+
+def _diff(before: Dict, after: Dict, changed) -> Dict:
+    delta = {key: (value, None) for key, value in before.items() if key not in after}
+    for key, value in after.items():
+        previous = before.get(key)
+        if previous is None or changed(previous, value):
+            delta[key] = (previous, value)
+    return delta
+
+
+def _compose(deltas: List[Dict]) -> Dict:
+    # Earliest "before" and latest "after" of every entry that changed
+    net: Dict = {}
+    for delta in deltas:
+        for key, (before, after) in delta.items():
+            net[key] = (net[key][0] if key in net else before, after)
+    return net
+
+
+class DatasetChangeLog:
+    """
+    Per-version deltas of posts and anomalies across snapshot refreshes
+
+    Each published snapshot is compared with the previous one once, through
+    maps of post ID to content digest and of (post ID, reason) to anomaly;
+    only the entries that differ are kept, for the last few versions.
+    Changes since a retained version are composed from those deltas, so a
+    query costs O(changed entries), not O(dataset).
+    """
+
+    def __init__(self, max_versions: int = 8):
+        self.max_versions = max_versions
+        self.version: Optional[int] = None
+        self._digests: Dict[int, bytes] = {}
+        self._posts: Dict[int, Post] = {}
+        self._anomalies: Dict[AnomalyKey, Anomaly] = {}
+        self._history: Deque[VersionDelta] = deque(maxlen=max_versions)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="change-log"
+        )
+        self._pending: Optional[Future] = None
+
+    @property
+    def oldest_version(self) -> Optional[int]:
+        """Oldest version changes can be requested since"""
+        return self._history[0].from_version if self._history else self.version
+
+    def record(self, snapshot: AnalyticsSnapshot) -> None:
+        """Digest a newly published snapshot and keep its delta"""
+        digests = {post.id: post_digest(post) for post in snapshot.posts}
+        posts = {post.id: post for post in snapshot.posts}
+        anomalies = {(a.id, a.reason): a for a in snapshot.anomalies}
+
+        with self._lock:
+            if self.version is not None and snapshot.version <= self.version:
+                # Versions restarted (e.g. a new cache): history no longer applies
+                logger.warning(
+                    "Snapshot version went from %s to %s, resetting change log",
+                    self.version,
+                    snapshot.version,
+                )
+                self._history.clear()
+            elif self.version is not None:
+                delta = VersionDelta(
+                    from_version=self.version,
+                    to_version=snapshot.version,
+                    posts=_diff(
+                        self._posts,
+                        posts,
+                        lambda old, new: self._digests[old.id] != digests[new.id],
+                    ),
+                    anomalies=_diff(
+                        self._anomalies, anomalies, lambda old, new: old != new
+                    ),
+                )
+                self._history.append(delta)
+                debug_event(
+                    "changes.recorded",
+                    version=snapshot.version,
+                    posts=len(delta.posts),
+                    anomalies=len(delta.anomalies),
+                )
+
+            self.version = snapshot.version
+            self._digests, self._posts, self._anomalies = digests, posts, anomalies
+
+    def changes_since(self, version: int) -> DatasetChanges:
+        """
+        Net changes of posts and anomalies since a retained version
+
+        Args:
+            version: Snapshot version the caller last saw
+
+        Returns:
+            DatasetChanges up to the current version
+
+        Raises:
+            VersionGoneError: If version is no longer (or was never) retained
+            ValueError: If version is newer than the current one
+        """
+        with self._lock:
+            if self.version is None or version > self.version:
+                raise ValueError(f"Version {version} has not been published")
+            deltas = [d for d in self._history if d.from_version >= version]
+            if version != self.version and (
+                not deltas or deltas[0].from_version != version
+            ):
+                raise VersionGoneError(
+                    f"Version {version} is no longer retained; "
+                    f"oldest is {self.oldest_version}"
+                )
+            current = self.version
+
+        changes = DatasetChanges(since_version=version, version=current)
+        for before, after in _compose([d.posts for d in deltas]).values():
+            if before is None and after is not None:
+                changes.added.append(after)
+            elif after is None and before is not None:
+                changes.removed.append(before)
+            elif before is not None and post_digest(before) != post_digest(after):
+                changes.modified.append(after)
+        for before, after in _compose([d.anomalies for d in deltas]).values():
+            if after is not None and before != after:
+                changes.anomalies_raised.append(after)
+            elif after is None and before is not None:
+                changes.anomalies_cleared.append(before)
+
+        for posts in (changes.added, changes.removed, changes.modified):
+            posts.sort(key=lambda post: post.id)
+        for anomalies in (changes.anomalies_raised, changes.anomalies_cleared):
+            anomalies.sort(key=lambda anomaly: (anomaly.id, anomaly.reason))
+        return changes
+
+    def _log_failure(self, future: Future) -> None:
+        if future.exception() is not None:
+            logger.error("Change log recording failed: %s", future.exception())
+
+    def on_snapshot(
+        self, previous: Optional[AnalyticsSnapshot], current: AnalyticsSnapshot
+    ) -> None:
+        """Snapshot listener: digest the new snapshot in the background"""
+        self._pending = self._executor.submit(self.record, current)
+        self._pending.add_done_callback(self._log_failure)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until snapshots published so far have been recorded"""
+        if self._pending is not None:
+            self._pending.exception(timeout)
+
+    async def settled(self) -> None:
+        """Wait, without blocking the loop, for pending snapshots to be recorded"""
+        pending = self._pending
+        if pending is not None and not pending.done():
+            await asyncio.wait({asyncio.wrap_future(pending)})
+
+
+# Global change log following the published snapshot
+change_log = DatasetChangeLog(settings.change_log_versions)
+
+snapshot_store.add_listener(change_log.on_snapshot)
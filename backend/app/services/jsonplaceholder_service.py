@@ -1,15 +1,146 @@
-import httpx
-from typing import List, Optional
+import asyncio
+import hashlib
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+from app.config import settings
 from app.models import Post
+from app.services.cache_backend import (
+    CacheBackend,
+    cache_backend,
+    compress_payload,
+    decode_payload,
+    dump_payload,
+)
+from app.services.post_store import PostStore
+from app.services.resilience import CircuitBreaker, ResilientClient, UpstreamError
+from app.utils.json_stream import JsonArrayParser
 from app.utils.logger import logger
 
+# Last good upstream response, shared with other replicas
+UPSTREAM_POSTS_KEY = "upstream:posts"
+
+
+def _encode_posts_data(
+    posts_data: list, shared_digest: Optional[bytes]
+) -> Tuple[bytes, Optional[bytes]]:
+    # Digest of the serialized feed, and the payload unless it is unchanged
+    raw = dump_payload(posts_data)
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    return digest, None if digest == shared_digest else compress_payload(raw)
+
 
 class JSONPlaceholderService:
     """Service for interacting with JSONPlaceholder API"""
 
-    def __init__(self):
-        self.base_url = "https://jsonplaceholder.typicode.com"
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        client: Optional[ResilientClient] = None,
+        shared_cache: Optional[CacheBackend] = None,
+        store: Optional[PostStore] = None,
+    ):
+        self.base_url = base_url or settings.upstream_base_url
         self.cache = {}
+        self.shared_cache = shared_cache or cache_backend
+        # Successful full fetches so far, and the newest one shared
+        self._fetch_generation = 0
+        self._shared_generation = 0
+        self._shared_digest: Optional[bytes] = None
+        self._shared_at = 0.0
+        # Optional persistent store fed with every successful full fetch;
+        # the app's lifespan attaches the configured one
+        self.store = store
+        self.max_concurrent_requests = 8
+        # Serve the last successful response when upstream is unavailable
+        self.serve_stale = True
+        self.stale_ttl = 24 * 60 * 60.0
+        self.client = client or ResilientClient(
+            attempt_timeout=settings.upstream_attempt_timeout_seconds,
+            max_retries=settings.upstream_max_retries,
+            hedging_enabled=settings.upstream_hedging_enabled,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.upstream_circuit_failure_threshold,
+                reset_timeout=settings.upstream_circuit_reset_seconds,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """Close pooled upstream connections"""
+        await self.client.aclose()
+
+    async def _fetch_posts_data(self, params: Optional[dict] = None) -> list:
+        response = await self.client.get(f"{self.base_url}/posts", params=params)
+        return response.json()
+
+    async def _remember_posts_data(self, posts_data: list) -> None:
+        self.cache["posts"] = posts_data
+        if not self.shared_cache.is_shared:
+            return
+
+        self._fetch_generation += 1
+        generation = self._fetch_generation
+        # An unchanged feed is rewritten only when its entry nears expiry
+        fresh = time.monotonic() - self._shared_at < self.stale_ttl / 2
+        digest, payload = await asyncio.to_thread(
+            _encode_posts_data, posts_data, self._shared_digest if fresh else None
+        )
+        # Written once per fetch generation: skip feeds that are unchanged or
+        # already superseded by a newer fetch that finished encoding first
+        if payload is None or generation <= self._shared_generation:
+            return
+        self._shared_generation, self._shared_digest = generation, digest
+        self._shared_at = time.monotonic()
+        await self.shared_cache.set(UPSTREAM_POSTS_KEY, payload, self.stale_ttl)
+
+    async def _persist_posts_data(self, posts_data: list) -> None:
+        if self.store is None:
+            return
+        try:
+            await asyncio.to_thread(self.store.ingest, posts_data)
+        except Exception as e:
+            # Persistence is an optimization; never fail the fetch over it
+            logger.error("Failed to persist posts: %s", e)
+
+    async def _stale_posts_data(
+        self, error: UpstreamError, user_id: Optional[int] = None
+    ) -> list:
+        if not self.serve_stale:
+            raise error
+
+        cached = self.cache.get("posts")
+        if cached is None and self.shared_cache.is_shared:
+            data = await self.shared_cache.get(UPSTREAM_POSTS_KEY)
+            cached = decode_payload(data) if data is not None else None
+        if cached is None:
+            raise error
+
+        logger.warning("Upstream unavailable (%s), serving cached posts", error)
+        if user_id is None:
+            return cached
+        return [post_data for post_data in cached if post_data["userId"] == user_id]
+
+    async def get_posts_data(self) -> list:
+        """
+        Fetch all posts from JSONPlaceholder API as raw dictionaries
+
+        For bulk consumers that do not need Post objects; the feed is kept
+        for stale serving and persisted exactly as by get_posts.
+
+        Returns:
+            List of post dictionaries in feed order
+
+        Raises:
+            CircuitOpenError: If upstream is unhealthy and nothing is cached
+            UpstreamError: If the posts could not be fetched
+        """
+        try:
+            posts_data = await self._fetch_posts_data()
+            await self._remember_posts_data(posts_data)
+            await self._persist_posts_data(posts_data)
+            return posts_data
+        except UpstreamError as e:
+            logger.error("Upstream error occurred: %s", e)
+            return await self._stale_posts_data(e)
 
     async def get_posts(self, limit: Optional[int] = None) -> List[Post]:
         """
@@ -20,36 +151,112 @@ class JSONPlaceholderService:
 
         Returns:
             List of Post objects
+
+        Raises:
+            CircuitOpenError: If upstream is unhealthy and nothing is cached
+            UpstreamError: If the posts could not be fetched
         """
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.base_url}/posts"
-                response = await client.get(url, timeout=10.0)
-                response.raise_for_status()
-
-                posts_data = response.json()
-
-                # Apply limit if specified
-                if limit:
-                    posts_data = posts_data[:limit]
-
-                # Convert to Post objects
-                posts = [Post(**post_data) for post_data in posts_data]
-
-                logger.info(
-                    f"Successfully fetched {len(posts)} posts from JSONPlaceholder API"
-                )
-                return posts
-
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred: {e.response.status_code}")
-            raise Exception(f"Failed to fetch posts: HTTP {e.response.status_code}")
-        except httpx.RequestError as e:
-            logger.error(f"Request error occurred: {e}")
-            raise Exception(f"Failed to fetch posts: {str(e)}")
+            posts_data = await self.get_posts_data()
+
+            # Apply limit if specified
+            if limit:
+                posts_data = posts_data[:limit]
+
+            # Convert to Post objects
+            posts = [Post(**post_data) for post_data in posts_data]
+
+            logger.info(
+                "Successfully fetched %s posts from JSONPlaceholder API", len(posts)
+            )
+            return posts
+
+        except UpstreamError:
+            raise
         except Exception as e:
-            logger.error(f"Unexpected error occurred: {e}")
-            raise Exception(f"Failed to fetch posts: {str(e)}")
+            logger.error("Unexpected error occurred: %s", e)
+            raise UpstreamError(f"Failed to fetch posts: {str(e)}")
+
+    async def stream_posts(
+        self, limit: Optional[int] = None, batch_size: Optional[int] = None
+    ) -> AsyncIterator[List[Post]]:
+        """
+        Stream posts from JSONPlaceholder API in batches as they download
+
+        The response body is parsed incrementally, so memory is bounded by
+        the batch size rather than the feed size, and callers can analyze
+        each batch while the rest is still arriving. Unlike get_posts, the
+        feed is not kept for stale serving or persisted. A failure before
+        the first batch, including a broken or malformed body, falls back
+        to the last good feed.
+
+        Args:
+            limit: Optional limit on number of posts; stops reading early
+            batch_size: Posts per batch (default: INGEST_BATCH_SIZE)
+
+        Yields:
+            Lists of Post objects in feed order
+
+        Raises:
+            CircuitOpenError: If upstream is unhealthy and nothing is cached
+            UpstreamError: If the posts could not be fetched or parsed
+        """
+        batch_size = batch_size or settings.ingest_batch_size
+        remaining = limit or None
+        total = 0
+
+        def take(items: list) -> List[Post]:
+            nonlocal remaining
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+            return [Post(**post_data) for post_data in items]
+
+        try:
+            try:
+                async with self.client.stream(f"{self.base_url}/posts") as response:
+                    parser = JsonArrayParser()
+                    pending: list = []
+                    try:
+                        async for chunk in response.aiter_bytes():
+                            pending.extend(parser.feed(chunk))
+                            while len(pending) >= batch_size and remaining != 0:
+                                batch = take(pending[:batch_size])
+                                del pending[:batch_size]
+                                total += len(batch)
+                                yield batch
+                            if remaining == 0:
+                                break  # Closing the response stops the download
+                        else:
+                            pending.extend(parser.close())
+                        if pending and remaining != 0:
+                            batch = take(pending)
+                            total += len(batch)
+                            yield batch
+                    except ValueError as e:
+                        # A malformed body is upstream's failure, like a failed read
+                        raise UpstreamError(f"Malformed response body: {str(e)}")
+            except UpstreamError as e:
+                if total:
+                    raise
+                logger.error("Upstream error occurred: %s", e)
+                posts_data = await self._stale_posts_data(e)
+                for start in range(0, len(posts_data), batch_size):
+                    if remaining == 0:
+                        break
+                    batch = take(posts_data[start : start + batch_size])
+                    total += len(batch)
+                    yield batch
+
+            logger.info(
+                "Successfully streamed %s posts from JSONPlaceholder API", total
+            )
+
+        except UpstreamError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error occurred: %s", e)
+            raise UpstreamError(f"Failed to stream posts: {str(e)}")
 
     async def get_posts_by_user(self, user_id: int) -> List[Post]:
         """
@@ -60,33 +267,49 @@ class JSONPlaceholderService:
 
         Returns:
             List of Post objects for the user
+
+        Raises:
+            CircuitOpenError: If upstream is unhealthy and nothing is cached
+            UpstreamError: If the posts could not be fetched
         """
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.base_url}/posts"
-                params = {"userId": user_id}
-                response = await client.get(url, params=params, timeout=10.0)
-                response.raise_for_status()
-
-                posts_data = response.json()
-                posts = [Post(**post_data) for post_data in posts_data]
-
-                logger.info(
-                    f"Successfully fetched {len(posts)} posts for user {user_id}"
-                )
-                return posts
-
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred: {e.response.status_code}")
-            raise Exception(
-                f"Failed to fetch posts for user {user_id}: HTTP {e.response.status_code}"
+            try:
+                posts_data = await self._fetch_posts_data({"userId": user_id})
+            except UpstreamError as e:
+                logger.error("Upstream error occurred: %s", e)
+                posts_data = await self._stale_posts_data(e, user_id)
+
+            posts = [Post(**post_data) for post_data in posts_data]
+
+            logger.info(
+                "Successfully fetched %s posts for user %s", len(posts), user_id
             )
-        except httpx.RequestError as e:
-            logger.error(f"Request error occurred: {e}")
-            raise Exception(f"Failed to fetch posts for user {user_id}: {str(e)}")
+            return posts
+
+        except UpstreamError:
+            raise
         except Exception as e:
-            logger.error(f"Unexpected error occurred: {e}")
-            raise Exception(f"Failed to fetch posts for user {user_id}: {str(e)}")
+            logger.error("Unexpected error occurred: %s", e)
+            raise UpstreamError(f"Failed to fetch posts for user {user_id}: {str(e)}")
+
+    async def get_posts_by_users(self, user_ids: List[int]) -> List[Post]:
+        """
+        Fetch posts for several users with bounded upstream concurrency
+
+        Args:
+            user_ids: The user IDs to fetch posts for
+
+        Returns:
+            List of Post objects grouped in the order of user_ids
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def fetch(user_id: int) -> List[Post]:
+            async with semaphore:
+                return await self.get_posts_by_user(user_id)
+
+        results = await asyncio.gather(*(fetch(user_id) for user_id in user_ids))
+        return [post for user_posts in results for post in user_posts]
 
 
 # Global service instance
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.models import Anomaly, Post
+from app.services.anomaly_detector import anomaly_detector
+
+if TYPE_CHECKING:
+    import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    title_length INTEGER NOT NULL,
+    ingested_at REAL NOT NULL
+);
+-- The (user_id, title) prefix also serves plain user_id lookups
+CREATE INDEX IF NOT EXISTS idx_posts_user_title ON posts (user_id, title);
+CREATE INDEX IF NOT EXISTS idx_posts_title_length ON posts (title_length);
+
+-- Last ingestion time and digest of the ingested feed
+CREATE TABLE IF NOT EXISTS ingest_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    title, body, content='posts', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, title, body)
+    VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, body)
+    VALUES ('delete', old.id, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, body)
+    VALUES ('delete', old.id, old.title, old.body);
+    INSERT INTO posts_fts (rowid, title, body)
+    VALUES (new.id, new.title, new.body);
+END;
+"""
+
+UPSERT = """
+INSERT INTO posts (id, user_id, title, body, title_length, ingested_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    user_id = excluded.user_id,
+    title = excluded.title,
+    body = excluded.body,
+    title_length = excluded.title_length
+WHERE posts.user_id != excluded.user_id
+    OR posts.title != excluded.title
+    OR posts.body != excluded.body
+"""
+
+
+def _fts_query(query: str) -> str:
+    # Quote every token so user input can never be parsed as FTS syntax;
+    # "a b OR c" keeps its meaning of (a AND b) OR c
+    clauses = []
+    for clause in re.split(r"\s+OR\s+", query.strip()):
+        tokens = re.findall(r"\w+", clause.lower())
+        if tokens:
+            clauses.append("(" + " ".join(f'"{token}"' for token in tokens) + ")")
+    return " OR ".join(clauses)
+
+
+class PostStore:
+    """
+    Embedded SQLite store for ingested posts with indexed analytics queries
+
+    Queries are only answered from the store while its dataset is fresh:
+    ingested within max_age seconds (by a background refresh or an
+    on-demand fetch). A database left over from an earlier run, or one no
+    longer being fed, makes callers fall back to upstream instead.
+    """
+
+    def __init__(self, path: str, max_age: float = 900.0):
+        self.path = path
+        self.max_age = max_age
+        import sqlite3
+
+        self._lock = threading.Lock()
+        self._conn: "sqlite3.Connection" = sqlite3.connect(
+            path, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        meta = dict(self._query("SELECT key, value FROM ingest_meta", []))
+        self.ingested_at: Optional[float] = (
+            float(meta["ingested_at"]) if "ingested_at" in meta else None
+        )
+        self._digest: Optional[str] = meta.get("digest")
+        self._has_posts = self.count() > 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether queries may be answered from the stored dataset"""
+        return (
+            self._has_posts
+            and self.ingested_at is not None
+            and time.time() - self.ingested_at <= self.max_age
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def ingest(self, posts_data: Iterable[dict]) -> int:
+        """
+        Replace the stored dataset with a freshly fetched one in one transaction
+
+        Unchanged rows are left untouched (keeping their FTS entries and first
+        ingestion time); rows missing from the new dataset are deleted. A
+        dataset identical to the last one ingested only renews the ingestion
+        time.
+
+        Args:
+            posts_data: Raw post dictionaries as returned by the upstream API
+
+        Returns:
+            Number of posts in the new dataset
+        """
+        now = time.time()
+        rows = [
+            (p["id"], p["userId"], p["title"], p["body"], len(p["title"]), now)
+            for p in posts_data
+        ]
+        digest = hashlib.blake2b(
+            json.dumps([row[:4] for row in rows]).encode(), digest_size=16
+        ).hexdigest()
+        meta = [("ingested_at", repr(now)), ("digest", digest)]
+
+        with self._lock, self._conn:
+            if digest != self._digest:
+                self._conn.executemany(UPSERT, rows)
+                self._conn.execute(
+                    "DELETE FROM posts WHERE id NOT IN (SELECT value FROM json_each(?))",
+                    (json.dumps([row[0] for row in rows]),),
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ingest_meta (key, value) VALUES (?, ?)", meta
+            )
+        self._digest, self.ingested_at = digest, now
+        self._has_posts = bool(rows)
+        return len(rows)
+
+    def _source(
+        self, limit: Optional[int], user_ids: Sequence[int]
+    ) -> Tuple[str, list]:
+        # Subquery for "the first `limit` posts, optionally for some users"
+        source, params = "posts", []
+        if limit:
+            source = "(SELECT * FROM posts ORDER BY id LIMIT ?)"
+            params.append(limit)
+        if user_ids:
+            placeholders = ",".join("?" * len(user_ids))
+            source = f"(SELECT * FROM {source} WHERE user_id IN ({placeholders}))"
+            params.extend(user_ids)
+        return source, params
+
+    def _query(self, sql: str, params: Sequence) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_posts(
+        self,
+        limit: Optional[int] = None,
+        user_ids: Sequence[int] = (),
+        include_body: bool = True,
+    ) -> List[Post]:
+        """
+        Return stored posts in id order, filtered by user and then limited
+
+        Bodies are left empty (and never read) when include_body is False.
+        """
+        rows = self.get_post_rows(limit, user_ids, include_body)
+        return [Post(userId=u, id=i, title=t, body=b) for u, i, t, b in rows]
+
+    def get_post_rows(
+        self,
+        limit: Optional[int] = None,
+        user_ids: Sequence[int] = (),
+        include_body: bool = True,
+    ) -> List[tuple]:
+        """Like get_posts, as (userId, id, title, body) tuples"""
+        body = "body" if include_body else "''"
+        sql, params = f"SELECT user_id, id, title, {body} FROM posts", []
+        if user_ids:
+            sql += f" WHERE user_id IN ({','.join('?' * len(user_ids))})"
+            params.extend(user_ids)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(limit or -1)
+        return self._query(sql, params)
+
+    def detect_anomalies(
+        self,
+        limit: Optional[int] = None,
+        user_ids: Sequence[int] = (),
+        include_details: bool = True,
+    ) -> List[Anomaly]:
+        """
+        Detect the same anomalies as AnomalyDetector using indexed queries
+
+        Args:
+            limit: Only analyze the first `limit` posts
+            user_ids: Only analyze posts by these users
+            include_details: Format the details message
+
+        Returns:
+            List of Anomaly objects (short titles, duplicates, bot-like)
+        """
+        short_threshold = anomaly_detector.short_title_threshold
+        bot_threshold = anomaly_detector.bot_detection_threshold
+        source, params = self._source(limit, user_ids)
+        anomalies = []
+
+        for user_id, post_id, title, length in self._query(
+            f"SELECT user_id, id, title, title_length FROM {source} "
+            "WHERE title_length < ? ORDER BY id",
+            [*params, short_threshold],
+        ):
+            anomalies.append(
+                Anomaly(
+                    userId=user_id,
+                    id=post_id,
+                    title=title,
+                    reason="short_title",
+                    details=f"Title length ({length}) is below threshold ({short_threshold})"
+                    if include_details
+                    else None,
+                )
+            )
+
+        duplicates = self._query(
+            f"WITH src AS (SELECT id, user_id, title FROM {source}), "
+            "dup AS (SELECT user_id, title, COUNT(*) AS n FROM src "
+            "GROUP BY user_id, title HAVING n > 1) "
+            "SELECT src.user_id, src.id, src.title, dup.n FROM src "
+            "JOIN dup ON dup.user_id = src.user_id AND dup.title = src.title "
+            "ORDER BY src.id",
+            params,
+        )
+        for user_id, post_id, title, count in duplicates:
+            anomalies.append(
+                Anomaly(
+                    userId=user_id,
+                    id=post_id,
+                    title=title,
+                    reason="duplicate_title",
+                    details=f"User has {count} posts with identical title"
+                    if include_details
+                    else None,
+                )
+            )
+
+        for user_id, post_id, title, count in sorted(
+            (row for row in duplicates if row[3] >= bot_threshold),
+            key=lambda row: (row[0], row[2], row[1]),
+        ):
+            anomalies.append(
+                Anomaly(
+                    userId=user_id,
+                    id=post_id,
+                    title=title,
+                    reason="bot_like_behavior",
+                    details=f"User has {count} posts with identical title"
+                    if include_details
+                    else None,
+                )
+            )
+
+        return anomalies
+
+    def search(
+        self, query: str, user_id: Optional[int] = None, limit: int = 20
+    ) -> List[Post]:
+        """
+        Full-text search over titles and bodies ranked by BM25
+
+        Args:
+            query: Free text; all tokens must match, clauses separated by OR
+            user_id: Optional author filter
+            limit: Maximum number of results
+
+        Returns:
+            Matching posts, best match first
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT p.user_id, p.id, p.title, p.body FROM posts_fts "
+            "JOIN posts p ON p.id = posts_fts.rowid WHERE posts_fts MATCH ?"
+        )
+        params: list = [match]
+        if user_id is not None:
+            sql += " AND p.user_id = ?"
+            params.append(user_id)
+        sql += " ORDER BY bm25(posts_fts) LIMIT ?"
+        params.append(limit)
+
+        rows = self._query(sql, params)
+        return [Post(userId=u, id=i, title=t, body=b) for u, i, t, b in rows]
+
+
+def open_post_store() -> Optional[PostStore]:
+    """Open the store configured by SQLITE_PATH, or None when it is unset"""
+    if not settings.sqlite_path:
+        return None
+    return PostStore(settings.sqlite_path, settings.sqlite_max_age_seconds)
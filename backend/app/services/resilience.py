@@ -0,0 +1,359 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Optional
+
+from app.utils.errors import ServiceUnavailableError
+from app.utils.logger import logger
+
+if TYPE_CHECKING:
+    import httpx
+
+
+def _httpx():
+    # httpx is imported on first use to keep it off the cold-start path
+    import httpx
+
+    return httpx
+
+
+class UpstreamError(Exception):
+    """Raised when the upstream API fails after all resilience measures"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(UpstreamError, ServiceUnavailableError):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        ServiceUnavailableError.__init__(
+            self, "Upstream API is unavailable (circuit open)", retry_after
+        )
+        self.status_code = None
+
+
+class _RetryableStatusError(Exception):
+    def __init__(self, response: "httpx.Response"):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+class CircuitBreaker:
+    """Classic closed/open/half-open circuit breaker"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._reset_elapsed():
+            return self.HALF_OPEN
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def _reset_elapsed(self) -> bool:
+        return self._clock() - self._opened_at >= self.reset_timeout
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go upstream (one probe when half-open)"""
+        if self._state == self.CLOSED:
+            return True
+        if self._state == self.OPEN and self._reset_elapsed():
+            self._state = self.HALF_OPEN
+        if self._state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def release(self) -> None:
+        """End a call whose outcome says nothing about upstream health"""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning("Upstream circuit breaker opened")
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies for percentile estimates"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: deque = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Return the given latency percentile, or None without enough samples"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index]
+
+
+class ResilientClient:
+    """
+    GET-only upstream client with per-attempt timeouts, jittered exponential
+    backoff retries, optional hedged requests and a circuit breaker
+    """
+
+    def __init__(
+        self,
+        attempt_timeout: float = 3.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        hedging_enabled: bool = False,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedging_enabled = hedging_enabled
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self._transport = transport
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        # One pooled client keeps connections alive across calls
+        if not self.is_open:
+            self._client = _httpx().AsyncClient(transport=self._transport)
+        return self._client
+
+    async def open(self) -> None:
+        """Create the pooled client ahead of the first request"""
+        # Building the TLS context is CPU bound, keep it off the event loop
+        await asyncio.to_thread(self._get_client)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform between 0 and the capped exponential delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedging_enabled:
+            return None
+        return self.latency.percentile(0.95)
+
+    async def _send(self, url: str, params: Optional[Dict]) -> "httpx.Response":
+        started = time.monotonic()
+        response = await asyncio.wait_for(
+            self._get_client().get(url, params=params), timeout=self.attempt_timeout
+        )
+        self.latency.record(time.monotonic() - started)
+
+        if response.status_code >= 500 or response.status_code == 429:
+            raise _RetryableStatusError(response)
+        return response
+
+    async def _attempt(self, url: str, params: Optional[Dict]) -> "httpx.Response":
+        primary = asyncio.ensure_future(self._send(url, params))
+        delay = self._hedge_delay()
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        # Primary is slower than p95: race a hedged duplicate against it
+        pending = {primary, asyncio.ensure_future(self._send(url, params))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get(self, url: str, params: Optional[Dict] = None) -> "httpx.Response":
+        """
+        Perform a GET request with retries, hedging and circuit breaking
+
+        Args:
+            url: Absolute URL to fetch
+            params: Optional query parameters
+
+        Returns:
+            Successful (2xx/3xx) httpx.Response
+
+        Raises:
+            CircuitOpenError: If the breaker is open and the call was not attempted
+            UpstreamError: If the call failed with a client error or ran out of retries
+        """
+        last_error = "no attempt made"
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(self.breaker.retry_after)
+
+            try:
+                response = await self._attempt(url, params)
+            except _RetryableStatusError as e:
+                last_error = str(e)
+                status_code = e.response.status_code
+            except (_httpx().RequestError, asyncio.TimeoutError) as e:
+                last_error = str(e) or type(e).__name__
+                status_code = None
+            else:
+                # 4xx means upstream is healthy but rejected the request
+                self.breaker.record_success()
+                if response.is_error:
+                    raise UpstreamError(
+                        f"HTTP {response.status_code}", response.status_code
+                    )
+                return response
+
+            self.breaker.record_failure()
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                logger.warning(
+                    "Upstream attempt %s failed (%s), retrying in %.2fs",
+                    attempt + 1,
+                    last_error,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+        raise UpstreamError(last_error, status_code)
+
+    @asynccontextmanager
+    async def stream(
+        self, url: str, params: Optional[Dict] = None
+    ) -> AsyncIterator["httpx.Response"]:
+        """
+        Open a GET whose body is read incrementally by the caller
+
+        Retries cover connecting and the response headers; once the body is
+        being read nothing is retried, since part of it may already have
+        been consumed. The circuit breaker records the call when the body
+        block exits: a failed body read, or an UpstreamError raised by the
+        caller (e.g. for a malformed body), counts as a failure. Hedging
+        does not apply.
+
+        Args:
+            url: Absolute URL to fetch
+            params: Optional query parameters
+
+        Yields:
+            Successful (2xx/3xx) httpx.Response with an unread body
+
+        Raises:
+            CircuitOpenError: If the breaker is open and the call was not attempted
+            UpstreamError: If the call failed with a client error or ran out of retries
+        """
+        last_error = "no attempt made"
+        status_code = None
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(self.breaker.retry_after)
+
+            client = self._get_client()
+            try:
+                response = await asyncio.wait_for(
+                    client.send(
+                        client.build_request("GET", url, params=params), stream=True
+                    ),
+                    timeout=self.attempt_timeout,
+                )
+            except (_httpx().RequestError, asyncio.TimeoutError) as e:
+                last_error = str(e) or type(e).__name__
+                status_code = None
+            else:
+                if response.status_code >= 500 or response.status_code == 429:
+                    await response.aclose()
+                    last_error = f"HTTP {response.status_code}"
+                    status_code = response.status_code
+                elif response.is_error:
+                    # 4xx means upstream is healthy but rejected the request
+                    self.breaker.record_success()
+                    await response.aclose()
+                    raise UpstreamError(
+                        f"HTTP {response.status_code}", response.status_code
+                    )
+                else:
+                    try:
+                        yield response
+                    except _httpx().HTTPError as e:
+                        self.breaker.record_failure()
+                        raise UpstreamError(
+                            f"Failed to read response body: {str(e) or type(e).__name__}"
+                        ) from e
+                    except UpstreamError:
+                        self.breaker.record_failure()
+                        raise
+                    except BaseException:
+                        self.breaker.release()
+                        raise
+                    else:
+                        self.breaker.record_success()
+                    finally:
+                        await response.aclose()
+                    return
+
+            self.breaker.record_failure()
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                logger.warning(
+                    "Upstream attempt %s failed (%s), retrying in %.2fs",
+                    attempt + 1,
+                    last_error,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+        raise UpstreamError(last_error, status_code)
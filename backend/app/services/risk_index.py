@@ -0,0 +1,197 @@
+import asyncio
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.models import Anomaly, UserRisk
+from app.services.snapshot_service import AnalyticsSnapshot, snapshot_store
+from app.utils.logger import debug_event, logger
+
+# Weights of the risk score components: the short-title and duplicate ratios
+# (both in [0, 1]) and the number of bot-like clusters of identical titles
+SHORT_TITLE_WEIGHT = 1.0
+DUPLICATE_WEIGHT = 1.0
+BOT_CLUSTER_WEIGHT = 1.0
+
+
+@dataclass(frozen=True)
+class RiskStats:
+    """Anomaly counts of one user, from which the risk score is derived"""
+
+    posts: int
+    short_titles: int = 0
+    duplicate_posts: int = 0
+    bot_clusters: int = 0
+
+    @property
+    def score(self) -> float:
+        posts = max(self.posts, 1)
+        return round(
+            SHORT_TITLE_WEIGHT * self.short_titles / posts
+            + DUPLICATE_WEIGHT * self.duplicate_posts / posts
+            + BOT_CLUSTER_WEIGHT * self.bot_clusters,
+            4,
+        )
+
+
+def risk_stats(
+    post_counts: Mapping[int, int], anomalies: Iterable[Anomaly]
+) -> Dict[int, RiskStats]:
+    """
+    Aggregate per-user risk statistics
+
+    Args:
+        post_counts: Number of posts per user
+        anomalies: Anomalies detected in those posts
+
+    Returns:
+        RiskStats for every user with posts
+    """
+    short: Counter = Counter()
+    duplicates: Counter = Counter()
+    clusters: Dict[int, set] = {}
+    for anomaly in anomalies:
+        if anomaly.reason == "short_title":
+            short[anomaly.userId] += 1
+        elif anomaly.reason == "duplicate_title":
+            duplicates[anomaly.userId] += 1
+        elif anomaly.reason == "bot_like_behavior":
+            clusters.setdefault(anomaly.userId, set()).add(anomaly.title)
+
+    return {
+        user_id: RiskStats(
+            posts=posts,
+            short_titles=short[user_id],
+            duplicate_posts=duplicates[user_id],
+            bot_clusters=len(clusters.get(user_id, ())),
+        )
+        for user_id, posts in post_counts.items()
+    }
+
+
+class UserRiskIndex:
+    """
+    Users ordered by risk score, maintained as the dataset changes
+
+    Entries are kept in a sorted list of (-score, userId): replacing the
+    dataset only moves users whose statistics changed (a binary search
+    each), and the k riskiest users are a slice of the list. Updates are
+    made on copies that are swapped in when complete, so readers never see
+    a half-applied dataset and never wait for a writer.
+    """
+
+    def __init__(self):
+        # (stats, order, snapshot version), replaced as a whole on update
+        self._state: Tuple[
+            Dict[int, RiskStats], List[Tuple[float, int]], Optional[int]
+        ] = ({}, [], None)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="risk-index"
+        )
+        self._pending: Optional[Future] = None
+
+    @property
+    def version(self) -> Optional[int]:
+        """Snapshot version the index reflects, if built from one"""
+        return self._state[2]
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    def frozen(self) -> "UserRiskIndex":
+        """A read-only view of the current state, unaffected by later updates"""
+        view = UserRiskIndex.__new__(UserRiskIndex)
+        view._state = self._state
+        return view
+
+    def replace(
+        self, stats: Mapping[int, RiskStats], version: Optional[int] = None
+    ) -> int:
+        """
+        Bring the index in line with a new dataset
+
+        Args:
+            stats: RiskStats of every user in the dataset
+            version: Snapshot version the dataset comes from, if any
+
+        Returns:
+            Number of users added, moved or removed
+        """
+        changed = 0
+        with self._lock:
+            current_stats, current_order, _ = self._state
+            new_stats, order = dict(current_stats), list(current_order)
+
+            def remove(user_id: int) -> None:
+                entry = (-new_stats.pop(user_id).score, user_id)
+                del order[bisect_left(order, entry)]
+
+            for user_id in [u for u in new_stats if u not in stats]:
+                remove(user_id)
+                changed += 1
+            for user_id, user_stats in stats.items():
+                current = new_stats.get(user_id)
+                if current == user_stats:
+                    continue
+                if current is not None:
+                    remove(user_id)
+                new_stats[user_id] = user_stats
+                insort(order, (-user_stats.score, user_id))
+                changed += 1
+            self._state = (new_stats, order, version)
+        debug_event("risk_index.updated", users=len(new_stats), changed=changed)
+        return changed
+
+    def apply_snapshot(self, snapshot: AnalyticsSnapshot) -> None:
+        """Update the index from a published snapshot"""
+        post_counts = {
+            user_id: len(posts) for user_id, posts in snapshot.posts_by_user.items()
+        }
+        self.replace(risk_stats(post_counts, snapshot.anomalies), snapshot.version)
+
+    def top(self, k: int) -> List[UserRisk]:
+        """The k riskiest users, highest score first (ties by user ID)"""
+        stats, order, _ = self._state
+        return [
+            UserRisk(
+                userId=user_id,
+                score=stats[user_id].score,
+                totalPosts=stats[user_id].posts,
+                shortTitles=stats[user_id].short_titles,
+                duplicatePosts=stats[user_id].duplicate_posts,
+                botClusters=stats[user_id].bot_clusters,
+            )
+            for _, user_id in order[:k]
+        ]
+
+    def _log_failure(self, future: Future) -> None:
+        if future.exception() is not None:
+            logger.error("Risk index update failed: %s", future.exception())
+
+    def on_snapshot(
+        self, previous: Optional[AnalyticsSnapshot], current: AnalyticsSnapshot
+    ) -> None:
+        """Snapshot listener: update the index in the background"""
+        self._pending = self._executor.submit(self.apply_snapshot, current)
+        self._pending.add_done_callback(self._log_failure)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until snapshots published so far have been applied"""
+        if self._pending is not None:
+            self._pending.exception(timeout)
+
+    async def settled(self) -> None:
+        """Wait, without blocking the loop, for pending snapshots to be applied"""
+        pending = self._pending
+        if pending is not None and not pending.done():
+            await asyncio.wait({asyncio.wrap_future(pending)})
+
+
+# Global index following the published snapshot
+risk_index = UserRiskIndex()
+
+snapshot_store.add_listener(risk_index.on_snapshot)
@@ -0,0 +1,308 @@
+import asyncio
+import bisect
+import heapq
+import math
+import re
+import threading
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.models import Post
+from app.services.snapshot_service import AnalyticsSnapshot, snapshot_store
+from app.services.text_analyzer import text_analyzer
+from app.utils.logger import logger
+
+# Postings per compressed block; one skip entry is kept per block
+BLOCK_SIZE = 128
+
+
+def encode_varints(values: Iterable[int]) -> bytes:
+    """Encode non-negative integers as LEB128 varints"""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data: bytes) -> List[int]:
+    """Inverse of encode_varints"""
+    values, value, shift = [], 0, 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value, shift = 0, 0
+    return values
+
+
+class PostingList:
+    """
+    Sorted (doc id, term frequency) pairs for one term
+
+    Pairs are delta + varint coded in blocks of BLOCK_SIZE. The last doc id
+    of every block is kept uncompressed as a skip list, so lookups only
+    decode the blocks that can contain the requested ids.
+    """
+
+    __slots__ = ("blocks", "last_ids", "df")
+
+    def __init__(self, pairs: Sequence[Tuple[int, int]]):
+        self.blocks: List[bytes] = []
+        self.last_ids = array("q")
+        self.df = len(pairs)
+
+        previous = 0
+        for start in range(0, len(pairs), BLOCK_SIZE):
+            values = []
+            for doc_id, tf in pairs[start : start + BLOCK_SIZE]:
+                values.append(doc_id - previous)
+                values.append(tf)
+                previous = doc_id
+            self.blocks.append(encode_varints(values))
+            self.last_ids.append(previous)
+
+    def _block(self, index: int) -> List[Tuple[int, int]]:
+        values = decode_varints(self.blocks[index])
+        doc_id = self.last_ids[index - 1] if index else 0
+        pairs = []
+        for i in range(0, len(values), 2):
+            doc_id += values[i]
+            pairs.append((doc_id, values[i + 1]))
+        return pairs
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        for index in range(len(self.blocks)):
+            yield from self._block(index)
+
+    def lookup(self, doc_ids: Iterable[int]) -> Dict[int, int]:
+        """Return term frequencies for those of the sorted doc_ids in this list"""
+        found = {}
+        current, block = -1, {}
+        for doc_id in doc_ids:
+            index = bisect.bisect_left(self.last_ids, doc_id)
+            if index == len(self.last_ids):
+                break
+            if index != current:
+                current, block = index, dict(self._block(index))
+            tf = block.get(doc_id)
+            if tf is not None:
+                found[doc_id] = tf
+        return found
+
+
+@dataclass(frozen=True)
+class _IndexState:
+    postings: Dict[str, PostingList] = field(default_factory=dict)
+    docs: Dict[int, Post] = field(default_factory=dict)
+    lengths: Dict[int, int] = field(default_factory=dict)
+    by_user: Dict[int, List[int]] = field(default_factory=dict)
+    total_length: int = 0
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """
+    Split a query into OR-ed clauses of AND-ed terms
+
+    "apple pie OR banana" means (apple AND pie) OR banana. Terms go through
+    the same tokenizer as the indexed text.
+    """
+    clauses = []
+    for clause in re.split(r"\s+OR\s+", query.strip()):
+        terms = list(dict.fromkeys(text_analyzer.extract_words(clause)))
+        if terms:
+            clauses.append(terms)
+    return clauses
+
+
+class SearchIndex:
+    """In-memory inverted index over post titles and bodies with BM25 ranking"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # Replaced wholesale by update() so queries never see a partial state
+        self._state = _IndexState()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._state.docs)
+
+    @property
+    def document_count(self) -> int:
+        return len(self._state.docs)
+
+    def _terms(self, post: Post) -> Counter:
+        return Counter(text_analyzer.extract_words(f"{post.title} {post.body}"))
+
+    def update(self, posts: Iterable[Post]) -> bool:
+        """
+        Bring the index in line with a dataset, touching only what changed
+
+        Posting lists are rebuilt only for terms of added, edited or removed
+        posts; everything else is shared with the previous state.
+
+        Args:
+            posts: The full current dataset
+
+        Returns:
+            True if the index changed
+        """
+        with self._lock:
+            state = self._state
+            incoming = {post.id: post for post in posts}
+            removed = [doc_id for doc_id in state.docs if doc_id not in incoming]
+            changed = [
+                post for post in incoming.values() if state.docs.get(post.id) != post
+            ]
+            if not removed and not changed:
+                return False
+
+            docs, lengths = dict(state.docs), dict(state.lengths)
+            total_length = state.total_length
+            deltas: Dict[str, Dict[int, int]] = defaultdict(dict)
+            user_changes: Dict[int, Dict[int, bool]] = defaultdict(dict)
+
+            for doc_id in removed + [p.id for p in changed if p.id in docs]:
+                old = docs.pop(doc_id)
+                total_length -= lengths.pop(doc_id)
+                user_changes[old.userId][doc_id] = False
+                for term in self._terms(old):
+                    deltas[term][doc_id] = 0
+
+            for post in changed:
+                terms = self._terms(post)
+                docs[post.id] = post
+                lengths[post.id] = sum(terms.values())
+                total_length += lengths[post.id]
+                user_changes[post.userId][post.id] = True
+                for term, tf in terms.items():
+                    deltas[term][post.id] = tf
+
+            postings = dict(state.postings)
+            for term, delta in deltas.items():
+                merged = dict(postings[term].items()) if term in postings else {}
+                merged.update(delta)
+                pairs = sorted((d, tf) for d, tf in merged.items() if tf)
+                if pairs:
+                    postings[term] = PostingList(pairs)
+                else:
+                    postings.pop(term, None)
+
+            by_user = dict(state.by_user)
+            for user_id, changes in user_changes.items():
+                doc_ids = set(by_user.get(user_id, ()))
+                for doc_id, present in changes.items():
+                    if present:
+                        doc_ids.add(doc_id)
+                    else:
+                        doc_ids.discard(doc_id)
+                if doc_ids:
+                    by_user[user_id] = sorted(doc_ids)
+                else:
+                    by_user.pop(user_id, None)
+
+            self._state = _IndexState(postings, docs, lengths, by_user, total_length)
+            logger.info(
+                "Search index updated: %s added/changed, %s removed, %s terms rebuilt",
+                len(changed),
+                len(removed),
+                len(deltas),
+            )
+            return True
+
+    def search(
+        self, query: str, user_id: Optional[int] = None, limit: int = 20
+    ) -> List[Tuple[Post, float]]:
+        """
+        Find posts matching a query, best BM25 score first
+
+        Within a clause, terms are intersected rarest first so the common
+        terms only decode the blocks holding surviving candidates.
+
+        Args:
+            query: Terms to match; clauses separated by OR
+            user_id: Optional author filter
+            limit: Maximum number of results
+
+        Returns:
+            List of (post, score) tuples
+        """
+        state = self._state
+        if not state.docs:
+            return []
+
+        matches: Dict[int, Dict[str, int]] = {}
+        for terms in parse_query(query):
+            lists = [(term, state.postings.get(term)) for term in terms]
+            if any(plist is None for _, plist in lists):
+                continue
+            lists.sort(key=lambda item: item[1].df)
+
+            found = None
+            if user_id is not None:
+                found = {doc_id: {} for doc_id in state.by_user.get(user_id, ())}
+            for term, plist in lists:
+                if found is None:
+                    found = {doc_id: {term: tf} for doc_id, tf in plist.items()}
+                else:
+                    found = {
+                        doc_id: {**found[doc_id], term: tf}
+                        for doc_id, tf in plist.lookup(found).items()
+                    }
+                if not found:
+                    break
+
+            for doc_id, tfs in (found or {}).items():
+                matches.setdefault(doc_id, {}).update(tfs)
+
+        count = len(state.docs)
+        average_length = state.total_length / count or 1.0
+
+        def score(item: Tuple[int, Dict[str, int]]) -> float:
+            doc_id, tfs = item
+            norm = self.k1 * (
+                1 - self.b + self.b * state.lengths[doc_id] / average_length
+            )
+            total = 0.0
+            for term, tf in tfs.items():
+                df = state.postings[term].df
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                total += idf * tf * (self.k1 + 1) / (tf + norm)
+            return total
+
+        scored = ((doc_id, score((doc_id, tfs))) for doc_id, tfs in matches.items())
+        top = heapq.nlargest(limit, scored, key=lambda item: (item[1], -item[0]))
+        return [(state.docs[doc_id], value) for doc_id, value in top]
+
+    def on_snapshot(
+        self, previous: Optional[AnalyticsSnapshot], current: AnalyticsSnapshot
+    ) -> None:
+        """Snapshot listener: update the index off the event loop"""
+        if previous is not None and previous.posts is current.posts:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.update(current.posts)
+            return
+
+        future = loop.run_in_executor(None, self.update, current.posts)
+        future.add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Search index update failed: %s", future.exception())
+
+
+# Global index instance, kept in sync with published snapshots
+search_index = SearchIndex()
+snapshot_store.add_listener(search_index.on_snapshot)
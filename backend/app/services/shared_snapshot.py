@@ -0,0 +1,193 @@
+import asyncio
+import os
+import stat
+from typing import Optional
+
+from app.services.cache_backend import decode_payload, encode_payload
+from app.services.snapshot_service import (
+    AnalyticsSnapshot,
+    snapshot_from_payload,
+    snapshot_store,
+    snapshot_to_payload,
+)
+from app.utils.logger import logger
+
+# Name of the pointer file holding the current generation's file name
+CURRENT_POINTER = "CURRENT"
+
+
+def encode_snapshot(snapshot: AnalyticsSnapshot) -> bytes:
+    """Serialize a snapshot into a generation payload (compressed JSON)"""
+    return encode_payload(snapshot_to_payload(snapshot))
+
+
+def decode_snapshot(data: bytes) -> AnalyticsSnapshot:
+    """
+    Rebuild a snapshot from a generation payload
+
+    The payload is plain data, so a tampered file can at worst fail to
+    decode; it can never run code in the worker.
+    """
+    return snapshot_from_payload(decode_payload(data))
+
+
+def secure_directory(directory: str, create: bool = False) -> None:
+    """
+    Check that only the current user can write snapshot generations
+
+    An existing directory is never modified, only checked: it may be shared
+    by other users (e.g. /dev/shm itself), so point SHARED_SNAPSHOT_DIR at a
+    private subdirectory instead.
+
+    Args:
+        directory: Shared snapshot directory
+        create: Create the directory with mode 0700 if it does not exist, as
+            the writer does
+
+    Raises:
+        PermissionError: If the directory is a symlink or not a directory, is
+            owned by another user, or is accessible to other users
+    """
+    if create and not os.path.lexists(directory):
+        os.makedirs(directory, mode=0o700)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{directory} is not a directory")
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"{directory} is not owned by the current user")
+    if info.st_mode & 0o077:
+        raise PermissionError(f"{directory} is accessible to other users")
+
+
+class SharedSnapshotWriter:
+    """
+    Publishes snapshot generations to a shared directory (ideally /dev/shm)
+
+    Each generation is written to its own file and then made current by
+    atomically replacing the pointer file, so readers never see a partial
+    generation.
+
+    Only fetching and analysis are shared: every worker decodes its own
+    copy of each generation, so snapshot memory still grows with the
+    number of workers.
+    """
+
+    def __init__(self, directory: str, keep_generations: int = 2):
+        self.directory = directory
+        self.keep_generations = max(1, keep_generations)
+        secure_directory(directory, create=True)
+
+    def write(self, snapshot: AnalyticsSnapshot) -> str:
+        """
+        Write a snapshot as a new generation and make it current
+
+        Returns:
+            File name of the new generation
+        """
+        name = f"snapshot-{snapshot.version:010d}.bin"
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "wb") as f:
+            f.write(encode_snapshot(snapshot))
+        os.replace(tmp_path, path)
+
+        pointer_tmp = os.path.join(self.directory, f"{CURRENT_POINTER}.tmp")
+        with open(pointer_tmp, "w") as f:
+            f.write(name)
+        os.replace(pointer_tmp, os.path.join(self.directory, CURRENT_POINTER))
+
+        self._prune()
+        return name
+
+    def _prune(self) -> None:
+        # Readers that already mapped an old generation keep it alive until unmapped
+        generations = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith("snapshot-") and name.endswith(".bin")
+        )
+        for name in generations[: -self.keep_generations]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def on_snapshot(
+        self, previous: Optional[AnalyticsSnapshot], current: AnalyticsSnapshot
+    ) -> None:
+        """Snapshot listener that mirrors every published snapshot to disk"""
+        self.write(current)
+
+
+class SharedSnapshotReader:
+    """Attaches a worker to the generations published by SharedSnapshotWriter"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.poll_interval = 1.0
+        self._generation: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def generation(self) -> Optional[str]:
+        return self._generation
+
+    def _read_pointer(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, CURRENT_POINTER)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load_if_changed(self) -> Optional[AnalyticsSnapshot]:
+        """
+        Decode the current generation if it differs from the last one
+
+        Returns:
+            The new AnalyticsSnapshot, or None if nothing changed
+
+        Raises:
+            PermissionError: If the directory could be written by other users
+        """
+        secure_directory(self.directory)
+        name = self._read_pointer()
+        if name is None or name == self._generation:
+            return None
+        if os.path.basename(name) != name:
+            raise PermissionError(f"Invalid snapshot generation name {name!r}")
+
+        with open(os.path.join(self.directory, name), "rb") as f:
+            snapshot = decode_snapshot(f.read())
+
+        self._generation = name
+        return snapshot
+
+    async def poll(self) -> Optional[AnalyticsSnapshot]:
+        """Load a new generation off the event loop and publish it locally"""
+        snapshot = await asyncio.to_thread(self.load_if_changed)
+        if snapshot is not None:
+            snapshot_store.publish(snapshot)
+            logger.info("Attached to shared snapshot v%s", snapshot.version)
+        return snapshot
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error("Shared snapshot attach failed: %s", e)
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,299 @@
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from app.config import settings
+from app.models import Anomaly, Post, UserSummary, WordFrequency
+from app.services.anomaly_detector import AnomalyTracker, anomaly_detector
+from app.services.cache_backend import (
+    CacheBackend,
+    cache_backend,
+    decode_payload,
+    encode_payload,
+)
+from app.services.jsonplaceholder_service import jsonplaceholder_service
+from app.services.spill_analyzer import SpilledAnomalyTracker, SpilledTextStats
+from app.services.text_analyzer import TextStats, text_analyzer
+from app.utils.logger import logger
+from app.utils.memory import estimate_analysis_bytes, memory_budget
+
+# Keys shared by all replicas using the same cache backend
+SNAPSHOT_CACHE_KEY = "analytics:snapshot"
+SNAPSHOT_VERSION_KEY = "analytics:snapshot:version"
+REFRESH_LOCK_NAME = "analytics:refresh"
+
+
+@dataclass(frozen=True)
+class AnalyticsSnapshot:
+    """Immutable, precomputed view of the upstream dataset and its analyses"""
+
+    version: int
+    generated_at: datetime
+    posts: Tuple[Post, ...]
+    posts_by_user: Mapping[int, Tuple[Post, ...]]
+    anomalies: Tuple[Anomaly, ...]
+    anomalies_by_user: Mapping[int, Tuple[Anomaly, ...]]
+    anomaly_summary: Dict
+    word_frequencies: Tuple[WordFrequency, ...]
+    user_summaries: Tuple[UserSummary, ...]
+    total_users: int
+
+
+def _group_by_user(items) -> Mapping[int, Tuple]:
+    grouped: Dict[int, List] = defaultdict(list)
+    for item in items:
+        grouped[item.userId].append(item)
+    return MappingProxyType(
+        {user_id: tuple(group) for user_id, group in grouped.items()}
+    )
+
+
+def _assemble_snapshot(
+    version: int,
+    generated_at: datetime,
+    posts: List[Post],
+    anomalies: List[Anomaly],
+    anomaly_summary: Dict,
+    word_frequencies: List[WordFrequency],
+    user_summaries: List[UserSummary],
+) -> AnalyticsSnapshot:
+    posts_by_user = _group_by_user(posts)
+
+    return AnalyticsSnapshot(
+        version=version,
+        generated_at=generated_at,
+        posts=tuple(posts),
+        posts_by_user=posts_by_user,
+        anomalies=tuple(anomalies),
+        anomalies_by_user=_group_by_user(anomalies),
+        anomaly_summary=anomaly_summary,
+        word_frequencies=tuple(word_frequencies),
+        user_summaries=tuple(user_summaries),
+        total_users=len(posts_by_user),
+    )
+
+
+def build_snapshot(
+    posts: List[Post], version: int, spill: bool = False
+) -> AnalyticsSnapshot:
+    """
+    Run every analysis over the given posts and freeze the results
+
+    Args:
+        posts: Full list of posts to analyze
+        version: Monotonic version number for the new snapshot
+        spill: Keep the analysis working set in SPILL_DIR files instead of
+            in memory (the posts themselves are always part of the snapshot)
+
+    Returns:
+        AnalyticsSnapshot ready to be served
+    """
+    if spill:
+        stats = SpilledTextStats(text_analyzer, settings.spill_dir)
+        tracker = SpilledAnomalyTracker(anomaly_detector, spill_dir=settings.spill_dir)
+    else:
+        stats = TextStats(text_analyzer)
+        tracker = AnomalyTracker(anomaly_detector)
+
+    try:
+        stats.add(posts)
+        tracker.add(posts)
+        anomalies = tracker.anomalies()
+        word_frequencies = stats.word_frequencies()
+        user_summaries = stats.top_users(top_n=None)
+    finally:
+        if spill:
+            stats.close()
+            tracker.close()
+
+    return _assemble_snapshot(
+        version=version,
+        generated_at=datetime.now(timezone.utc),
+        posts=posts,
+        anomalies=anomalies,
+        anomaly_summary=anomaly_detector.get_anomaly_summary(anomalies),
+        word_frequencies=word_frequencies,
+        user_summaries=user_summaries,
+    )
+
+
+def snapshot_to_payload(snapshot: AnalyticsSnapshot) -> Dict:
+    """Convert a snapshot to plain data; per-user indexes are rebuilt on load"""
+    return {
+        "version": snapshot.version,
+        "generated_at": snapshot.generated_at.isoformat(),
+        "posts": [p.model_dump() for p in snapshot.posts],
+        "anomalies": [a.model_dump() for a in snapshot.anomalies],
+        "anomaly_summary": snapshot.anomaly_summary,
+        "word_frequencies": [w.model_dump() for w in snapshot.word_frequencies],
+        "user_summaries": [u.model_dump() for u in snapshot.user_summaries],
+    }
+
+
+def snapshot_from_payload(payload: Dict) -> AnalyticsSnapshot:
+    """Inverse of snapshot_to_payload"""
+    summary = dict(payload["anomaly_summary"])
+    # JSON object keys are strings; user IDs are ints everywhere else
+    summary["by_user"] = {int(k): v for k, v in summary.get("by_user", {}).items()}
+
+    return _assemble_snapshot(
+        version=payload["version"],
+        generated_at=datetime.fromisoformat(payload["generated_at"]),
+        posts=[Post(**p) for p in payload["posts"]],
+        anomalies=[Anomaly(**a) for a in payload["anomalies"]],
+        anomaly_summary=summary,
+        word_frequencies=[WordFrequency(**w) for w in payload["word_frequencies"]],
+        user_summaries=[UserSummary(**u) for u in payload["user_summaries"]],
+    )
+
+
+SnapshotListener = Callable[[Optional[AnalyticsSnapshot], AnalyticsSnapshot], None]
+
+
+class SnapshotStore:
+    """Holds the current analytics snapshot and refreshes it in the background"""
+
+    def __init__(self, cache: Optional[CacheBackend] = None):
+        self._snapshot: Optional[AnalyticsSnapshot] = None
+        self._version = 0
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[SnapshotListener] = []
+        self.cache = cache or cache_backend
+        # Coordination with other replicas through a shared cache
+        self.shared_ttl = 60.0
+        self.lock_ttl = 60.0
+        self.lock_wait_timeout = 30.0
+        self.lock_poll_interval = 0.2
+
+    @property
+    def current(self) -> Optional[AnalyticsSnapshot]:
+        """The latest published snapshot, or None before the first refresh"""
+        return self._snapshot
+
+    def add_listener(self, listener: SnapshotListener) -> None:
+        """Register a callback invoked with (previous, current) on every publish"""
+        self._listeners.append(listener)
+
+    def publish(self, snapshot: AnalyticsSnapshot) -> None:
+        """Atomically swap in a new snapshot and notify listeners"""
+        previous = self._snapshot
+        self._snapshot = snapshot
+        self._version = max(self._version, snapshot.version)
+
+        for listener in self._listeners:
+            try:
+                listener(previous, snapshot)
+            except Exception as e:
+                logger.error("Snapshot listener failed: %s", e)
+
+    def clear(self) -> None:
+        """Drop the current snapshot so requests fall back to live computation"""
+        self._snapshot = None
+
+    async def _compute(self, version: int) -> AnalyticsSnapshot:
+        posts = await jsonplaceholder_service.get_posts()
+        with memory_budget.reserve(estimate_analysis_bytes(posts)) as in_memory:
+            if not in_memory:
+                logger.warning(
+                    "Snapshot analysis of %s posts exceeds memory budget, spilling",
+                    len(posts),
+                )
+            # Analysis is CPU bound, keep it off the event loop
+            return await asyncio.to_thread(
+                build_snapshot, posts, version, not in_memory
+            )
+
+    async def _load_shared(self) -> Optional[AnalyticsSnapshot]:
+        data = await self.cache.get(SNAPSHOT_CACHE_KEY)
+        if data is None:
+            return None
+        return await asyncio.to_thread(
+            lambda: snapshot_from_payload(decode_payload(data))
+        )
+
+    async def _refresh_shared(self) -> AnalyticsSnapshot:
+        # Adopt a snapshot another replica computed since our last refresh
+        known_version = self._version
+        shared = await self._load_shared()
+        if shared is not None and shared.version > known_version:
+            return shared
+
+        token = await self.cache.acquire_lock(REFRESH_LOCK_NAME, self.lock_ttl)
+        if token is None:
+            deadline = time.monotonic() + self.lock_wait_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.lock_poll_interval)
+                shared = await self._load_shared()
+                if shared is not None and shared.version > known_version:
+                    return shared
+            logger.warning("Timed out waiting for another replica, refreshing locally")
+            return await self._compute(self._version + 1)
+
+        try:
+            version = max(
+                await self.cache.incr(SNAPSHOT_VERSION_KEY), self._version + 1
+            )
+            snapshot = await self._compute(version)
+            data = await asyncio.to_thread(
+                lambda: encode_payload(snapshot_to_payload(snapshot))
+            )
+            await self.cache.set(SNAPSHOT_CACHE_KEY, data, self.shared_ttl)
+            return snapshot
+        finally:
+            await self.cache.release_lock(REFRESH_LOCK_NAME, token)
+
+    async def refresh(self) -> AnalyticsSnapshot:
+        """
+        Refetch upstream data, recompute all analyses and publish the result
+
+        With a shared cache backend only one replica recomputes at a time;
+        the others adopt its snapshot from the cache.
+
+        Returns:
+            The newly published AnalyticsSnapshot
+        """
+        if self.cache.is_shared:
+            snapshot = await self._refresh_shared()
+        else:
+            snapshot = await self._compute(self._version + 1)
+        self.publish(snapshot)
+
+        logger.info(
+            "Published snapshot v%s with %s posts",
+            snapshot.version,
+            len(snapshot.posts),
+        )
+        return snapshot
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("Snapshot refresh failed: %s", e)
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float) -> None:
+        """Start the periodic refresh loop (first refresh runs immediately)"""
+        # Shared snapshots expire well before the next refresh is due
+        self.shared_ttl = max(1.0, interval / 2)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        """Stop the periodic refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global service instance
+snapshot_store = SnapshotStore()
@@ -0,0 +1,316 @@
+import asyncio
+import heapq
+import json
+import os
+import tempfile
+import zlib
+from collections import Counter
+from contextlib import aclosing
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from app.models import Anomaly, Post, UserSummary, WordFrequency
+from app.services.anomaly_detector import AnomalyDetector, AnomalyTracker
+from app.services.text_analyzer import TextAnalyzer, TextStats
+from app.utils.logger import debug_event, logger
+from app.utils.memory import estimate_analysis_bytes, memory_budget
+
+T = TypeVar("T")
+
+# Matches TextAnalyzer.calculate_word_frequency
+WORD_FREQUENCY_LIMIT = 50
+
+# Order of reasons in AnomalyDetector.detect_anomalies
+REASON_ORDER = {"short_title": 0, "duplicate_title": 1, "bot_like_behavior": 2}
+
+
+class _Partitions:
+    """A set of append-only text files records are hashed into"""
+
+    def __init__(self, directory: str, name: str, count: int):
+        self.paths = [os.path.join(directory, f"{name}-{i}") for i in range(count)]
+        self._files = [open(path, "w", encoding="utf-8") for path in self.paths]
+
+    def write(self, key: int, line: str) -> None:
+        self._files[key % len(self._files)].write(line)
+
+    def close(self) -> None:
+        for file in self._files:
+            file.close()
+
+    def read(self) -> Iterator[Iterator[str]]:
+        """Yield each partition's lines, one partition at a time"""
+        self.close()
+        for path in self.paths:
+            with open(path, encoding="utf-8") as file:
+                yield file
+
+
+def _word_key(word: str) -> int:
+    return zlib.crc32(word.encode())
+
+
+class _Spill:
+    """Owns the temporary directory of one spilled analysis"""
+
+    def __init__(self, spill_dir: Optional[str], partitions: int):
+        self.partitions = max(1, partitions)
+        self._tmp = tempfile.TemporaryDirectory(dir=spill_dir, prefix="spill-")
+        self.directory = self._tmp.name
+
+    def close(self) -> None:
+        self._tmp.cleanup()
+
+
+class SpilledTextStats(_Spill):
+    """
+    TextStats whose word and per-user aggregates live in partition files
+
+    Records are hashed into partitions by word and by user; each partition
+    is aggregated on its own when results are read, so only one
+    partition's counters and sets are in memory at a time. Results match
+    TextStats.
+    """
+
+    def __init__(
+        self,
+        analyzer: TextAnalyzer,
+        spill_dir: Optional[str] = None,
+        partitions: int = 16,
+        profile: Optional[str] = None,
+    ):
+        super().__init__(spill_dir, partitions)
+        self.analyzer = analyzer
+        self.profile = analyzer.get_profile(profile)
+        self._words = _Partitions(self.directory, "words", self.partitions)
+        self._users = _Partitions(self.directory, "users", self.partitions)
+        # Users in order of first appearance, with their post counts
+        self.user_posts: Dict[int, int] = {}
+        self.total_posts = 0
+        # First-appearance position of word records, to order count ties
+        self._sequence = 0
+
+    @property
+    def total_users(self) -> int:
+        return len(self.user_posts)
+
+    def _write_word(self, word: str, count: int) -> None:
+        self._words.write(_word_key(word), f"{word}\t{self._sequence}\t{count}\n")
+        self._sequence += 1
+
+    def absorb(self, stats: TextStats) -> None:
+        """Move the aggregates of an in-memory TextStats to disk"""
+        for word, count in stats.word_counts.items():
+            self._write_word(word, count)
+        for user_id, words in stats.user_words.items():
+            if words:
+                self._users.write(user_id, f"{user_id}\t{' '.join(words)}\n")
+        for user_id, count in stats.user_posts.items():
+            self.user_posts[user_id] = self.user_posts.get(user_id, 0) + count
+        self.total_posts += stats.total_posts
+
+    def add(self, posts: List[Post]) -> None:
+        for post in posts:
+            self.user_posts[post.userId] = self.user_posts.get(post.userId, 0) + 1
+            words = self.profile.extract_words(post.title)
+            for word in words:
+                self._write_word(word, 1)
+            if words:
+                self._users.write(post.userId, f"{post.userId}\t{' '.join(words)}\n")
+        self.total_posts += len(posts)
+
+    def word_frequencies(
+        self, limit: int = WORD_FREQUENCY_LIMIT
+    ) -> List[WordFrequency]:
+        # A word lives in exactly one partition, so per-partition leaders
+        # contain the global leaders
+        candidates: List[Tuple[int, int, str]] = []
+        for lines in self._words.read():
+            counts: Counter = Counter()
+            first_seen: Dict[str, int] = {}
+            for line in lines:
+                word, position, count = line.rstrip("\n").split("\t")
+                counts[word] += int(count)
+                first_seen.setdefault(word, int(position))
+            candidates.extend(
+                heapq.nsmallest(
+                    limit,
+                    (
+                        (-count, first_seen[word], word)
+                        for word, count in counts.items()
+                    ),
+                )
+            )
+        return [
+            WordFrequency(word=word, count=-negative_count)
+            for negative_count, _, word in heapq.nsmallest(limit, candidates)
+        ]
+
+    def top_users(
+        self, top_n: Optional[int] = 3, include_words: bool = True
+    ) -> List[UserSummary]:
+        order = {user_id: position for position, user_id in enumerate(self.user_posts)}
+        keep = len(order) if top_n is None else top_n
+        counts: Dict[int, int] = {}
+        words_of_leaders: Dict[int, List[str]] = {}
+
+        for lines in self._users.read():
+            user_words: Dict[int, Set[str]] = {}
+            for line in lines:
+                user_id, words = line.rstrip("\n").split("\t")
+                user_words.setdefault(int(user_id), set()).update(words.split())
+            for user_id, words in user_words.items():
+                counts[user_id] = len(words)
+            if include_words:
+                leaders = heapq.nsmallest(
+                    keep, user_words, key=lambda u: (-len(user_words[u]), order[u])
+                )
+                words_of_leaders.update((u, list(user_words[u])) for u in leaders)
+
+        ranked = sorted(order, key=lambda u: (-counts.get(u, 0), order[u]))[:top_n]
+        return [
+            UserSummary(
+                userId=user_id,
+                uniqueWordCount=counts.get(user_id, 0),
+                totalPosts=self.user_posts[user_id],
+                uniqueWords=words_of_leaders.get(user_id, [])
+                if include_words
+                else None,
+            )
+            for user_id in ranked
+        ]
+
+
+class SpilledAnomalyTracker(_Spill):
+    """
+    AnomalyTracker that keeps its posts in per-user partition files
+
+    Every anomaly rule is per user, so tracking each partition of users on
+    its own finds the same anomalies as a single pass; they are merged back
+    into AnomalyTracker order.
+    """
+
+    def __init__(
+        self,
+        detector: AnomalyDetector,
+        include_details: bool = True,
+        spill_dir: Optional[str] = None,
+        partitions: int = 16,
+    ):
+        super().__init__(spill_dir, partitions)
+        self.detector = detector
+        self.include_details = include_details
+        self._posts = _Partitions(self.directory, "posts", self.partitions)
+        self._user_first: Dict[int, int] = {}
+        self.total_posts = 0
+
+    def _write(self, index: int, user_id: int, post_id: int, title: str) -> None:
+        self._user_first[user_id] = min(index, self._user_first.get(user_id, index))
+        # Bodies play no part in anomaly detection
+        record = json.dumps([index, user_id, post_id, title])
+        self._posts.write(user_id, record + "\n")
+
+    def absorb(self, tracker: AnomalyTracker) -> None:
+        """Move the posts held by an in-memory AnomalyTracker to disk"""
+        for user_id, titles in tracker.user_titles.items():
+            for title, entries in titles.items():
+                for index, post_id in entries:
+                    self._write(index, user_id, post_id, title)
+        self.total_posts = tracker.total_posts
+
+    def add(self, posts: List[Post]) -> None:
+        for post in posts:
+            self._write(self.total_posts, post.userId, post.id, post.title)
+            self.total_posts += 1
+
+    def anomalies(self) -> List[Anomaly]:
+        keyed: List[Tuple[tuple, Anomaly]] = []
+        for lines in self._posts.read():
+            # Absorbed records are grouped by user and title; restore feed order
+            records = sorted(json.loads(line) for line in lines)
+            tracker = AnomalyTracker(self.detector, self.include_details)
+            tracker.add(
+                [
+                    Post(userId=user_id, id=post_id, title=title, body="")
+                    for _, user_id, post_id, title in records
+                ]
+            )
+            indexes: Dict[int, int] = {}
+            for index, _, post_id, _ in records:
+                indexes.setdefault(post_id, index)
+
+            for position, anomaly in enumerate(tracker.anomalies()):
+                rank = REASON_ORDER[anomaly.reason]
+                if anomaly.reason == "bot_like_behavior":
+                    # Grouped by user in order of first appearance
+                    key = (rank, self._user_first[anomaly.userId], position)
+                else:
+                    key = (rank, indexes[anomaly.id], position)
+                keyed.append((key, anomaly))
+
+        keyed.sort(key=lambda item: item[0])
+        debug_event("spill.anomalies", total=len(keyed), partitions=self.partitions)
+        return [anomaly for _, anomaly in keyed]
+
+
+async def analyze_batches(
+    batches: AsyncIterator[List[Post]],
+    accumulator: Any,
+    spill: Callable[[], _Spill],
+    finish: Callable[[Any], T],
+) -> T:
+    """
+    Feed batches of posts into an accumulator within the memory budget
+
+    Each batch reserves its estimated footprint before it is added. When a
+    reservation does not fit, the accumulated state moves to the spill
+    accumulator and the remaining batches are processed on disk instead of
+    growing the heap. Batches are always analyzed off the event loop, so a
+    running analysis never stalls other requests.
+
+    Args:
+        batches: Posts as they arrive, e.g. JSONPlaceholderService.stream_posts
+        accumulator: In-memory TextStats or AnomalyTracker
+        spill: Creates the matching SpilledTextStats or SpilledAnomalyTracker
+        finish: Computes the result from whichever accumulator is in use
+
+    Returns:
+        The result of finish
+    """
+    reserved = 0
+    spilled: Optional[_Spill] = None
+    try:
+        async with aclosing(batches):
+            async for batch in batches:
+                if spilled is None:
+                    nbytes = estimate_analysis_bytes(batch)
+                    if memory_budget.try_reserve(nbytes):
+                        reserved += nbytes
+                        await asyncio.to_thread(accumulator.add, batch)
+                        continue
+                    logger.warning(
+                        "Analysis exceeds memory budget after %s posts, spilling",
+                        accumulator.total_posts,
+                    )
+                    spilled = spill()
+                    await asyncio.to_thread(spilled.absorb, accumulator)
+                    accumulator = None
+                    memory_budget.release(reserved)
+                    reserved = 0
+                await asyncio.to_thread(spilled.add, batch)
+
+        return await asyncio.to_thread(finish, spilled or accumulator)
+    finally:
+        memory_budget.release(reserved)
+        if spilled is not None:
+            await asyncio.to_thread(spilled.close)
@@ -1,31 +1,38 @@
-import re
 from collections import Counter, defaultdict
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 
+from app.config import settings
 from app.models import Post, WordFrequency, UserSummary
+from app.services.text_profiles import (
+    DEFAULT_PROFILE,
+    NormalizationProfile,
+    load_profiles,
+)
+from app.utils.logger import debug_event
 
 
 class TextAnalyzer:
     """Service for text analysis and processing"""
 
-    def __init__(self):
-        # Essential stop words - only the most common ones
-        self.stop_words = {
-            "the",
-            "a",
-            "an",
-            "and",
-            "or",
-            "but",
-            "in",
-            "on",
-            "at",
-            "to",
-            "of",
-            "for",
-            "with",
-            "by",
-        }
+    def __init__(self, profiles: Optional[Dict[str, NormalizationProfile]] = None):
+        # Named normalization profiles, compiled once (TEXT_PROFILES_FILE)
+        self.profiles = profiles or load_profiles(settings.text_profiles_file)
+        self.stop_words = self.profiles[DEFAULT_PROFILE].stop_words
+
+    def get_profile(self, name: Optional[str] = None) -> NormalizationProfile:
+        """
+        Look up a normalization profile
+
+        Args:
+            name: Profile name (default: "default")
+
+        Returns:
+            The compiled profile
+
+        Raises:
+            KeyError: If no profile has this name
+        """
+        return self.profiles[name or DEFAULT_PROFILE]
 
     def clean_text(self, text: str) -> str:
         """
@@ -37,42 +44,39 @@ class TextAnalyzer:
         Returns:
             Cleaned text
         """
-        # Convert to lowercase and remove special characters
-        text = re.sub(r"[^\w\s]", "", text.lower())
-        return text.strip()
+        return self.get_profile().clean_text(text)
 
-    def extract_words(self, text: str) -> List[str]:
+    def extract_words(self, text: str, profile: Optional[str] = None) -> List[str]:
         """
         Extract words from text, excluding stop words
 
         Args:
             text: Text to extract words from
+            profile: Normalization profile (default: "default")
 
         Returns:
             List of words
         """
-        cleaned_text = self.clean_text(text)
-        words = cleaned_text.split()
-        # Filter out stop words and short words
-        words = [
-            word for word in words if word not in self.stop_words and len(word) > 2
-        ]
-        return words
+        return self.get_profile(profile).extract_words(text)
 
-    def calculate_word_frequency(self, posts: List[Post]) -> List[WordFrequency]:
+    def calculate_word_frequency(
+        self, posts: List[Post], profile: Optional[str] = None
+    ) -> List[WordFrequency]:
         """
         Calculate word frequency across all post titles
 
         Args:
             posts: List of posts to analyze
+            profile: Normalization profile (default: "default")
 
         Returns:
             List of WordFrequency objects sorted by count
         """
         word_counter = Counter()
+        normalization = self.get_profile(profile)
 
         for post in posts:
-            words = self.extract_words(post.title)
+            words = normalization.extract_words(post.title)
             word_counter.update(words)
 
         # Convert to WordFrequency objects and sort by count
@@ -81,24 +85,32 @@ class TextAnalyzer:
             for word, count in word_counter.most_common(50)  # Top 50 words
         ]
 
-        print(f"Calculated word frequency for {len(posts)} posts")
+        debug_event("words.frequency", posts=len(posts))
         return word_frequencies
 
-    def calculate_user_unique_words(self, posts: List[Post]) -> List[UserSummary]:
+    def calculate_user_unique_words(
+        self,
+        posts: List[Post],
+        include_words: bool = True,
+        profile: Optional[str] = None,
+    ) -> List[UserSummary]:
         """
         Calculate unique words per user across their post titles
 
         Args:
             posts: List of posts to analyze
+            include_words: Build the uniqueWords lists (counts are always set)
+            profile: Normalization profile (default: "default")
 
         Returns:
             List of UserSummary objects sorted by unique word count
         """
         user_words: Dict[int, Set[str]] = defaultdict(set)
         user_posts: Dict[int, int] = defaultdict(int)
+        normalization = self.get_profile(profile)
 
         for post in posts:
-            words = self.extract_words(post.title)
+            words = normalization.extract_words(post.title)
             user_words[post.userId].update(words)
             user_posts[post.userId] += 1
 
@@ -109,18 +121,22 @@ class TextAnalyzer:
                 userId=user_id,
                 uniqueWordCount=len(unique_words),
                 totalPosts=user_posts[user_id],
-                uniqueWords=list(unique_words),
+                uniqueWords=list(unique_words) if include_words else None,
             )
             user_summaries.append(user_summary)
 
         # Sort by unique word count (descending)
         user_summaries.sort(key=lambda x: x.uniqueWordCount, reverse=True)
 
-        print(f"Calculated unique words for {len(user_summaries)} users")
+        debug_event("words.unique_per_user", users=len(user_summaries))
         return user_summaries
 
     def get_top_users_by_unique_words(
-        self, posts: List[Post], top_n: int = 3
+        self,
+        posts: List[Post],
+        top_n: int = 3,
+        include_words: bool = True,
+        profile: Optional[str] = None,
     ) -> List[UserSummary]:
         """
         Get top N users with most unique words
@@ -128,13 +144,67 @@ class TextAnalyzer:
         Args:
             posts: List of posts to analyze
             top_n: Number of top users to return
+            include_words: Build the uniqueWords lists
+            profile: Normalization profile (default: "default")
 
         Returns:
             List of top N UserSummary objects
         """
-        user_summaries = self.calculate_user_unique_words(posts)
+        user_summaries = self.calculate_user_unique_words(posts, include_words, profile)
         return user_summaries[:top_n]
 
 
+class TextStats:
+    """
+    Word and per-user aggregates built incrementally from batches of posts
+
+    Produces the same results as TextAnalyzer.calculate_word_frequency and
+    get_top_users_by_unique_words without holding on to the posts.
+    """
+
+    def __init__(self, analyzer: TextAnalyzer, profile: Optional[str] = None):
+        self.analyzer = analyzer
+        self.profile = analyzer.get_profile(profile)
+        # Insertion order is first appearance, which breaks count ties
+        self.word_counts: Counter = Counter()
+        self.user_words: Dict[int, Set[str]] = {}
+        self.user_posts: Dict[int, int] = {}
+        self.total_posts = 0
+
+    @property
+    def total_users(self) -> int:
+        return len(self.user_posts)
+
+    def add(self, posts: List[Post]) -> None:
+        for post in posts:
+            words = self.profile.extract_words(post.title)
+            self.word_counts.update(words)
+            self.user_words.setdefault(post.userId, set()).update(words)
+            self.user_posts[post.userId] = self.user_posts.get(post.userId, 0) + 1
+        self.total_posts += len(posts)
+
+    def word_frequencies(self, limit: int = 50) -> List[WordFrequency]:
+        return [
+            WordFrequency(word=word, count=count)
+            for word, count in self.word_counts.most_common(limit)
+        ]
+
+    def top_users(
+        self, top_n: Optional[int] = 3, include_words: bool = True
+    ) -> List[UserSummary]:
+        ranked = sorted(
+            self.user_words, key=lambda u: len(self.user_words[u]), reverse=True
+        )
+        return [
+            UserSummary(
+                userId=user_id,
+                uniqueWordCount=len(self.user_words[user_id]),
+                totalPosts=self.user_posts[user_id],
+                uniqueWords=list(self.user_words[user_id]) if include_words else None,
+            )
+            for user_id in ranked[:top_n]
+        ]
+
+
 # Global service instance
 text_analyzer = TextAnalyzer()
@@ -0,0 +1,243 @@
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from app.utils.logger import logger
+
+# Profile used when none is selected (snapshots, search, trends)
+DEFAULT_PROFILE = "default"
+
+# Distinct tokens remembered per profile before its cache is reset
+TOKEN_CACHE_SIZE = 100_000
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+# The analyzer's original stop list
+DEFAULT_STOP_WORDS = frozenset("the a an and or but in on at to of for with by".split())
+
+ENGLISH_STOP_WORDS = DEFAULT_STOP_WORDS | frozenset(
+    """
+    about above after again against all also am any are as be because been
+    before being below between both can could did do does doing down during
+    each few from further had has have having he her here hers herself him
+    himself his how if into is it its itself just me more most my myself no
+    nor not now off once only other our ours ourselves out over own same she
+    should so some such than that their theirs them themselves then there
+    these they this those through too under until up very was we were what
+    when where which while who whom why will would you your yours yourself
+    yourselves
+    """.split()
+)
+
+# Longest first; a suffix is only stripped if a stem of 3+ letters remains
+_SUFFIXES = (
+    ("ational", "ate"),
+    ("fulness", "ful"),
+    ("iveness", "ive"),
+    ("ization", "ize"),
+    ("ement", ""),
+    ("ingly", ""),
+    ("sses", "ss"),
+    ("ies", "y"),
+    ("ing", ""),
+    ("edly", ""),
+    ("ed", ""),
+    ("ly", ""),
+    ("s", ""),
+)
+
+
+def light_stem(word: str) -> str:
+    """
+    Strip common English inflectional suffixes
+
+    A deliberately small suffix stripper (no external dependency): plurals,
+    -ing, -ed, -ly and a few derivational endings.
+    """
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith(("ss", "us", "is")):
+                return word
+            stem = word[: -len(suffix)] + replacement
+            if (
+                suffix in ("ing", "ed")
+                and stem[-1] == stem[-2]
+                and stem[-1] not in "lsz"
+            ):
+                stem = stem[:-1]  # running -> run, stopped -> stop
+            return stem
+    return word
+
+
+def fold_unicode(text: str) -> str:
+    """Case-fold and strip accents, e.g. "Café" -> "cafe" """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class NormalizationProfile:
+    """
+    Named tokenization rules for text analysis, compiled once
+
+    Stop words are folded and frozen up front; the outcome of normalizing
+    each distinct token (folding, stop word and length filters, stemming)
+    is cached, so repeated tokens cost one dict lookup whatever the size
+    of the stop list.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        stop_words: Iterable[str] = DEFAULT_STOP_WORDS,
+        min_length: int = 3,
+        fold: bool = False,
+        stem: bool = False,
+    ):
+        self.name = name
+        self.min_length = min_length
+        self.fold = fold
+        self.stem = stem
+        self.stop_words: FrozenSet[str] = frozenset(
+            fold_unicode(word) if fold else word.lower() for word in stop_words
+        )
+        self._tokens: Dict[str, Optional[str]] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"NormalizationProfile({self.name!r}, {len(self.stop_words)} stop words, "
+            f"min_length={self.min_length}, fold={self.fold}, stem={self.stem})"
+        )
+
+    def clean_text(self, text: str) -> str:
+        """Lowercase text and remove everything but word characters and spaces"""
+        return _PUNCTUATION.sub("", text.lower()).strip()
+
+    def _normalize(self, token: str) -> Optional[str]:
+        if self.fold:
+            token = fold_unicode(token)
+        if token in self.stop_words or len(token) < self.min_length:
+            return None
+        return light_stem(token) if self.stem else token
+
+    def normalize_token(self, token: str) -> Optional[str]:
+        """The analyzed form of a cleaned token, or None if it is filtered out"""
+        try:
+            return self._tokens[token]
+        except KeyError:
+            pass
+        if len(self._tokens) >= TOKEN_CACHE_SIZE:
+            self._tokens.clear()
+        normalized = self._tokens[token] = self._normalize(token)
+        return normalized
+
+    def extract_words(self, text: str) -> List[str]:
+        """Analyzed words of a text, in order, filtered by the profile"""
+        words = []
+        for token in self.clean_text(text).split():
+            word = self.normalize_token(token)
+            if word is not None:
+                words.append(word)
+        return words
+
+
+def builtin_profiles() -> Dict[str, NormalizationProfile]:
+    return {
+        DEFAULT_PROFILE: NormalizationProfile(DEFAULT_PROFILE),
+        "english": NormalizationProfile("english", ENGLISH_STOP_WORDS, fold=True),
+        "english-stemmed": NormalizationProfile(
+            "english-stemmed", ENGLISH_STOP_WORDS, fold=True, stem=True
+        ),
+    }
+
+
+def _read_word_file(path: str, base_dir: str) -> List[str]:
+    path = path if os.path.isabs(path) else os.path.join(base_dir, path)
+    with open(path, encoding="utf-8") as file:
+        return [
+            line.strip()
+            for line in file
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+def parse_profiles(spec: dict, base_dir: str = ".") -> Dict[str, NormalizationProfile]:
+    """
+    Build profiles from a mapping of profile name to options
+
+    Options: "extends" (a built-in or earlier profile whose settings are
+    inherited), "stop_words" (list, added to the inherited ones),
+    "stop_words_file" (one word per line, "#" comments), "min_length",
+    "fold_unicode" and "stem".
+
+    Args:
+        spec: Parsed profiles file
+        base_dir: Directory relative stop word files are resolved against
+
+    Returns:
+        Built-in profiles updated with the configured ones
+
+    Raises:
+        ValueError: If a profile is malformed or extends an unknown profile
+    """
+    profiles = builtin_profiles()
+    for name, options in spec.items():
+        if not isinstance(options, dict):
+            raise ValueError(f"Profile {name!r} must be an object")
+        if name.lower() == "true":
+            # ?profile=true selects request profiling, not a text profile
+            raise ValueError("Profile name 'true' is reserved")
+        parent_name = options.get("extends")
+        if parent_name is not None and parent_name not in profiles:
+            raise ValueError(f"Profile {name!r} extends unknown {parent_name!r}")
+        parent = profiles.get(parent_name) if parent_name else None
+
+        stop_words = set(parent.stop_words if parent else ())
+        stop_words.update(options.get("stop_words", ()))
+        if options.get("stop_words_file"):
+            stop_words.update(_read_word_file(options["stop_words_file"], base_dir))
+        try:
+            min_length = int(
+                options.get("min_length", parent.min_length if parent else 3)
+            )
+        except (TypeError, ValueError):
+            raise ValueError(f"Profile {name!r} has an invalid min_length")
+
+        profiles[name] = NormalizationProfile(
+            name,
+            stop_words,
+            min_length=min_length,
+            fold=bool(options.get("fold_unicode", parent.fold if parent else False)),
+            stem=bool(options.get("stem", parent.stem if parent else False)),
+        )
+    return profiles
+
+
+def load_profiles(path: Optional[str]) -> Dict[str, NormalizationProfile]:
+    """
+    Load normalization profiles from a JSON file
+
+    Falls back to the built-in profiles (with an error logged) if the file
+    cannot be read or is invalid, so a bad file never stops the service.
+
+    Args:
+        path: Profiles file, or None for the built-in profiles only
+
+    Returns:
+        Profiles by name, always including "default"
+    """
+    if not path:
+        return builtin_profiles()
+    try:
+        with open(path, encoding="utf-8") as file:
+            spec = json.load(file)
+        if not isinstance(spec, dict):
+            raise ValueError("expected an object of profiles")
+        profiles = parse_profiles(spec, os.path.dirname(os.path.abspath(path)))
+    except (OSError, ValueError) as e:
+        logger.error("Failed to load text profiles from %s: %s", path, e)
+        return builtin_profiles()
+
+    logger.info("Loaded text profiles: %s", ", ".join(profiles))
+    return profiles
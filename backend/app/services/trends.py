@@ -0,0 +1,254 @@
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models import Post, UserAnomalyTrend, WordTrend
+from app.services.anomaly_detector import anomaly_detector
+from app.services.snapshot_service import AnalyticsSnapshot, snapshot_store
+from app.services.text_analyzer import text_analyzer
+from app.utils.logger import logger
+
+ContentKey = Tuple[int, str]
+
+
+@dataclass
+class TrendBucket:
+    """Aggregates for posts ingested during one bucket interval"""
+
+    index: int
+    # Posts whose ingestion fell in this bucket
+    post_ids: List[int] = field(default_factory=list)
+    words: Counter = field(default_factory=Counter)
+    posts_by_user: Counter = field(default_factory=Counter)
+    short_titles_by_user: Counter = field(default_factory=Counter)
+    title_counts: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class WindowAggregate:
+    """Sum of the buckets covering one time window"""
+
+    words: Counter = field(default_factory=Counter)
+    posts_by_user: Counter = field(default_factory=Counter)
+    anomalies_by_user: Counter = field(default_factory=Counter)
+
+    @property
+    def total_posts(self) -> int:
+        return sum(self.posts_by_user.values())
+
+    def anomaly_rate(self, user_id: int) -> float:
+        posts = self.posts_by_user[user_id]
+        return self.anomalies_by_user[user_id] / posts if posts else 0.0
+
+
+class TrendTracker:
+    """
+    Rolling, bucketed aggregates over posts by ingestion time
+
+    JSONPlaceholder posts carry no timestamps, so a post's ingestion time is
+    when it was first seen (or last seen with changed content). Window
+    queries merge only the buckets they cover.
+
+    Ingestion details are dropped with their bucket; afterwards only a hash
+    of each post's content is kept, for posts still in the dataset, so
+    memory is bounded by the retained buckets plus the dataset size.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float = 60.0,
+        retention_seconds: float = 48 * 60 * 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max(2, int(retention_seconds // bucket_seconds))
+        self._clock = clock
+        self._buckets: Deque[TrendBucket] = deque()
+        # post id -> (content key, ingestion timestamp), for retained buckets
+        self._ingested: Dict[int, Tuple[ContentKey, float]] = {}
+        # post id -> content hash, for posts whose bucket has been evicted
+        self._settled: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Snapshot ingestion runs here, in publish order, off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trends")
+        self._pending: Optional[Future] = None
+
+    @property
+    def max_window_seconds(self) -> float:
+        # Trends compare a window with the one before it
+        return self.bucket_seconds * self.max_buckets / 2
+
+    def ingested_at(self, post_id: int) -> Optional[float]:
+        """Return the ingestion timestamp of a post, if it was ingested"""
+        entry = self._ingested.get(post_id)
+        return entry[1] if entry else None
+
+    def _bucket(self, now: float) -> TrendBucket:
+        index = int(now // self.bucket_seconds)
+        if not self._buckets or self._buckets[-1].index != index:
+            self._buckets.append(TrendBucket(index=index))
+        while self._buckets[0].index <= index - self.max_buckets:
+            self._evict(self._buckets.popleft())
+        return self._buckets[-1]
+
+    def _evict(self, bucket: TrendBucket) -> None:
+        for post_id in bucket.post_ids:
+            entry = self._ingested.get(post_id)
+            # Skip posts re-ingested into a later bucket since
+            if entry is not None and entry[1] // self.bucket_seconds == bucket.index:
+                del self._ingested[post_id]
+                self._settled[post_id] = hash(entry[0])
+
+    def _is_known(self, post_id: int, key: ContentKey) -> bool:
+        entry = self._ingested.get(post_id)
+        if entry is not None:
+            return entry[0] == key
+        return self._settled.get(post_id) == hash(key)
+
+    def ingest(self, posts: Iterable[Post]) -> int:
+        """
+        Record posts that are new or changed since they were last seen
+
+        Args:
+            posts: The current dataset
+
+        Returns:
+            Number of posts recorded
+        """
+        now = self._clock()
+        recorded = 0
+        seen: Set[int] = set()
+        with self._lock:
+            bucket = self._bucket(now)
+            for post in posts:
+                seen.add(post.id)
+                key = (post.userId, post.title)
+                if self._is_known(post.id, key):
+                    continue
+                self._settled.pop(post.id, None)
+                self._ingested[post.id] = (key, now)
+                bucket.post_ids.append(post.id)
+                bucket.words.update(text_analyzer.extract_words(post.title))
+                bucket.posts_by_user[post.userId] += 1
+                if len(post.title) < anomaly_detector.short_title_threshold:
+                    bucket.short_titles_by_user[post.userId] += 1
+                bucket.title_counts[key] += 1
+                recorded += 1
+            # Posts gone from the dataset are treated as new if they return
+            for post_id in [p for p in self._settled if p not in seen]:
+                del self._settled[post_id]
+        return recorded
+
+    def window(self, seconds: float, end: Optional[float] = None) -> WindowAggregate:
+        """
+        Aggregate the buckets in (end - seconds, end]
+
+        Anomalies follow AnomalyDetector's rules applied to the posts
+        ingested in the window: short titles, plus duplicate and bot-like
+        titles counted from the merged per-user title counts.
+        """
+        end = self._clock() if end is None else end
+        last = int(end // self.bucket_seconds)
+        first = last - max(1, round(seconds / self.bucket_seconds)) + 1
+
+        result = WindowAggregate()
+        title_counts: Counter = Counter()
+        with self._lock:
+            for bucket in reversed(self._buckets):
+                if bucket.index > last:
+                    continue
+                if bucket.index < first:
+                    break
+                result.words.update(bucket.words)
+                result.posts_by_user.update(bucket.posts_by_user)
+                result.anomalies_by_user.update(bucket.short_titles_by_user)
+                title_counts.update(bucket.title_counts)
+
+        for (user_id, _), count in title_counts.items():
+            if count > 1:
+                result.anomalies_by_user[user_id] += count
+            if count >= anomaly_detector.bot_detection_threshold:
+                result.anomalies_by_user[user_id] += count
+        return result
+
+    def trends(
+        self,
+        window_seconds: float,
+        top: int = 10,
+        min_posts: int = 2,
+        min_rate_increase: float = 0.2,
+    ) -> Tuple[
+        WindowAggregate, WindowAggregate, List[WordTrend], List[UserAnomalyTrend]
+    ]:
+        """
+        Compare the latest window with the one before it
+
+        Args:
+            window_seconds: Window length
+            top: Maximum number of words and users to return
+            min_posts: Minimum posts a user needs in the window to be considered
+            min_rate_increase: Minimum anomaly rate increase for a spike
+
+        Returns:
+            Tuple of (current, previous, rising words, spiking users)
+        """
+        now = self._clock()
+        current = self.window(window_seconds, now)
+        previous = self.window(window_seconds, now - window_seconds)
+
+        rising = sorted(
+            (
+                WordTrend(
+                    word=word,
+                    count=count,
+                    previousCount=previous.words[word],
+                    growth=round((count + 1) / (previous.words[word] + 1), 3),
+                )
+                for word, count in current.words.items()
+                if count > previous.words[word]
+            ),
+            key=lambda trend: (-trend.growth, -trend.count, trend.word),
+        )[:top]
+
+        spiking = []
+        for user_id, posts in current.posts_by_user.items():
+            rate = current.anomaly_rate(user_id)
+            previous_rate = previous.anomaly_rate(user_id)
+            if posts >= min_posts and rate - previous_rate >= min_rate_increase:
+                spiking.append(
+                    UserAnomalyTrend(
+                        userId=user_id,
+                        posts=posts,
+                        anomalies=current.anomalies_by_user[user_id],
+                        anomalyRate=round(rate, 3),
+                        previousAnomalyRate=round(previous_rate, 3),
+                    )
+                )
+        spiking.sort(key=lambda t: (t.previousAnomalyRate - t.anomalyRate, t.userId))
+
+        return current, previous, rising, spiking[:top]
+
+    def _log_failure(self, future: Future) -> None:
+        if future.exception() is not None:
+            logger.error("Trend ingestion failed: %s", future.exception())
+
+    def on_snapshot(
+        self, previous: Optional[AnalyticsSnapshot], current: AnalyticsSnapshot
+    ) -> None:
+        """Snapshot listener: record newly ingested posts in the background"""
+        if previous is None or previous.posts is not current.posts:
+            self._pending = self._executor.submit(self.ingest, current.posts)
+            self._pending.add_done_callback(self._log_failure)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until snapshots published so far have been ingested"""
+        if self._pending is not None:
+            self._pending.exception(timeout)
+
+
+# Global tracker instance, fed by published snapshots
+trend_tracker = TrendTracker()
+snapshot_store.add_listener(trend_tracker.on_snapshot)
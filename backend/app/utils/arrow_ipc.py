@@ -0,0 +1,241 @@
+"""
+Minimal pure-Python writer for the Arrow IPC streaming format
+
+Used for exports when pyarrow is not installed. Supports the column types
+the API exports (int64 and nullable utf8); any Arrow reader can consume the
+output. Format reference: https://arrow.apache.org/docs/format/Columnar.html
+"""
+
+import struct
+from typing import Iterator, List, Sequence, Tuple
+
+# Column types accepted by iter_arrow_stream
+INT64 = "int64"
+UTF8 = "utf8"
+
+# Schema.fbs / Message.fbs enum values
+_METADATA_V5 = 4
+_HEADER_SCHEMA = 1
+_HEADER_RECORD_BATCH = 3
+_TYPE_INT = 2
+_TYPE_UTF8 = 5
+
+_CONTINUATION = b"\xff\xff\xff\xff"
+END_OF_STREAM = _CONTINUATION + b"\x00\x00\x00\x00"
+
+
+def _pad8(size: int) -> int:
+    return -size % 8
+
+
+class _FlatBufferBuilder:
+    """
+    Back-to-front flatbuffer builder, enough for Arrow's IPC metadata
+
+    Offsets returned by the builder count from the end of the buffer, as in
+    the reference implementations.
+    """
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.minalign = 1
+        self._table_end = 0
+        self._fields: List[Tuple[int, int]] = []
+
+    @property
+    def offset(self) -> int:
+        return len(self.buf)
+
+    def _prepend(self, data: bytes) -> None:
+        self.buf[0:0] = data
+
+    def _prep(self, size: int, additional: int = 0) -> None:
+        # Align so that `size` bytes written after `additional` bytes are aligned
+        self.minalign = max(self.minalign, size)
+        self._prepend(bytes(-(len(self.buf) + additional) % size))
+
+    def _scalar(self, fmt: str, value) -> None:
+        size = struct.calcsize(fmt)
+        self._prep(size)
+        self._prepend(struct.pack("<" + fmt, value))
+
+    def _uoffset(self, target: int) -> None:
+        self._prep(4)
+        self._prepend(struct.pack("<I", len(self.buf) + 4 - target))
+
+    def string(self, value: str) -> int:
+        data = value.encode()
+        self._prep(4, len(data) + 1)
+        self._prepend(data + b"\x00")
+        self._prepend(struct.pack("<I", len(data)))
+        return self.offset
+
+    def offset_vector(self, targets: Sequence[int]) -> int:
+        self._prep(4, 4 * len(targets))
+        for target in reversed(targets):
+            self._uoffset(target)
+        self._prepend(struct.pack("<I", len(targets)))
+        return self.offset
+
+    def struct_vector(self, items: Sequence[Tuple[int, int]]) -> int:
+        """Vector of structs of two int64s (FieldNode and Buffer)"""
+        self._prep(4, 16 * len(items))
+        self._prep(8, 16 * len(items))
+        for first, second in reversed(items):
+            self._prepend(struct.pack("<qq", first, second))
+        self._prepend(struct.pack("<I", len(items)))
+        return self.offset
+
+    def start_table(self) -> None:
+        self._table_end = self.offset
+        self._fields = []
+
+    def add_scalar(self, slot: int, fmt: str, value) -> None:
+        self._scalar(fmt, value)
+        self._fields.append((slot, self.offset))
+
+    def add_offset(self, slot: int, target: int) -> None:
+        self._uoffset(target)
+        self._fields.append((slot, self.offset))
+
+    def end_table(self) -> int:
+        self._scalar("i", 0)  # Placeholder for the vtable soffset
+        table = self.offset
+        slots = [0] * (max((slot for slot, _ in self._fields), default=-1) + 1)
+        for slot, field in self._fields:
+            slots[slot] = table - field
+
+        vtable = struct.pack(
+            f"<{len(slots) + 2}H", 4 + 2 * len(slots), table - self._table_end, *slots
+        )
+        self._prep(2, len(vtable))
+        self._prepend(vtable)
+        # The table's vtable precedes it, at table_start - soffset
+        position = len(self.buf) - table
+        self.buf[position : position + 4] = struct.pack("<i", self.offset - table)
+        return table
+
+    def finish(self, root: int) -> bytes:
+        self._prep(self.minalign, 4)
+        self._uoffset(root)
+        return bytes(self.buf)
+
+
+def _message(
+    builder: _FlatBufferBuilder, header_type: int, header: int, body_length: int
+) -> bytes:
+    builder.start_table()
+    builder.add_scalar(3, "q", body_length)
+    builder.add_offset(2, header)
+    builder.add_scalar(0, "h", _METADATA_V5)
+    builder.add_scalar(1, "B", header_type)
+    metadata = builder.finish(builder.end_table())
+
+    # Encapsulated message: continuation, padded metadata length, metadata
+    padded = metadata + bytes(_pad8(len(metadata)))
+    return _CONTINUATION + struct.pack("<i", len(padded)) + padded
+
+
+def schema_message(columns: Sequence[Tuple[str, str]]) -> bytes:
+    """Encapsulated Schema message for (name, type) columns, all nullable"""
+    builder = _FlatBufferBuilder()
+    fields = []
+    for name, kind in columns:
+        builder.start_table()
+        if kind == INT64:
+            builder.add_scalar(0, "i", 64)
+            builder.add_scalar(1, "B", 1)
+            type_type = _TYPE_INT
+        elif kind == UTF8:
+            type_type = _TYPE_UTF8
+        else:
+            raise ValueError(f"Unsupported Arrow column type: {kind}")
+        type_table = builder.end_table()
+        children = builder.offset_vector([])
+        name_offset = builder.string(name)
+
+        builder.start_table()
+        builder.add_offset(0, name_offset)
+        builder.add_offset(3, type_table)
+        builder.add_offset(5, children)
+        builder.add_scalar(1, "B", 1)
+        builder.add_scalar(2, "B", type_type)
+        fields.append(builder.end_table())
+
+    field_vector = builder.offset_vector(fields)
+    builder.start_table()
+    builder.add_offset(1, field_vector)
+    builder.add_scalar(0, "h", 0)  # Little endian
+    return _message(builder, _HEADER_SCHEMA, builder.end_table(), 0)
+
+
+def _validity(values: Sequence) -> Tuple[bytes, int]:
+    nulls = sum(value is None for value in values)
+    if not nulls:
+        return b"", 0  # All-valid columns may omit the bitmap
+    bitmap = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value is not None:
+            bitmap[i >> 3] |= 1 << (i & 7)
+    return bytes(bitmap), nulls
+
+
+def _column_buffers(kind: str, values: Sequence) -> Tuple[List[bytes], int]:
+    bitmap, nulls = _validity(values)
+    if kind == INT64:
+        data = struct.pack(f"<{len(values)}q", *(0 if v is None else v for v in values))
+        return [bitmap, data], nulls
+
+    encoded = [b"" if v is None else v.encode() for v in values]
+    offsets, position = [0], 0
+    for item in encoded:
+        position += len(item)
+        offsets.append(position)
+    return [
+        bitmap,
+        struct.pack(f"<{len(offsets)}i", *offsets),
+        b"".join(encoded),
+    ], nulls
+
+
+def record_batch_message(
+    columns: Sequence[Tuple[str, str]], rows: Sequence[Sequence]
+) -> bytes:
+    """Encapsulated RecordBatch message (metadata and body) for some rows"""
+    nodes, buffers, body = [], [], bytearray()
+    for index, (_, kind) in enumerate(columns):
+        column_buffers, nulls = _column_buffers(kind, [row[index] for row in rows])
+        nodes.append((len(rows), nulls))
+        for data in column_buffers:
+            buffers.append((len(body), len(data)))
+            body += data + bytes(_pad8(len(data)))
+
+    builder = _FlatBufferBuilder()
+    buffer_vector = builder.struct_vector(buffers)
+    node_vector = builder.struct_vector(nodes)
+    builder.start_table()
+    builder.add_scalar(0, "q", len(rows))
+    builder.add_offset(1, node_vector)
+    builder.add_offset(2, buffer_vector)
+    header = builder.end_table()
+    return _message(builder, _HEADER_RECORD_BATCH, header, len(body)) + bytes(body)
+
+
+def iter_arrow_stream(
+    columns: Sequence[Tuple[str, str]],
+    batches: Iterator[Sequence[Sequence]],
+) -> Iterator[bytes]:
+    """
+    Encode row batches as an Arrow IPC stream, one message at a time
+
+    Args:
+        columns: (name, INT64 or UTF8) per column
+        batches: Lists of row tuples, in column order
+
+    Yields:
+        The schema, one record batch per input batch, then end of stream
+    """
+    yield schema_message(columns)
+    for rows in batches:
+        yield record_batch_message(columns, rows)
+    yield END_OF_STREAM
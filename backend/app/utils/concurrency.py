@@ -0,0 +1,109 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.config import settings
+from app.utils.errors import ServiceUnavailableError
+
+T = TypeVar("T")
+
+
+class OverloadedError(ServiceUnavailableError):
+    """Raised when a request is rejected to protect the server from overload"""
+
+
+class RequestCoalescer:
+    """Shares one in-flight computation between concurrent identical requests"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Mark the exception as retrieved if every waiter has gone away
+        if not future.cancelled():
+            future.exception()
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await the computation for key, starting it only if none is in flight
+
+        Args:
+            key: Normalized identity of the request (e.g. route and query params)
+            factory: Creates the awaitable that computes the result
+
+        Returns:
+            The shared result of the computation
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+
+        # A disconnecting client must not cancel the work others are waiting on
+        return await asyncio.shield(future)
+
+
+class ConcurrencyLimiter:
+    """Bounds concurrent executions with a short queue and fast failure"""
+
+    def __init__(self, max_concurrent: int, max_queued: int, queue_timeout: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    async def run(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run the awaitable once a slot is free
+
+        The slot only bounds how many computations run at once; CPU-bound
+        work inside the awaitable must still be moved off the event loop
+        (e.g. with asyncio.to_thread) to keep other requests responsive.
+
+        Raises:
+            OverloadedError: If the queue is full or no slot frees up in time
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        if self._semaphore.locked() and self._waiting >= self.max_queued:
+            raise OverloadedError(
+                "Too many analyses queued, try again later",
+                retry_after=self.queue_timeout,
+            )
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise OverloadedError(
+                "Timed out waiting for an analysis slot",
+                retry_after=self.queue_timeout,
+            )
+        finally:
+            self._waiting -= 1
+
+        try:
+            return await factory()
+        finally:
+            self._semaphore.release()
+
+
+# Shared guards for the heavy analysis routes
+analysis_coalescer = RequestCoalescer()
+analysis_limiter = ConcurrencyLimiter(
+    max_concurrent=settings.max_concurrent_analyses,
+    max_queued=settings.max_queued_analyses,
+    queue_timeout=settings.analysis_queue_timeout_seconds,
+)
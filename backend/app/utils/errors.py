@@ -0,0 +1,18 @@
+import math
+
+
+class ServiceUnavailableError(Exception):
+    """Base for failures that should surface as 503 with a Retry-After hint"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class QueryTooExpensiveError(Exception):
+    """A query's estimated cost exceeds its route's budget"""
+
+    def __init__(self, message: str, estimate: int, budget: int):
+        super().__init__(message)
+        self.estimate = estimate
+        self.budget = budget
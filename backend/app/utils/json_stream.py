@@ -0,0 +1,101 @@
+import codecs
+import json
+from typing import Any, List
+
+_WHITESPACE = " \t\r\n"
+
+
+class JsonArrayParser:
+    """
+    Incremental parser for a top-level JSON array
+
+    Feed it raw chunks as they arrive; every call returns the elements that
+    were completed by that chunk. Only the current partial element is
+    buffered, never the whole document.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        # Just parsed an element / just consumed a ','
+        self._after_item = False
+        self._expect_item = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Parse a chunk of the document
+
+        Returns:
+            Elements completed by this chunk, in document order
+
+        Raises:
+            ValueError: If the document is not a JSON array
+        """
+        self._buffer += self._utf8.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Finish parsing once the document has been fully received
+
+        Returns:
+            Elements completed by the end of the document
+
+        Raises:
+            ValueError: If the document was truncated or malformed
+        """
+        self._buffer += self._utf8.decode(b"", final=True)
+        items = self._parse(final=True)
+        if not self._finished:
+            raise ValueError("Truncated JSON array")
+        return items
+
+    def _parse(self, final: bool) -> List[Any]:
+        buffer, pos, items = self._buffer, 0, []
+        length = len(buffer)
+
+        while True:
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == length:
+                break
+            char = buffer[pos]
+
+            if self._finished:
+                raise ValueError("Unexpected data after JSON array")
+            if not self._started:
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                pos += 1
+            elif self._after_item:
+                # Between elements: only a separator or the end may follow
+                if char not in ",]":
+                    raise ValueError("Expected ',' or ']' in JSON array")
+                self._after_item = False
+                self._finished = char == "]"
+                self._expect_item = char == ","
+                pos += 1
+            elif char == "]" and not self._expect_item:
+                self._finished = True
+                pos += 1
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise ValueError("Malformed JSON array element")
+                    break  # Incomplete element, wait for more data
+                if end == length and not final:
+                    # A scalar may still be growing ("12" of "123")
+                    break
+                items.append(item)
+                self._after_item = True
+                self._expect_item = False
+                pos = end
+
+        self._buffer = buffer[pos:]
+        return items
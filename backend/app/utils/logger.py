@@ -1,18 +1,123 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
+from app.config import settings
 
-def setup_logger(name: str = "app", level: Optional[str] = None) -> logging.Logger:
+
+class TextFormatter(logging.Formatter):
+    """Plain "LEVEL: message" lines, with structured event fields appended"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for log shippers"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+# Argument types that may change between the log call and rendering
+MUTABLE_ARG_TYPES = (list, dict, set, bytearray)
+
+
+def _freeze_args(args):
+    """Shallow copies of mutable %-format arguments, or None if there are none"""
+    if isinstance(args, MUTABLE_ARG_TYPES):
+        # A single mapping argument for "%(key)s" messages
+        return copy.copy(args)
+    if isinstance(args, tuple) and any(
+        isinstance(arg, MUTABLE_ARG_TYPES) for arg in args
+    ):
+        return tuple(
+            copy.copy(arg) if isinstance(arg, MUTABLE_ARG_TYPES) else arg
+            for arg in args
+        )
+    return None
+
+
+class DeferredQueueHandler(QueueHandler):
     """
-    Simple logger setup for demo purposes
+    QueueHandler that leaves message formatting to the listener thread
+
+    The stock handler renders every message before enqueueing it; here the
+    calling thread (usually the event loop) only enqueues the record, with
+    shallow copies of any list, dict or set arguments so the message shows
+    them as they were when it was logged.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = _freeze_args(record.args)
+        if args is None and not record.exc_info:
+            return record
+
+        # Changes go on a copy, other handlers may still need the original
+        record = copy.copy(record)
+        if args is not None:
+            record.args = args
+        if record.exc_info:
+            # Tracebacks reference live frames; render them while they exist
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logger(
+    name: str = "app", level: Optional[str] = None, fmt: Optional[str] = None
+) -> logging.Logger:
+    """
+    Set up a non-blocking logger
+
+    Records are queued by the caller and written to stderr by a background
+    QueueListener, so a slow terminal or log pipe never stalls requests.
+
+    Args:
+        name: Logger name
+        level: Log level name (default: INFO)
+        fmt: "text" (default) or "json"
     """
     logger = logging.getLogger(name)
 
     if not logger.handlers:  # Only add handler if none exists
         handler = logging.StreamHandler()
-        formatter = logging.Formatter("%(levelname)s: %(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        if fmt == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(TextFormatter("%(levelname)s: %(message)s"))
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        listener.start()
+        # Flush queued records on interpreter exit
+        atexit.register(listener.stop)
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.listener = listener
+        logger.addHandler(queue_handler)
 
     # Set level based on environment or default to INFO
     log_level = level or "INFO"
@@ -21,5 +126,25 @@ def setup_logger(name: str = "app", level: Optional[str] = None) -> logging.Logg
     return logger
 
 
-# Create a simple logger instance
-logger = setup_logger("app")
+def debug_event(event: str, sample_rate: Optional[float] = None, **fields) -> None:
+    """
+    Emit a structured debug event
+
+    Free when DEBUG is disabled; when enabled, only a sample of events is
+    kept so hot paths can be instrumented.
+
+    Args:
+        event: Dotted event name, e.g. "anomalies.detected"
+        sample_rate: Fraction of events to keep (default: LOG_DEBUG_SAMPLE_RATE)
+        **fields: Structured fields attached to the event
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    rate = settings.log_debug_sample_rate if sample_rate is None else sample_rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.debug(event, extra={"fields": fields})
+
+
+# Application logger
+logger = setup_logger("app", settings.log_level, settings.log_format)
@@ -0,0 +1,79 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from app.config import settings
+from app.models import Post
+
+MB = 1024 * 1024
+
+# Measured on CPython 3.11 / pydantic 2: a parsed Post without its text
+POST_OVERHEAD_BYTES = 420
+# Per title word in analysis indexes (string plus set/dict slot), worst case
+# of every word being distinct
+WORD_ENTRY_BYTES = 100
+# Average title characters per extracted word
+CHARS_PER_WORD = 6
+
+
+def estimate_post_bytes(post: Post) -> int:
+    """Estimated resident size of one post plus its share of analysis indexes"""
+    words = len(post.title) // CHARS_PER_WORD + 1
+    return (
+        POST_OVERHEAD_BYTES
+        + len(post.title)
+        + len(post.body)
+        + words * WORD_ENTRY_BYTES
+    )
+
+
+def estimate_analysis_bytes(posts: Iterable[Post]) -> int:
+    """Estimated working set of analyzing posts fully in memory"""
+    return sum(estimate_post_bytes(post) for post in posts)
+
+
+class MemoryBudget:
+    """
+    Process-wide accounting of memory reserved by in-flight analyses
+
+    Requests reserve their estimated working set before analyzing in memory;
+    a reservation that does not fit tells the caller to use a bounded,
+    spilling path instead.
+    """
+
+    def __init__(self, limit_bytes: int):
+        # 0 disables the budget
+        self.limit_bytes = limit_bytes
+        self.reserved = 0
+        self._lock = threading.Lock()
+
+    def try_reserve(self, nbytes: int) -> bool:
+        """Reserve nbytes if they fit in what is left of the budget"""
+        with self._lock:
+            if self.limit_bytes and self.reserved + nbytes > self.limit_bytes:
+                return False
+            self.reserved += nbytes
+            return True
+
+    def release(self, nbytes: int) -> None:
+        with self._lock:
+            self.reserved = max(0, self.reserved - nbytes)
+
+    @contextmanager
+    def reserve(self, nbytes: int) -> Iterator[bool]:
+        """
+        Hold a reservation for the duration of the block
+
+        Yields:
+            True if the work fits in memory, False if it must spill
+        """
+        granted = self.try_reserve(nbytes)
+        try:
+            yield granted
+        finally:
+            if granted:
+                self.release(nbytes)
+
+
+# Global budget shared by all requests in this process
+memory_budget = MemoryBudget(int(settings.memory_budget_mb * MB))
@@ -0,0 +1,222 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (function name, file, first line) from the outermost frame to the innermost
+Stack = Tuple[Tuple[str, str, int], ...]
+
+PROFILE_FORMATS = ("speedscope", "collapsed")
+
+
+def _frame_stack(frame) -> Stack:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class StackSampler:
+    """
+    Statistical wall-clock profiler
+
+    A background thread records the Python stacks of the target threads
+    every `interval` seconds. Sampling sees across awaits and costs the
+    profiled code nothing beyond the GIL hand-offs.
+    """
+
+    def __init__(
+        self, interval: float = 0.005, thread_ids: Optional[Iterable[int]] = None
+    ):
+        self.interval = interval
+        # None samples every thread except the sampler itself
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.samples: Counter = Counter()
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample_once(self) -> None:
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if not self._includes(thread_id):
+                continue
+            stack = _frame_stack(frame)
+            if self.thread_ids is None:
+                # Process-wide profiles get one root per thread
+                root = (f"thread {names.get(thread_id, thread_id)}", "", 0)
+                stack = (root, *stack)
+            self.samples[stack] += 1
+
+    def _includes(self, thread_id: int) -> bool:
+        return self.thread_ids is None or thread_id in self.thread_ids
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample_once()
+
+    def start(self) -> "StackSampler":
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.duration = time.monotonic() - self.started_at
+        return self
+
+
+# Request sampler of the current context, inherited by the tasks and worker
+# threads the request starts
+_active_request: ContextVar[Optional["RequestSampler"]] = ContextVar(
+    "active_request_sampler", default=None
+)
+
+
+class _RequestAwareExecutor(ThreadPoolExecutor):
+    """Default executor that lets a profiled request sample its workers"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        # Called on the loop thread, in the context of the submitting task
+        sampler = _active_request.get()
+        if sampler is not None:
+            return super().submit(sampler.run_sampled, fn, *args, **kwargs)
+        return super().submit(fn, *args, **kwargs)
+
+
+def _request_task_factory(loop, coro, **kwargs):
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    sampler = _active_request.get()
+    if sampler is not None:
+        sampler.tasks.add(task)
+    return task
+
+
+_instrumented_loops: "weakref.WeakSet[asyncio.AbstractEventLoop]" = weakref.WeakSet()
+
+
+def instrument_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Let RequestSampler follow work into new tasks and to_thread workers"""
+    if loop in _instrumented_loops:
+        return
+    loop.set_default_executor(_RequestAwareExecutor(thread_name_prefix="asyncio"))
+    loop.set_task_factory(_request_task_factory)
+    _instrumented_loops.add(loop)
+
+
+class RequestSampler(StackSampler):
+    """
+    Samples one request: the event loop only while it runs one of the
+    request's tasks, and the default-executor threads (asyncio.to_thread)
+    while they run work the request submitted
+
+    Work the request joins rather than starts (e.g. a coalesced analysis
+    started by another request) is not attributed to it.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__(interval, thread_ids=())
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self._token = None
+        instrument_loop(self.loop)
+
+    def _includes(self, thread_id: int) -> bool:
+        if thread_id == self.loop_thread_id:
+            return asyncio.current_task(self.loop) in self.tasks
+        return thread_id in self.thread_ids
+
+    def run_sampled(self, fn, *args, **kwargs):
+        """Run fn on the current worker thread with that thread sampled"""
+        thread_id = threading.get_ident()
+        self.thread_ids.add(thread_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.thread_ids.discard(thread_id)
+
+    def start(self) -> "RequestSampler":
+        self.tasks.add(asyncio.current_task(self.loop))
+        self._token = _active_request.set(self)
+        return super().start()
+
+    def stop(self) -> "RequestSampler":
+        super().stop()
+        _active_request.reset(self._token)
+        return self
+
+
+def _frame_label(name: str, filename: str, line: int) -> str:
+    if not filename:
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_collapsed(samples: Counter) -> str:
+    """Render samples in Brendan Gregg's collapsed format (flamegraph.pl input)"""
+    lines: Dict[str, int] = Counter()
+    for stack, count in samples.items():
+        lines[";".join(_frame_label(*frame) for frame in stack)] += count
+    return "".join(
+        f"{stack} {count}\n" for stack, count in sorted(lines.items()) if stack
+    )
+
+
+def to_speedscope(sampler: StackSampler, name: str) -> dict:
+    """Render samples as a speedscope "sampled" profile (https://speedscope.app)"""
+    frames: List[dict] = []
+    index: Dict[Tuple[str, str, int], int] = {}
+    samples, weights = [], []
+
+    for stack, count in sampler.samples.most_common():
+        sample = []
+        for key in stack:
+            if key not in index:
+                frame_name, filename, line = key
+                index[key] = len(frames)
+                frame = {"name": frame_name}
+                if filename:
+                    frame.update(file=filename, line=line)
+                frames.append(frame)
+            sample.append(index[key])
+        samples.append(sample)
+        weights.append(round(count * sampler.interval, 6))
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sampler.duration, 6),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+        "name": name,
+        "activeProfileIndex": 0,
+        "exporter": "ad-insights-explorer",
+    }
@@ -0,0 +1,196 @@
+import math
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.config import settings
+from app.models import Post
+from app.utils.errors import QueryTooExpensiveError
+
+# Cost units: analyzing one post costs 1 and every returned item is priced
+# relative to that (a top user with its unique word list is ~20 words)
+POST_COST = 1
+WORD_COST = 1
+ANOMALY_COST = 1
+USER_COST = 1
+USER_WITH_WORDS_COST = 20
+
+# Most words a summary can return (TextStats.word_frequencies)
+MAX_WORDS = 50
+
+# Assumed dataset size until one has been observed (JSONPlaceholder's)
+DEFAULT_DATASET_SIZE = 100
+
+
+@dataclass
+class QueryCost:
+    """Admission decision for one query, reported in response headers"""
+
+    estimate: int
+    budget: int
+    # Admitted number of top users (summaries only)
+    top_users: Optional[int] = None
+    # Every n-th post is analyzed; above 1 the result is approximate
+    sample_stride: int = 1
+    # Applied downgrades, e.g. "top_users=500" or "sample=1/4"
+    downgrades: List[str] = field(default_factory=list)
+    actual: Optional[int] = None
+    started: float = field(default_factory=time.perf_counter)
+
+    def headers(self) -> Dict[str, str]:
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        headers = {
+            "X-Query-Cost-Estimate": str(self.estimate),
+            "X-Query-Cost-Budget": str(self.budget) if self.budget else "unlimited",
+            "X-Query-Time-Ms": f"{elapsed_ms:.1f}",
+        }
+        if self.actual is not None:
+            headers["X-Query-Cost-Actual"] = str(self.actual)
+        if self.downgrades:
+            headers["X-Query-Downgraded"] = ", ".join(self.downgrades)
+        return headers
+
+    def apply(
+        self, result: Union[BaseModel, Response], response: Response
+    ) -> Union[BaseModel, Response]:
+        """Attach the cost headers to a route's result"""
+        # Headers of the injected response only reach models that FastAPI
+        # serializes; Response objects are sent as they are
+        target = result if isinstance(result, Response) else response
+        target.headers.update(self.headers())
+        return result
+
+
+class QueryCostEstimator:
+    """
+    Admission control for on-demand queries
+
+    A query's cost is estimated from the dataset size (the posts it has to
+    analyze) and the outputs it asks for, before any work is done, and
+    checked against its route's budget. A budget of 0 disables admission
+    control for that route; costs are still estimated and reported.
+    """
+
+    def __init__(self, summary_budget: int, anomalies_budget: int):
+        self.summary_budget = summary_budget
+        self.anomalies_budget = anomalies_budget
+        # Posts in the full dataset, as last observed
+        self.dataset_size = DEFAULT_DATASET_SIZE
+
+    def observe_dataset_size(self, posts: int) -> None:
+        self.dataset_size = posts
+
+    def posts_to_analyze(self, limit: Optional[int]) -> int:
+        """Expected number of posts an analysis with this limit covers"""
+        return min(limit, self.dataset_size) if limit else self.dataset_size
+
+    def plan_summary(
+        self,
+        posts: int,
+        top_users: int,
+        top_words: int,
+        include_words: bool,
+        analyze: bool = True,
+    ) -> QueryCost:
+        """
+        Admit a summary, downgrading it to fit the budget
+
+        An oversized top_users is capped first, to half the budget; if the
+        analysis still does not fit, the query switches to approximate mode
+        and analyzes an evenly spaced sample of the posts.
+
+        Args:
+            posts: Posts the summary covers
+            top_users: Requested number of top users
+            top_words: Requested number of top words
+            include_words: Whether unique word lists are returned
+            analyze: False when the result is precomputed (snapshot)
+
+        Returns:
+            QueryCost with the admitted top_users and sampling stride
+        """
+        users = min(top_users, posts)
+        words = min(top_words, MAX_WORDS)
+        user_cost = USER_WITH_WORDS_COST if include_words else USER_COST
+        analysis = posts * POST_COST if analyze else 0
+
+        cost = QueryCost(
+            estimate=analysis + users * user_cost + words * WORD_COST,
+            budget=self.summary_budget,
+            top_users=top_users,
+        )
+        if not self.summary_budget or cost.estimate <= self.summary_budget:
+            return cost
+
+        if users * user_cost > self.summary_budget // 2:
+            users = cost.top_users = max(1, self.summary_budget // 2 // user_cost)
+            cost.downgrades.append(f"top_users={users}")
+        remaining = self.summary_budget - users * user_cost - words * WORD_COST
+        if analysis > remaining:
+            cost.sample_stride = math.ceil(analysis / max(remaining, 1))
+            cost.downgrades.append(f"sample=1/{cost.sample_stride}")
+            analysis = math.ceil(analysis / cost.sample_stride)
+
+        cost.estimate = analysis + users * user_cost + words * WORD_COST
+        return cost
+
+    def plan_anomalies(
+        self, posts: int, anomalies: int = 0, analyze: bool = True
+    ) -> QueryCost:
+        """
+        Admit an anomaly query, rejecting it if it is over budget
+
+        Duplicate and bot-like titles are only found by comparing all of a
+        user's posts, so unlike summaries the analysis cannot be sampled.
+
+        Args:
+            posts: Posts the analysis covers
+            anomalies: Anomalies returned, if known in advance
+            analyze: False when the result is precomputed (snapshot)
+
+        Returns:
+            QueryCost of the admitted query
+
+        Raises:
+            QueryTooExpensiveError: If the estimate exceeds the budget
+        """
+        analysis = posts * POST_COST if analyze else 0
+        estimate = analysis + anomalies * ANOMALY_COST
+        if self.anomalies_budget and estimate > self.anomalies_budget:
+            raise QueryTooExpensiveError(
+                f"Estimated query cost {estimate} exceeds the budget of "
+                f"{self.anomalies_budget}; narrow it with limit or user_ids",
+                estimate,
+                self.anomalies_budget,
+            )
+        return QueryCost(estimate=estimate, budget=self.anomalies_budget)
+
+
+class BatchSampler:
+    """Keeps every n-th post of a stream of batches, counting all of them"""
+
+    def __init__(self, stride: int):
+        self.stride = stride
+        self.seen = 0
+
+    async def sample(
+        self, batches: AsyncIterator[List[Post]]
+    ) -> AsyncIterator[List[Post]]:
+        async with aclosing(batches):
+            async for batch in batches:
+                # Offset so sampled positions stay evenly spaced across batches
+                picked = batch[-self.seen % self.stride :: self.stride]
+                self.seen += len(batch)
+                if picked:
+                    yield picked
+
+
+# Global estimator with the configured per-route budgets
+query_cost_estimator = QueryCostEstimator(
+    summary_budget=settings.query_budget_summary,
+    anomalies_budget=settings.query_budget_anomalies,
+)
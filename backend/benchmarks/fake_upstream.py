@@ -0,0 +1,110 @@
+"""
+Local stand-in for JSONPlaceholder with configurable size, latency and errors
+
+Used in-process by the tests, and as a server by the load test:
+python -m benchmarks.fake_upstream --posts 5000 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import random
+from typing import List, Optional
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+
+def generate_posts(count: int = 100, users: int = 10) -> List[dict]:
+    """Deterministic JSONPlaceholder-like posts with a few planted anomalies"""
+    posts = []
+    for post_id in range(1, count + 1):
+        user_id = (post_id - 1) % users + 1
+        if post_id % 17 == 0:
+            title = f"Ad {post_id}"
+        elif post_id % 23 == 0:
+            title = "Limited time offer on everything"
+        else:
+            title = f"Sponsored post number {post_id} about product {post_id % 7}"
+        posts.append(
+            {
+                "userId": user_id,
+                "id": post_id,
+                "title": title,
+                "body": f"Body of post {post_id}\nwith some text",
+            }
+        )
+    return posts
+
+
+class FakeUpstream:
+    """
+    In-process stand-in for JSONPlaceholder that injects latency and errors
+
+    Serve it through httpx.ASGITransport(app=fake.app) or run fake.app with
+    any ASGI server.
+    """
+
+    def __init__(
+        self,
+        posts: Optional[List[dict]] = None,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.posts = posts if posts is not None else generate_posts()
+        self.latency = latency
+        self.error_rate = error_rate
+        # Force the next N requests to fail with 503
+        self.fail_next = 0
+        # Per-request latency overrides, consumed in order
+        self.latency_script: List[float] = []
+        self.requests = 0
+        self._random = random.Random(seed)
+        self.app = self._build_app()
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/posts")
+        async def posts(userId: Optional[int] = Query(None)):
+            self.requests += 1
+            delay = self.latency_script.pop(0) if self.latency_script else self.latency
+            if delay:
+                await asyncio.sleep(delay)
+
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return JSONResponse({"error": "injected"}, status_code=503)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return JSONResponse({"error": "injected"}, status_code=500)
+
+            if userId is not None:
+                return [p for p in self.posts if p["userId"] == userId]
+            return self.posts
+
+        return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--posts", type=int, default=100, help="Dataset size")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of 500 responses"
+    )
+    args = parser.parse_args()
+
+    import uvicorn
+
+    fake = FakeUpstream(
+        posts=generate_posts(args.posts, args.users),
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(fake.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Capacity check against a local JSONPlaceholder stand-in
+
+Starts benchmarks.fake_upstream and the API (uvicorn) as subprocesses, then
+drives concurrent traffic at each scenario and reports throughput,
+p50/p95/p99 latency and the API's resident memory.
+
+Run from backend/: python -m benchmarks.load_test --posts 5000 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+SCENARIOS: Dict[str, str] = {
+    "posts": "/api/posts/",
+    "anomalies": "/api/anomalies/",
+    "summary": "/api/summary/",
+}
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    duration: float
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    rss_mb: Optional[float] = None
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile of successful request latencies, in ms"""
+        if not self.latencies:
+            return float("nan")
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1] * 1000
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process (Linux only, None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+            await asyncio.sleep(0.2)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    path: str,
+    concurrency: int,
+    duration: float,
+    pid: int,
+) -> ScenarioResult:
+    result = ScenarioResult(name=name, duration=duration)
+    deadline = time.monotonic() + duration
+    peak_rss: List[float] = []
+
+    async def worker() -> None:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                result.latencies.append(time.perf_counter() - started)
+            else:
+                result.errors += 1
+
+    async def sample_rss() -> None:
+        while time.monotonic() < deadline:
+            value = rss_mb(pid)
+            if value is not None:
+                peak_rss.append(value)
+            await asyncio.sleep(0.25)
+
+    await asyncio.gather(sample_rss(), *(worker() for _ in range(concurrency)))
+    result.rss_mb = max(peak_rss) if peak_rss else None
+    return result
+
+
+def format_report(results: List[ScenarioResult]) -> str:
+    lines = [
+        f"{'scenario':<10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7} {'rss MB':>7}"
+    ]
+    for r in results:
+        rss = f"{r.rss_mb:.0f}" if r.rss_mb is not None else "n/a"
+        lines.append(
+            f"{r.name:<10} {r.throughput:>8.1f} {r.percentile(50):>8.1f} "
+            f"{r.percentile(95):>8.1f} {r.percentile(99):>8.1f} "
+            f"{r.errors:>7} {rss:>7}"
+        )
+    return "\n".join(lines)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    upstream_port, api_port = free_port(), free_port()
+    env = {
+        **os.environ,
+        "UPSTREAM_BASE_URL": f"http://127.0.0.1:{upstream_port}",
+        "REFRESH_INTERVAL_SECONDS": str(args.refresh_interval),
+        "LOG_LEVEL": "WARNING",
+    }
+    upstream = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_upstream",
+            f"--port={upstream_port}",
+            f"--posts={args.posts}",
+            f"--users={args.users}",
+            f"--latency-ms={args.latency_ms}",
+            f"--error-rate={args.error_rate}",
+        ]
+    )
+    api = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host=127.0.0.1",
+            f"--port={api_port}",
+            "--log-level=warning",
+            "--no-access-log",
+        ],
+        env=env,
+    )
+
+    try:
+        await wait_until_up(f"http://127.0.0.1:{upstream_port}/posts?userId=0")
+        await wait_until_up(f"http://127.0.0.1:{api_port}/ready")
+        print(
+            f"{args.posts} posts, {args.latency_ms:.0f}ms upstream latency, "
+            f"{args.error_rate:.0%} upstream errors, {args.concurrency} clients, "
+            f"{args.duration:.0f}s per scenario, baseline rss "
+            f"{rss_mb(api.pid) or float('nan'):.0f} MB\n"
+        )
+
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{api_port}", limits=limits, timeout=30.0
+        ) as client:
+            results = []
+            for name in args.scenarios:
+                # One untimed request so the first scenario does not pay warm-up
+                await client.get(SCENARIOS[name])
+                results.append(
+                    await run_scenario(
+                        client,
+                        name,
+                        SCENARIOS[name],
+                        args.concurrency,
+                        args.duration,
+                        api.pid,
+                    )
+                )
+
+        print(format_report(results))
+    finally:
+        for process in (api, upstream):
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=5000, help="Dataset size")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of upstream 500s"
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per scenario"
+    )
+    parser.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=0.0,
+        help="Snapshot refresh seconds for the API (0 measures on-demand analysis)",
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=lambda raw: raw.split(","),
+        default=list(SCENARIOS),
+        help=f"Comma-separated subset of {','.join(SCENARIOS)}",
+    )
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
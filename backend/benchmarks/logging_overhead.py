@@ -0,0 +1,125 @@
+"""
+Per-request logging overhead on the calling thread (the event loop)
+
+Run from backend/: python -m benchmarks.logging_overhead
+"""
+
+import logging
+import os
+import queue
+import time
+import timeit
+from logging.handlers import QueueListener
+
+from app.utils.logger import DeferredQueueHandler, TextFormatter
+
+CALLS = 20_000
+
+
+class SlowStream:
+    """A sink that stalls like a congested pipe or terminal"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, data: str) -> None:
+        time.sleep(self.delay)
+
+    def flush(self) -> None:
+        pass
+
+
+def make_sync_logger(name: str, stream) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(TextFormatter("%(levelname)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def make_queued_logger(name: str, stream) -> tuple:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(TextFormatter("%(levelname)s: %(message)s"))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    return logger, listener
+
+
+def per_call_us(statement, number: int = CALLS) -> float:
+    return timeit.timeit(statement, number=number) / number * 1e6
+
+
+def main() -> None:
+    limit, ids = 50, [1, 2, 3]
+    results = []
+
+    with open(os.devnull, "w") as devnull:
+        sync = make_sync_logger("bench.sync", devnull)
+        queued, listener = make_queued_logger("bench.queued", devnull)
+
+        results.append(
+            (
+                "info, sync StreamHandler, f-string",
+                per_call_us(
+                    lambda: sync.info(f"Fetching posts with limit: {limit}, ids: {ids}")
+                ),
+            )
+        )
+        results.append(
+            (
+                "info, queue handler, lazy %-args",
+                per_call_us(
+                    lambda: queued.info(
+                        "Fetching posts with limit: %s, ids: %s", limit, ids
+                    )
+                ),
+            )
+        )
+        results.append(
+            (
+                "debug disabled, f-string",
+                per_call_us(lambda: sync.debug(f"Detected {len(ids)} anomalies {ids}")),
+            )
+        )
+        results.append(
+            (
+                "debug disabled, lazy %-args",
+                per_call_us(
+                    lambda: sync.debug("Detected %s anomalies %s", len(ids), ids)
+                ),
+            )
+        )
+        listener.stop()
+
+    slow = SlowStream(delay=0.0005)
+    sync = make_sync_logger("bench.sync.slow", slow)
+    queued, listener = make_queued_logger("bench.queued.slow", slow)
+    results.append(
+        (
+            "info, sync, slow sink (0.5ms/write)",
+            per_call_us(lambda: sync.info("Fetching posts %s", limit), number=200),
+        )
+    )
+    results.append(
+        (
+            "info, queue, slow sink (0.5ms/write)",
+            per_call_us(lambda: queued.info("Fetching posts %s", limit), number=200),
+        )
+    )
+    listener.stop()
+
+    width = max(len(name) for name, _ in results)
+    print(f"{'case':<{width}}  us/call (calling thread)")
+    for name, value in results:
+        print(f"{name:<{width}}  {value:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
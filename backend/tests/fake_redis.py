@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.services.cache_backend import UNLOCK_SCRIPT
+
+
+class FakeRedisServer:
+    """
+    Local stand-in speaking enough RESP2 for RedisCacheBackend
+
+    Supports PING, AUTH, SELECT, GET, SET (PX/EX/NX), DEL, INCR and EVAL of
+    the lock release script.
+    """
+
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands: List[str] = []
+        self.port: Optional[int] = None
+        # Seconds to wait before sending each reply
+        self.reply_delay = 0.0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> List[bytes]:
+        header = await reader.readline()
+        if not header:
+            raise ConnectionError
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _execute(self, args: List[bytes]) -> bytes:
+        command = args[0].upper().decode()
+        self.commands.append(command)
+
+        if command in ("PING", "AUTH", "SELECT"):
+            return b"+OK\r\n"
+        if command == "GET":
+            value = self._get(args[1])
+            if value is None:
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "SET":
+            key, value, options = args[1], args[2], [a.upper() for a in args[3:]]
+            if b"NX" in options and self._get(key) is not None:
+                return b"$-1\r\n"
+            expires_at = None
+            if b"PX" in options:
+                expires_at = (
+                    time.monotonic() + int(args[3 + options.index(b"PX") + 1]) / 1000
+                )
+            if b"EX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"EX") + 1])
+            self.data[key] = (value, expires_at)
+            return b"+OK\r\n"
+        if command == "DEL":
+            removed = sum(1 for key in args[1:] if self.data.pop(key, None))
+            return b":%d\r\n" % removed
+        if command == "INCR":
+            value = int(self._get(args[1]) or 0) + 1
+            self.data[args[1]] = (str(value).encode(), None)
+            return b":%d\r\n" % value
+        if command == "EVAL" and args[1].decode() == UNLOCK_SCRIPT:
+            key, token = args[3], args[4]
+            if self._get(key) == token:
+                del self.data[key]
+                return b":1\r\n"
+            return b":0\r\n"
+        return b"-ERR unknown command\r\n"
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                reply = self._execute(await self._read_command(reader))
+                if self.reply_delay:
+                    await asyncio.sleep(self.reply_delay)
+                writer.write(reply)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
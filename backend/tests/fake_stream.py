@@ -0,0 +1,24 @@
+from typing import AsyncIterator, Callable, List, Optional
+
+from app.models import Post
+
+STREAM_POSTS = (
+    "app.services.jsonplaceholder_service.jsonplaceholder_service.stream_posts"
+)
+
+
+def stream_of(posts: List[Post], batch_size: int = 2) -> Callable:
+    """
+    side_effect for patching JSONPlaceholderService.stream_posts
+
+    Serves posts in small batches so multi-batch accumulation is exercised.
+    """
+
+    async def stream_posts(
+        limit: Optional[int] = None, **kwargs
+    ) -> AsyncIterator[List[Post]]:
+        selected = posts[:limit] if limit else posts
+        for start in range(0, len(selected), batch_size):
+            yield list(selected[start : start + batch_size])
+
+    return stream_posts
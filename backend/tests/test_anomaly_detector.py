@@ -96,3 +96,12 @@ class TestAnomalyDetector:
         reasons = [a.reason for a in anomalies]
         assert "short_title" in reasons
         assert "duplicate_title" in reasons
+
+    def test_details_skipped_when_not_requested(self):
+        """Test that projections without details do not format them"""
+        posts = [Post(userId=1, id=1, title="Short", body="Test body")]
+
+        anomalies = self.detector.detect_anomalies(posts, include_details=False)
+
+        assert anomalies[0].reason == "short_title"
+        assert anomalies[0].details is None
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+
+from app.models import Post
+from app.services.anomaly_stream import (
+    AnomalyBroadcaster,
+    Subscription,
+    compute_anomaly_delta,
+)
+from app.services.snapshot_service import build_snapshot
+
+BASE_POSTS = [
+    Post(userId=1, id=1, title="Short", body="Body 1"),
+    Post(userId=1, id=2, title="A perfectly normal title", body="Body 2"),
+    Post(userId=2, id=3, title="Tiny", body="Body 3"),
+]
+
+
+def parse_sse(message: str) -> dict:
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return {"event": fields["event"], "data": json.loads(fields["data"])}
+
+
+class TestComputeAnomalyDelta:
+    def test_delta_reports_added_and_cleared(self):
+        """Test that only changed anomalies and counters are reported"""
+        previous = build_snapshot(BASE_POSTS, version=1)
+        changed_posts = [
+            BASE_POSTS[0],
+            Post(userId=1, id=2, title="Now short", body="Body 2"),
+            Post(userId=2, id=3, title="Long enough title now", body="Body 3"),
+        ]
+        current = build_snapshot(changed_posts, version=2)
+
+        delta = compute_anomaly_delta(previous, current)
+
+        assert delta["snapshotVersion"] == 2
+        assert delta["previousVersion"] == 1
+        assert [a["id"] for a in delta["added"]] == [2]
+        assert [a["id"] for a in delta["cleared"]] == [3]
+        assert delta["summaryDelta"]["total_anomalies"] == 0
+        assert delta["summaryDelta"]["by_user"] == {1: 1, 2: -1}
+        assert delta["summaryDelta"]["by_reason"] == {}
+
+    def test_first_delta_adds_everything(self):
+        """Test that the first snapshot is reported as all additions"""
+        current = build_snapshot(BASE_POSTS, version=1)
+
+        delta = compute_anomaly_delta(None, current)
+
+        assert len(delta["added"]) == 2
+        assert delta["cleared"] == []
+        assert delta["summaryDelta"]["total_anomalies"] == 2
+
+
+class TestSubscription:
+    def test_overflow_replaces_backlog_with_resync(self):
+        """Test that a slow client is bounded and flagged for resync"""
+        subscription = Subscription(queue_size=2)
+
+        assert subscription.offer("one")
+        assert subscription.offer("two")
+        assert not subscription.offer("three")
+
+        assert subscription.queue.qsize() == 1
+        assert subscription.queue.get_nowait() is None
+
+
+class TestAnomalyBroadcaster:
+    def test_delta_is_fanned_out_to_all_subscribers(self):
+        """Test that one computed delta reaches every subscriber"""
+        broadcaster = AnomalyBroadcaster()
+        subscriptions = [broadcaster.subscribe() for _ in range(3)]
+        previous = build_snapshot(BASE_POSTS, version=1)
+        current = build_snapshot(BASE_POSTS[:1], version=2)
+
+        broadcaster.on_snapshot(previous, current)
+        broadcaster.wait(timeout=5)
+
+        messages = [s.queue.get_nowait() for s in subscriptions]
+        assert len(set(map(id, messages))) == 1
+        event = parse_sse(messages[0])
+        assert event["event"] == "delta"
+        assert [a["id"] for a in event["data"]["cleared"]] == [3]
+
+    def test_unchanged_snapshot_sends_nothing(self):
+        """Test that refreshes without anomaly changes are not broadcast"""
+        broadcaster = AnomalyBroadcaster()
+        subscription = broadcaster.subscribe()
+
+        broadcaster.on_snapshot(
+            build_snapshot(BASE_POSTS, version=1), build_snapshot(BASE_POSTS, version=2)
+        )
+        broadcaster.wait(timeout=5)
+
+        assert subscription.queue.empty()
+
+    def test_delta_is_computed_off_the_event_loop(self):
+        """Test that only the fan-out of the finished message runs on the loop"""
+        broadcaster = AnomalyBroadcaster()
+        threads = []
+        broadcast = broadcaster._broadcast
+        fan_out = broadcaster._fan_out
+
+        def recording_broadcast(*args):
+            threads.append(("delta", threading.get_ident()))
+            broadcast(*args)
+
+        def recording_fan_out(message):
+            threads.append(("fan_out", threading.get_ident()))
+            fan_out(message)
+
+        broadcaster._broadcast = recording_broadcast
+        broadcaster._fan_out = recording_fan_out
+
+        async def publish():
+            subscription = broadcaster.subscribe()
+            broadcaster.on_snapshot(
+                build_snapshot(BASE_POSTS, version=1),
+                build_snapshot(BASE_POSTS[:1], version=2),
+            )
+            return await asyncio.wait_for(subscription.queue.get(), timeout=5)
+
+        message = asyncio.run(publish())
+
+        assert parse_sse(message)["event"] == "delta"
+        # asyncio.run drives the loop on this thread
+        steps = dict(threads)
+        assert steps["fan_out"] == threading.get_ident()
+        assert steps["delta"] != threading.get_ident()
+
+    def test_events_stream_snapshot_then_deltas(self):
+        """Test the per-client event stream and its cleanup"""
+        broadcaster = AnomalyBroadcaster()
+        broadcaster.heartbeat_interval = 0.01
+
+        async def consume():
+            stream = broadcaster.events()
+            first = await stream.__anext__()
+            assert broadcaster.subscriber_count == 1
+            keep_alive = await stream.__anext__()
+            await stream.aclose()
+            return first, keep_alive
+
+        first, keep_alive = asyncio.run(consume())
+
+        # No snapshot published yet, so the stream starts with a heartbeat
+        assert first == ": keep-alive\n\n"
+        assert keep_alive == ": keep-alive\n\n"
+        assert broadcaster.subscriber_count == 0
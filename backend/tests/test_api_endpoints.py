@@ -1,7 +1,10 @@
 from fastapi.testclient import TestClient
 from unittest.mock import patch
+from app.api.params import MAX_BATCH_IDS
 from app.main import app
 from app.models import Post, Anomaly, WordFrequency, UserSummary
+from app.services.anomaly_detector import AnomalyTracker, anomaly_detector
+from tests.fake_stream import STREAM_POSTS, stream_of
 
 client = TestClient(app)
 
@@ -43,10 +46,10 @@ class TestPostsEndpoint:
 
 
 class TestAnomaliesEndpoint:
-    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
-    @patch("app.services.anomaly_detector.anomaly_detector.detect_anomalies")
+    @patch(STREAM_POSTS)
+    @patch("app.services.anomaly_detector.AnomalyTracker.anomalies")
     @patch("app.services.anomaly_detector.anomaly_detector.get_anomaly_summary")
-    def test_get_anomalies_success(self, mock_summary, mock_detect, mock_get_posts):
+    def test_get_anomalies_success(self, mock_summary, mock_detect, mock_stream_posts):
         """Test successful anomalies detection"""
         mock_posts = [
             Post(userId=1, id=1, title="Short", body="Test body"),
@@ -63,7 +66,7 @@ class TestAnomaliesEndpoint:
             "unique_users_affected": 1,
         }
 
-        mock_get_posts.return_value = mock_posts
+        mock_stream_posts.side_effect = stream_of(mock_posts)
         mock_detect.return_value = mock_anomalies
         mock_summary.return_value = mock_summary_data
 
@@ -76,14 +79,14 @@ class TestAnomaliesEndpoint:
         assert data["anomalies"][0]["reason"] == "short_title"
         assert data["summary"]["total_anomalies"] == 1
 
-    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
-    def test_get_anomalies_with_user_filter(self, mock_get_posts):
+    @patch(STREAM_POSTS)
+    def test_get_anomalies_with_user_filter(self, mock_stream_posts):
         """Test anomalies filtering by user ID"""
         mock_posts = [
             Post(userId=1, id=1, title="Short", body="Test body"),
             Post(userId=2, id=2, title="Also short", body="Test body"),
         ]
-        mock_get_posts.return_value = mock_posts
+        mock_stream_posts.side_effect = stream_of(mock_posts)
 
         response = client.get("/api/anomalies/?user_id=1")
 
@@ -92,10 +95,12 @@ class TestAnomaliesEndpoint:
 
 
 class TestSummaryEndpoint:
-    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
-    @patch("app.services.text_analyzer.text_analyzer.calculate_word_frequency")
-    @patch("app.services.text_analyzer.text_analyzer.get_top_users_by_unique_words")
-    def test_get_summary_success(self, mock_top_users, mock_word_freq, mock_get_posts):
+    @patch(STREAM_POSTS)
+    @patch("app.services.text_analyzer.TextStats.word_frequencies")
+    @patch("app.services.text_analyzer.TextStats.top_users")
+    def test_get_summary_success(
+        self, mock_top_users, mock_word_freq, mock_stream_posts
+    ):
         """Test successful summary generation"""
         mock_posts = [
             Post(userId=1, id=1, title="Hello world", body="Test body"),
@@ -120,7 +125,7 @@ class TestSummaryEndpoint:
             ),
         ]
 
-        mock_get_posts.return_value = mock_posts
+        mock_stream_posts.side_effect = stream_of(mock_posts)
         mock_word_freq.return_value = mock_word_frequencies
         mock_top_users.return_value = mock_top_users_data
 
@@ -135,11 +140,11 @@ class TestSummaryEndpoint:
         assert data["topUsers"][0]["userId"] == 1
         assert data["mostFrequentWords"][0]["word"] == "hello"
 
-    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
-    def test_get_summary_with_parameters(self, mock_get_posts):
+    @patch(STREAM_POSTS)
+    def test_get_summary_with_parameters(self, mock_stream_posts):
         """Test summary with custom parameters"""
         mock_posts = [Post(userId=1, id=1, title="Test", body="Test")]
-        mock_get_posts.return_value = mock_posts
+        mock_stream_posts.side_effect = stream_of(mock_posts)
 
         response = client.get("/api/summary/?top_users=5&top_words=10")
 
@@ -147,6 +152,121 @@ class TestSummaryEndpoint:
         # Verify parameters are passed through
 
 
+class TestBatchEndpoints:
+    @patch(
+        "app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts_by_users"
+    )
+    def test_get_posts_for_multiple_users(self, mock_get_posts_by_users):
+        """Test batch posts retrieval with a single service call"""
+        mock_get_posts_by_users.return_value = [
+            Post(userId=1, id=1, title="First", body="Body"),
+            Post(userId=3, id=7, title="Third", body="Body"),
+        ]
+
+        response = client.get("/api/posts/?user_ids=1,3,1")
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+        mock_get_posts_by_users.assert_called_once_with([1, 3])
+
+    @patch(STREAM_POSTS)
+    def test_get_anomalies_for_multiple_users(self, mock_stream_posts):
+        """Test batch anomalies filtering by several user IDs"""
+        mock_stream_posts.side_effect = stream_of(
+            [
+                Post(userId=1, id=1, title="Short", body="Body"),
+                Post(userId=2, id=2, title="Tiny", body="Body"),
+                Post(userId=3, id=3, title="Small", body="Body"),
+            ]
+        )
+
+        response = client.get("/api/anomalies/?user_ids=1,3")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert {a["userId"] for a in data["anomalies"]} == {1, 3}
+        assert data["summary"]["unique_users_affected"] == 2
+
+    def test_invalid_user_ids(self):
+        """Test that malformed batch IDs are rejected"""
+        response = client.get("/api/posts/?user_ids=1,abc")
+
+        assert response.status_code == 400
+        assert "user_ids" in response.json()["detail"]
+
+    @patch(STREAM_POSTS)
+    def test_user_id_zero_is_a_filter(self, mock_stream_posts):
+        """Test that user_id=0 filters to that user instead of being dropped"""
+        mock_stream_posts.side_effect = stream_of(
+            [
+                Post(userId=0, id=1, title="Short", body="Body"),
+                Post(userId=2, id=2, title="Tiny", body="Body"),
+            ]
+        )
+
+        response = client.get("/api/anomalies/?user_id=0")
+
+        assert response.status_code == 200
+        assert {a["userId"] for a in response.json()["anomalies"]} == {0}
+
+    def test_user_id_counts_towards_batch_limit(self):
+        """Test that user_id is merged before the batch size is checked"""
+        ids = ",".join(str(i) for i in range(1, MAX_BATCH_IDS + 1))
+
+        response = client.get(f"/api/anomalies/?user_ids={ids}&user_id=500")
+
+        assert response.status_code == 400
+        assert str(MAX_BATCH_IDS) in response.json()["detail"]
+
+
+class TestFieldProjection:
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_posts_fields(self, mock_get_posts):
+        """Test that only the selected post fields are serialized"""
+        mock_get_posts.return_value = [
+            Post(userId=1, id=1, title="Test Post", body="Long body"),
+        ]
+
+        response = client.get("/api/posts/?fields=id,title")
+
+        assert response.status_code == 200
+        assert response.json()["posts"] == [{"id": 1, "title": "Test Post"}]
+        assert response.json()["total"] == 1
+
+    @patch("app.api.routes.anomalies.AnomalyTracker", wraps=AnomalyTracker)
+    @patch(STREAM_POSTS)
+    def test_anomalies_without_details(self, mock_stream_posts, mock_tracker):
+        """Test that anomaly details are neither formatted nor returned"""
+        mock_stream_posts.side_effect = stream_of(
+            [Post(userId=1, id=1, title="Short", body="Body")]
+        )
+
+        response = client.get("/api/anomalies/?fields=id,reason")
+
+        assert response.status_code == 200
+        assert response.json()["anomalies"] == [{"id": 1, "reason": "short_title"}]
+        mock_tracker.assert_called_once_with(anomaly_detector, False)
+
+    @patch(STREAM_POSTS)
+    def test_summary_without_unique_words(self, mock_stream_posts):
+        """Test that top users can omit their unique word lists"""
+        mock_stream_posts.side_effect = stream_of(
+            [Post(userId=1, id=1, title="alpha beta gamma", body="Body")]
+        )
+
+        response = client.get("/api/summary/?fields=userId,uniqueWordCount")
+
+        assert response.status_code == 200
+        assert response.json()["topUsers"] == [{"userId": 1, "uniqueWordCount": 3}]
+
+    def test_unknown_field(self):
+        """Test that unknown fields are rejected"""
+        response = client.get("/api/posts/?fields=id,password")
+
+        assert response.status_code == 400
+        assert "fields" in response.json()["detail"]
+
+
 class TestErrorHandling:
     @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
     def test_api_error_handling(self, mock_get_posts):
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import socket
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.models import Post
+from app.services.cache_backend import (
+    CacheBackend,
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+    create_cache_backend,
+    decode_payload,
+    encode_payload,
+)
+from app.services.jsonplaceholder_service import (
+    UPSTREAM_POSTS_KEY,
+    JSONPlaceholderService,
+)
+from app.services.resilience import ResilientClient
+from app.services.snapshot_service import (
+    SnapshotStore,
+    build_snapshot,
+    snapshot_from_payload,
+    snapshot_to_payload,
+)
+from tests.fake_redis import FakeRedisServer
+from benchmarks.fake_upstream import FakeUpstream, generate_posts
+
+POSTS = [Post(**p) for p in generate_posts(40, users=4)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def with_redis(test):
+    """Run an async test body against a fresh local fake Redis server"""
+
+    async def run():
+        server = FakeRedisServer()
+        await server.start()
+        backend = RedisCacheBackend(server.url)
+        try:
+            return await test(server, backend)
+        finally:
+            await backend.aclose()
+            await server.stop()
+
+    return asyncio.run(run())
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestPayloadEncoding:
+    def test_round_trip_is_compact(self):
+        """Test that payloads survive encoding and are smaller than JSON"""
+        data = generate_posts(100)
+
+        encoded = encode_payload(data)
+
+        assert decode_payload(encoded) == data
+        assert len(encoded) < len(json.dumps(data)) / 3
+
+    def test_snapshot_round_trip(self):
+        """Test that a snapshot rebuilt from its payload matches the original"""
+        snapshot = build_snapshot(POSTS, version=5)
+
+        restored = snapshot_from_payload(
+            decode_payload(encode_payload(snapshot_to_payload(snapshot)))
+        )
+
+        assert restored == snapshot
+        assert set(restored.anomaly_summary["by_user"]) <= {1, 2, 3, 4}
+
+
+class TestInMemoryCacheBackend:
+    def test_entries_and_locks_expire(self):
+        """Test TTL expiry of values and locks"""
+        clock = FakeClock()
+        backend = InMemoryCacheBackend(clock=clock)
+
+        async def run():
+            await backend.set("key", b"value", ttl=10)
+            token = await backend.acquire_lock("job", ttl=5)
+            assert await backend.acquire_lock("job", ttl=5) is None
+
+            clock.now = 6
+            assert await backend.get("key") == b"value"
+            assert await backend.acquire_lock("job", ttl=5) is not None
+
+            clock.now = 11
+            assert await backend.get("key") is None
+            return token
+
+        assert asyncio.run(run()) is not None
+
+    def test_create_backend_defaults_to_in_process(self):
+        """Test backend selection from the configured URL"""
+        assert isinstance(create_cache_backend(None), InMemoryCacheBackend)
+        assert isinstance(
+            create_cache_backend("redis://cache:6379/0"), RedisCacheBackend
+        )
+        assert isinstance(
+            create_cache_backend("rediss://cache:6380/0"), InMemoryCacheBackend
+        )
+
+
+class TestRedisCacheBackend:
+    def test_basic_commands(self):
+        """Test get/set/incr/delete against the local stand-in server"""
+
+        async def test(server, backend):
+            await backend.set("key", b"\x00binary\xff", ttl=60)
+            assert await backend.get("key") == b"\x00binary\xff"
+            assert await backend.incr("counter") == 1
+            assert await backend.incr("counter") == 2
+            await backend.delete("key")
+            assert await backend.get("key") is None
+            assert "SET" in server.commands
+
+        with_redis(test)
+
+    def test_lock_is_exclusive_and_token_guarded(self):
+        """Test that only the holder's token releases the distributed lock"""
+
+        async def test(server, backend):
+            other = RedisCacheBackend(server.url)
+            try:
+                token = await backend.acquire_lock("refresh", ttl=30)
+                assert token is not None
+                assert await other.acquire_lock("refresh", ttl=30) is None
+
+                await other.release_lock("refresh", "not-the-token")
+                assert await other.acquire_lock("refresh", ttl=30) is None
+
+                await backend.release_lock("refresh", token)
+                assert await other.acquire_lock("refresh", ttl=30) is not None
+            finally:
+                await other.aclose()
+
+        with_redis(test)
+
+    def test_cancelled_command_does_not_leak_its_reply(self):
+        """Test that a reply left unread by a cancelled call is never returned"""
+
+        async def test(server, backend):
+            await backend.set("a", b"1", ttl=60)
+            await backend.set("b", b"2", ttl=60)
+
+            server.reply_delay = 0.1
+            pending = asyncio.create_task(backend.get("a"))
+            await asyncio.sleep(0.02)
+            pending.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await pending
+
+            server.reply_delay = 0.0
+            assert await backend.get("b") == b"2"
+
+        with_redis(test)
+
+    def test_fallback_lock_is_released_locally(self):
+        """Test that a lock taken while Redis was down is released in-process"""
+
+        async def test(server, backend):
+            with patch.object(backend, "_execute", side_effect=ConnectionError):
+                token = await backend.acquire_lock("job", ttl=30)
+            assert token is not None
+
+            await backend.release_lock("job", token)
+
+            assert await backend.fallback.acquire_lock("job", ttl=30) is not None
+            assert "EVAL" not in server.commands
+
+        with_redis(test)
+
+    def test_unreachable_server_falls_back_to_local_cache(self):
+        """Test that the API keeps caching in-process when Redis is down"""
+        backend = RedisCacheBackend(f"redis://127.0.0.1:{unused_port()}/0")
+
+        async def run():
+            await backend.set("key", b"value", ttl=60)
+            return await backend.get("key"), await backend.acquire_lock("job", 5)
+
+        value, token = asyncio.run(run())
+
+        assert value == b"value"
+        assert token is not None
+
+    def test_failed_connect_backs_off(self):
+        """Test that a down server is not reconnected to on every call"""
+        clock = FakeClock()
+        backend = RedisCacheBackend(f"redis://127.0.0.1:{unused_port()}/0", clock=clock)
+        attempts = []
+        connect = backend._connect
+
+        async def counting_connect():
+            attempts.append(clock.now)
+            await connect()
+
+        backend._connect = counting_connect
+
+        async def run():
+            for now in (0.0, 0.5, 0.9, 1.0, 2.5, 3.0):
+                clock.now = now
+                await backend.get("key")
+
+        asyncio.run(run())
+
+        # Retried after 1s, then after a doubled 2s backoff
+        assert attempts == [0.0, 1.0, 3.0]
+
+    def test_cache_backend_is_abstract(self):
+        """Test that backends must implement the whole interface"""
+
+        class Partial(CacheBackend):
+            async def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            Partial()
+
+
+class TestSharedRefresh:
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_only_one_replica_recomputes(self, mock_get_posts):
+        """Test that concurrent replicas share one computation via the lock"""
+
+        async def slow_get_posts(limit=None):
+            await asyncio.sleep(0.05)
+            return POSTS
+
+        mock_get_posts.side_effect = slow_get_posts
+
+        async def test(server, backend):
+            replicas = [SnapshotStore(cache=backend) for _ in range(3)]
+            for replica in replicas:
+                replica.lock_poll_interval = 0.01
+            return await asyncio.gather(*(r.refresh() for r in replicas))
+
+        snapshots = with_redis(test)
+
+        assert mock_get_posts.call_count == 1
+        assert {s.version for s in snapshots} == {1}
+        assert all(s.posts == snapshots[0].posts for s in snapshots)
+
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_replica_adopts_fresh_shared_snapshot(self, mock_get_posts):
+        """Test that a later replica reuses the cached snapshot"""
+        mock_get_posts.return_value = POSTS
+
+        async def test(server, backend):
+            first = await SnapshotStore(cache=backend).refresh()
+            second = await SnapshotStore(cache=backend).refresh()
+            return first, second
+
+        first, second = with_redis(test)
+
+        assert mock_get_posts.call_count == 1
+        assert second.version == first.version
+        assert second.anomaly_summary == first.anomaly_summary
+
+
+class TestSharedUpstreamCache:
+    def test_replica_serves_posts_cached_by_another(self):
+        """Test stale fallback through the shared cache"""
+        healthy, failing = FakeUpstream(), FakeUpstream()
+        failing.fail_next = 10
+
+        def make_service(fake, backend):
+            client = ResilientClient(
+                transport=httpx.ASGITransport(app=fake.app), max_retries=0
+            )
+            return JSONPlaceholderService(
+                base_url="http://upstream.test", client=client, shared_cache=backend
+            )
+
+        async def test(server, backend):
+            first = make_service(healthy, backend)
+            second = make_service(failing, backend)
+            try:
+                await first.get_posts()
+                return await second.get_posts_by_user(3)
+            finally:
+                await first.aclose()
+                await second.aclose()
+
+        posts = with_redis(test)
+
+        assert posts and all(p.userId == 3 for p in posts)
+
+    def test_unchanged_feed_is_shared_once(self):
+        """Test that refetching an identical feed does not rewrite the cache"""
+        backend = InMemoryCacheBackend()
+        backend.is_shared = True
+        fake = FakeUpstream()
+        client = ResilientClient(
+            transport=httpx.ASGITransport(app=fake.app), max_retries=0
+        )
+        service = JSONPlaceholderService(
+            base_url="http://upstream.test", client=client, shared_cache=backend
+        )
+        writes = []
+        original_set = backend.set
+
+        async def counting_set(key, value, ttl):
+            writes.append(key)
+            await original_set(key, value, ttl)
+
+        backend.set = counting_set
+
+        async def run():
+            try:
+                await service.get_posts_data()
+                await service.get_posts_data()
+            finally:
+                await service.aclose()
+
+        asyncio.run(run())
+
+        assert writes == [UPSTREAM_POSTS_KEY]
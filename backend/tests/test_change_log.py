@@ -0,0 +1,131 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.change_log import DatasetChangeLog, VersionGoneError
+from app.services.snapshot_service import build_snapshot, snapshot_store
+
+import pytest
+
+client = TestClient(app)
+
+
+def post(post_id: int, title: str = "A perfectly normal title", user_id: int = 1):
+    return Post(userId=user_id, id=post_id, title=title, body="Body")
+
+
+V1 = [post(1), post(2, "Another normal title"), post(3, "Short")]
+# Post 1 edited, post 2 removed, post 4 added; post 3 unchanged
+V2 = [
+    post(1, "An edited but normal title"),
+    post(3, "Short"),
+    post(4, "Yet another normal title"),
+]
+# Post 3 becomes long (clears its anomaly), post 4 removed again
+V3 = [post(1, "An edited but normal title"), post(3, "No longer a short title")]
+
+
+def log_of(*datasets, max_versions: int = 8) -> DatasetChangeLog:
+    log = DatasetChangeLog(max_versions)
+    for version, posts in enumerate(datasets, start=1):
+        log.record(build_snapshot(posts, version))
+    return log
+
+
+def ids(items) -> list:
+    return [item.id for item in items]
+
+
+class TestDatasetChangeLog:
+    def test_changes_between_consecutive_versions(self):
+        """Test added, removed and modified posts from content digests"""
+        changes = log_of(V1, V2).changes_since(1)
+
+        assert ids(changes.added) == [4]
+        assert ids(changes.removed) == [2]
+        assert ids(changes.modified) == [1]
+        assert changes.modified[0].title == "An edited but normal title"
+        assert changes.anomalies_raised == changes.anomalies_cleared == []
+
+    def test_changes_compose_across_versions(self):
+        """Test that intermediate churn nets out across several refreshes"""
+        changes = log_of(V1, V2, V3).changes_since(1)
+
+        # Post 4 was added then removed again: no net change
+        assert ids(changes.added) == []
+        assert ids(changes.removed) == [2]
+        assert ids(changes.modified) == [1, 3]
+        assert [(a.id, a.reason) for a in changes.anomalies_cleared] == [
+            (3, "short_title")
+        ]
+
+    def test_current_version_has_no_changes(self):
+        """Test that asking from the current version returns nothing"""
+        changes = log_of(V1, V2).changes_since(2)
+
+        assert changes.added == changes.removed == changes.modified == []
+
+    def test_history_is_bounded(self):
+        """Test that versions beyond the retained history are gone"""
+        log = log_of(V1, V2, V3, max_versions=1)
+
+        assert log.oldest_version == 2
+        with pytest.raises(VersionGoneError):
+            log.changes_since(1)
+        with pytest.raises(ValueError):
+            log.changes_since(9)
+
+    def test_version_restart_resets_history(self):
+        """Test that a lower version than the last one starts over"""
+        log = log_of(V1, V2)
+        log.record(build_snapshot(V1, version=1))
+
+        assert log.oldest_version == 1
+        assert log.changes_since(1).added == []
+
+    def test_snapshots_are_recorded_off_the_calling_thread(self):
+        """Test that the snapshot listener hands recording to its worker"""
+        log = DatasetChangeLog()
+        threads = []
+        record = log.record
+
+        def recording_record(snapshot):
+            threads.append(threading.get_ident())
+            record(snapshot)
+
+        log.record = recording_record
+        log.on_snapshot(None, build_snapshot(V1, version=1))
+        log.wait(timeout=5)
+
+        assert threads and threads[0] != threading.get_ident()
+        assert log.version == 1
+
+
+class TestChangesEndpoint:
+    def teardown_method(self):
+        snapshot_store.clear()
+
+    def test_changes_since_version(self):
+        """Test the changes endpoint over published snapshots"""
+        snapshot_store.publish(build_snapshot(V2, version=100))
+        snapshot_store.publish(build_snapshot(V3, version=101))
+
+        response = client.get("/api/changes/?since=100")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["sinceVersion"], data["snapshotVersion"]) == (100, 101)
+        assert [p["id"] for p in data["removed"]] == [4]
+        assert [p["id"] for p in data["modified"]] == [3]
+        assert [a["id"] for a in data["anomaliesCleared"]] == [3]
+
+        assert client.get("/api/changes/?since=50").status_code == 410
+        assert client.get("/api/changes/?since=500").status_code == 400
+
+    def test_requires_snapshot(self):
+        """Test that change tracking is unavailable without snapshots"""
+        snapshot_store.clear()
+
+        assert client.get("/api/changes/?since=1").status_code == 503
@@ -0,0 +1,168 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.api.responses import snapshot_payloads
+from app.main import app
+from app.models import Post
+from app.services.snapshot_service import build_snapshot, snapshot_store
+from app.utils.compression import (
+    CompressionMiddleware,
+    PayloadCache,
+    negotiate_encoding,
+)
+
+client = TestClient(app)
+
+POSTS = [
+    Post(
+        userId=1 + i % 3,
+        id=i + 1,
+        title=f"Post number {i} about campaign performance",
+        body="Repetitive ad copy that compresses well. " * 5,
+    )
+    for i in range(30)
+]
+
+
+class TestNegotiation:
+    def test_prefers_supported_encodings(self):
+        """Test q-values and wildcards in Accept-Encoding"""
+        assert negotiate_encoding(None) == "identity"
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+        assert negotiate_encoding("gzip;q=0, deflate") == "identity"
+        assert negotiate_encoding("*") in ("br", "gzip")
+        assert negotiate_encoding("identity") == "identity"
+
+
+class TestPayloadCache:
+    def test_renders_once_per_version(self):
+        """Test that payloads are reused until the snapshot version changes"""
+        cache = PayloadCache()
+        calls = []
+
+        def render():
+            calls.append(1)
+            return POSTS[0]
+
+        first = cache.get_or_render("post", 1, render)
+        assert cache.get_or_render("post", 1, render) is first
+        assert len(calls) == 1
+
+        cache.get_or_render("post", 2, render)
+        assert len(calls) == 2
+
+    def test_compressed_variant_is_cached(self):
+        """Test that each encoding is compressed at most once"""
+        cache = PayloadCache()
+        payload = cache.get_or_render("posts", 1, lambda: POSTS[0])
+        payload.body = payload.body * 50
+
+        body, encoding = payload.encoded("gzip")
+
+        assert encoding == "gzip"
+        assert payload.encoded("gzip")[0] is body
+        assert gzip.decompress(body) == payload.body
+
+    def test_cached_variant_uses_per_request_level(self):
+        """Test that cache misses are not compressed at an expensive level"""
+        cache = PayloadCache()
+        payload = cache.get_or_render("posts", 1, lambda: POSTS[0])
+        payload.body = payload.body * 50
+
+        body, _ = payload.encoded("gzip")
+
+        assert body == gzip.compress(payload.body, compresslevel=6, mtime=0)
+
+
+class TestCompressionMiddleware:
+    def make_client(self) -> TestClient:
+        inner = FastAPI()
+
+        @inner.get("/large")
+        async def large():
+            return PlainTextResponse("x" * 4096)
+
+        @inner.get("/small")
+        async def small():
+            return PlainTextResponse("ok")
+
+        @inner.get("/stream")
+        async def stream():
+            async def events():
+                yield "data: 1\n\n" * 200
+                yield "data: 2\n\n" * 200
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return TestClient(CompressionMiddleware(inner))
+
+    def test_compresses_large_responses(self):
+        """Test gzip for large bodies when the client accepts it"""
+        response = self.make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text == "x" * 4096
+
+    def test_leaves_small_and_streamed_responses(self):
+        """Test that small bodies and event streams pass through untouched"""
+        test_client = self.make_client()
+
+        small = test_client.get("/small", headers={"Accept-Encoding": "gzip"})
+        stream = test_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in stream.headers
+        assert stream.text.startswith("data: 1")
+
+
+class TestPrecompressedSnapshotRoutes:
+    def setup_method(self):
+        snapshot_store.publish(build_snapshot(POSTS, version=5))
+
+    def teardown_method(self):
+        snapshot_store.clear()
+
+    @patch("app.api.responses.snapshot_payloads.get_or_render")
+    def test_posts_served_compressed(self, mock_get_or_render):
+        """Test that snapshot posts are served gzip-encoded from the payload cache"""
+        mock_get_or_render.side_effect = PayloadCache().get_or_render
+
+        response = client.get("/api/posts/", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json()["total"] == 30
+        assert mock_get_or_render.call_count == 1
+
+    def test_repeat_requests_reuse_payload(self):
+        """Test that identical requests share one rendered payload"""
+        client.get("/api/summary/", headers={"Accept-Encoding": "identity"})
+        cached = len(snapshot_payloads)
+        response = client.get("/api/summary/", headers={"Accept-Encoding": "gzip"})
+
+        assert response.json()["snapshotVersion"] == 5
+        assert len(snapshot_payloads) == cached
+
+    def test_new_snapshot_drops_payloads(self):
+        """Test that publishing a snapshot invalidates rendered payloads"""
+        client.get("/api/anomalies/")
+        assert len(snapshot_payloads) > 0
+
+        snapshot_store.publish(build_snapshot(POSTS[:3], version=5))
+
+        assert len(snapshot_payloads) == 0
+        assert client.get("/api/posts/").json()["total"] == 3
+
+    def test_projection_is_cached_separately(self):
+        """Test that field projections get their own snapshot payloads"""
+        full = client.get("/api/posts/").json()
+        slim = client.get("/api/posts/?fields=id,title").json()
+
+        assert "body" in full["posts"][0]
+        assert set(slim["posts"][0]) == {"id", "title"}
@@ -0,0 +1,127 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.concurrency import ConcurrencyLimiter, OverloadedError, RequestCoalescer
+
+client = TestClient(app)
+
+
+class TestRequestCoalescer:
+    def test_concurrent_identical_requests_share_computation(self):
+        """Test that identical in-flight requests run the factory once"""
+        coalescer = RequestCoalescer()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        async def run_all():
+            return await asyncio.gather(
+                *(coalescer.run(("summary", 3, 20), compute) for _ in range(10))
+            )
+
+        results = asyncio.run(run_all())
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert coalescer.inflight_count == 0
+
+    def test_different_keys_compute_separately(self):
+        """Test that requests with different parameters are not merged"""
+        coalescer = RequestCoalescer()
+
+        async def run_all():
+            return await asyncio.gather(
+                coalescer.run("a", lambda: asyncio.sleep(0, result="a")),
+                coalescer.run("b", lambda: asyncio.sleep(0, result="b")),
+            )
+
+        assert asyncio.run(run_all()) == ["a", "b"]
+
+    def test_errors_propagate_to_all_waiters(self):
+        """Test that a failed computation fails every waiter and is not cached"""
+        coalescer = RequestCoalescer()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def run_all():
+            return await asyncio.gather(
+                *(coalescer.run("key", fail) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run_all())
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert coalescer.inflight_count == 0
+
+
+class TestConcurrencyLimiter:
+    def test_rejects_when_queue_is_full(self):
+        """Test fast failure once running and queued slots are exhausted"""
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=1, queue_timeout=1)
+
+        async def run_all():
+            release = asyncio.Event()
+            running = asyncio.create_task(limiter.run(release.wait))
+            queued = asyncio.create_task(limiter.run(lambda: asyncio.sleep(0)))
+            await asyncio.sleep(0.01)
+
+            with pytest.raises(OverloadedError) as exc_info:
+                await limiter.run(lambda: asyncio.sleep(0))
+
+            release.set()
+            await asyncio.gather(running, queued)
+            return exc_info.value
+
+        error = asyncio.run(run_all())
+
+        assert error.retry_after == 1
+        assert limiter.waiting == 0
+
+    def test_rejects_after_queue_timeout(self):
+        """Test that queued requests give up after the configured timeout"""
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=5, queue_timeout=0.01)
+
+        async def run_all():
+            release = asyncio.Event()
+            running = asyncio.create_task(limiter.run(release.wait))
+            await asyncio.sleep(0)
+
+            with pytest.raises(OverloadedError):
+                await limiter.run(lambda: asyncio.sleep(0))
+
+            release.set()
+            await running
+
+        asyncio.run(run_all())
+
+
+class TestOverloadResponses:
+    @patch("app.utils.concurrency.analysis_limiter.run")
+    def test_summary_overload_returns_retry_after(self, mock_run):
+        """Test that overload maps to 503 with a Retry-After header"""
+        mock_run.side_effect = OverloadedError("busy", retry_after=2.5)
+
+        response = client.get("/api/summary/?top_users=3&top_words=20")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+
+    @patch("app.utils.concurrency.analysis_limiter.run")
+    def test_anomalies_overload_returns_retry_after(self, mock_run):
+        """Test that anomalies overload maps to 503 with a Retry-After header"""
+        mock_run.side_effect = OverloadedError("busy", retry_after=1)
+
+        response = client.get("/api/anomalies/")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
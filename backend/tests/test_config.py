@@ -84,3 +84,90 @@ class TestLoadConfig:
         finally:
             if "LOG_LEVEL" in os.environ:
                 del os.environ["LOG_LEVEL"]
+
+    def test_load_config_numeric_tuning(self):
+        """Test loading numeric tuning knobs with invalid values ignored"""
+        os.environ["REFRESH_INTERVAL_SECONDS"] = "30"
+        os.environ["MAX_CONCURRENT_ANALYSES"] = "8"
+        os.environ["MAX_QUEUED_ANALYSES"] = "-1"
+        os.environ["ANALYSIS_QUEUE_TIMEOUT_SECONDS"] = "soon"
+
+        try:
+            settings = load_config()
+            assert settings.refresh_interval_seconds == 30.0
+            assert settings.max_concurrent_analyses == 8
+            # Should fall back to defaults
+            assert settings.max_queued_analyses == 32
+            assert settings.analysis_queue_timeout_seconds == 5.0
+        finally:
+            for var in [
+                "REFRESH_INTERVAL_SECONDS",
+                "MAX_CONCURRENT_ANALYSES",
+                "MAX_QUEUED_ANALYSES",
+                "ANALYSIS_QUEUE_TIMEOUT_SECONDS",
+            ]:
+                if var in os.environ:
+                    del os.environ[var]
+
+    def test_load_config_memory_budget(self):
+        """Test memory budget and spill directory configuration"""
+        os.environ["MEMORY_BUDGET_MB"] = "64"
+        os.environ["SPILL_DIR"] = "/var/tmp/spill"
+
+        try:
+            settings = load_config()
+            assert settings.memory_budget_mb == 64.0
+            assert settings.spill_dir == "/var/tmp/spill"
+        finally:
+            for var in ["MEMORY_BUDGET_MB", "SPILL_DIR"]:
+                if var in os.environ:
+                    del os.environ[var]
+
+    def test_load_config_ingest_batch_size(self):
+        """Test that the streaming batch size is at least one post"""
+        os.environ["INGEST_BATCH_SIZE"] = "0"
+
+        try:
+            assert load_config().ingest_batch_size == 1
+        finally:
+            del os.environ["INGEST_BATCH_SIZE"]
+
+    def test_load_config_text_profiles_file(self):
+        """Test the normalization profiles file setting"""
+        os.environ["TEXT_PROFILES_FILE"] = "/etc/app/profiles.json"
+
+        try:
+            assert load_config().text_profiles_file == "/etc/app/profiles.json"
+        finally:
+            del os.environ["TEXT_PROFILES_FILE"]
+
+    def test_load_config_change_log_versions(self):
+        """Test that at least one version of changes is retained"""
+        os.environ["CHANGE_LOG_VERSIONS"] = "0"
+
+        try:
+            assert load_config().change_log_versions == 1
+        finally:
+            del os.environ["CHANGE_LOG_VERSIONS"]
+
+    def test_load_config_query_budgets(self):
+        """Test that query budgets are read and 0 disables them"""
+        os.environ["QUERY_BUDGET_SUMMARY"] = "0"
+        os.environ["QUERY_BUDGET_ANOMALIES"] = "1000"
+
+        try:
+            config = load_config()
+            assert config.query_budget_summary == 0
+            assert config.query_budget_anomalies == 1000
+        finally:
+            del os.environ["QUERY_BUDGET_SUMMARY"]
+            del os.environ["QUERY_BUDGET_ANOMALIES"]
+
+    def test_load_config_sqlite_max_age(self):
+        """Test that the SQLite freshness window is configurable"""
+        os.environ["SQLITE_MAX_AGE_SECONDS"] = "60"
+
+        try:
+            assert load_config().sqlite_max_age_seconds == 60
+        finally:
+            del os.environ["SQLITE_MAX_AGE_SECONDS"]
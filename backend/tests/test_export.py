@@ -0,0 +1,144 @@
+import csv
+import io
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.snapshot_service import build_snapshot, snapshot_store
+from app.utils import arrow_ipc
+from app.utils.export import ANOMALY_COLUMNS, POST_COLUMNS, iter_export
+from tests.fake_stream import STREAM_POSTS, stream_of
+
+client = TestClient(app)
+
+POSTS = [
+    Post(userId=1, id=1, title="Short", body='Body, with "quotes"\nand lines'),
+    Post(userId=1, id=2, title="A perfectly normal title", body="Body"),
+    Post(userId=2, id=3, title="Another normal title", body="Body"),
+]
+
+ROWS = [(1, 1, "Café", "x"), (2, 3, "", None), (5, -7, "abc", "d" * 40)]
+
+
+def read_csv(data: bytes) -> list:
+    return list(csv.reader(io.StringIO(data.decode())))
+
+
+class TestArrowStream:
+    def test_pure_python_stream_reads_back(self):
+        """Test that the fallback writer produces a valid Arrow IPC stream"""
+        pyarrow = pytest.importorskip("pyarrow")
+        columns = [("userId", "int64"), ("id", "int64"), ("t", "utf8"), ("d", "utf8")]
+
+        data = b"".join(arrow_ipc.iter_arrow_stream(columns, iter([ROWS, []])))
+        table = pyarrow.ipc.open_stream(data).read_all()
+
+        assert table.column_names == ["userId", "id", "t", "d"]
+        assert [tuple(row.values()) for row in table.to_pylist()] == ROWS
+
+    def test_stream_framing(self):
+        """Test message framing: 8-byte aligned messages and end-of-stream marker"""
+        schema = arrow_ipc.schema_message(POST_COLUMNS)
+        batch = arrow_ipc.record_batch_message(POST_COLUMNS, [(1, 1, "t", "b")])
+
+        for message in (schema, batch):
+            assert message.startswith(b"\xff\xff\xff\xff")
+            assert len(message) % 8 == 0
+        chunks = list(arrow_ipc.iter_arrow_stream(POST_COLUMNS, iter([])))
+        assert chunks[-1] == arrow_ipc.END_OF_STREAM
+
+
+class TestIterExport:
+    def test_csv_in_chunks(self):
+        """Test that CSV is emitted per batch with a header and quoting"""
+        rows = [(p.userId, p.id, p.title, p.body) for p in POSTS]
+
+        chunks = list(iter_export("csv", POST_COLUMNS, rows, batch_rows=2))
+
+        assert len(chunks) == 2
+        assert read_csv(b"".join(chunks)) == [["userId", "id", "title", "body"]] + [
+            [str(value) for value in row] for row in rows
+        ]
+
+    def test_empty_csv_has_header(self):
+        """Test that an empty export still names its columns"""
+        assert read_csv(b"".join(iter_export("csv", ANOMALY_COLUMNS, []))) == [
+            ["userId", "id", "title", "reason", "details"]
+        ]
+
+    @patch("app.utils.export.has_pyarrow", lambda: False)
+    def test_fallback_without_pyarrow(self):
+        """Test that Arrow falls back to the pure writer and Parquet is refused"""
+        chunks = list(iter_export("arrow", POST_COLUMNS, [(1, 1, "t", "b")]))
+
+        assert chunks[0] == arrow_ipc.schema_message(POST_COLUMNS)
+        with pytest.raises(ValueError):
+            iter_export("parquet", POST_COLUMNS, [])
+
+    @pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+    def test_pyarrow_formats(self, fmt):
+        """Test that native writers emit readable Arrow and Parquet"""
+        pyarrow = pytest.importorskip("pyarrow")
+        parquet = pytest.importorskip("pyarrow.parquet")
+
+        data = b"".join(iter_export(fmt, POST_COLUMNS, ROWS, batch_rows=2))
+        if fmt == "arrow":
+            table = pyarrow.ipc.open_stream(data).read_all()
+        else:
+            table = parquet.read_table(pyarrow.BufferReader(data))
+
+        assert [tuple(row.values()) for row in table.to_pylist()] == ROWS
+
+
+class TestExportEndpoints:
+    def teardown_method(self):
+        snapshot_store.clear()
+
+    def test_posts_from_snapshot(self):
+        """Test that posts are exported from the current snapshot"""
+        snapshot_store.publish(build_snapshot(POSTS, version=1))
+
+        response = client.get("/api/export/posts?user_ids=1")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "posts.csv" in response.headers["content-disposition"]
+        assert [row[1] for row in read_csv(response.content)[1:]] == ["1", "2"]
+
+    @patch(
+        "app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts_data"
+    )
+    def test_posts_from_upstream_without_models(self, mock_get_posts_data):
+        """Test that raw upstream dictionaries are exported as they are"""
+        mock_get_posts_data.return_value = [p.model_dump() for p in POSTS]
+
+        response = client.get("/api/export/posts?format=arrow")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == (
+            "application/vnd.apache.arrow.stream"
+        )
+        assert response.content.startswith(b"\xff\xff\xff\xff")
+        assert response.content.endswith(arrow_ipc.END_OF_STREAM)
+
+    @patch(STREAM_POSTS)
+    def test_anomalies_on_demand(self, mock_stream_posts):
+        """Test that anomalies are detected on demand without a snapshot"""
+        mock_stream_posts.side_effect = stream_of(POSTS)
+
+        response = client.get("/api/export/anomalies")
+
+        assert response.status_code == 200
+        rows = read_csv(response.content)
+        assert rows[0] == ["userId", "id", "title", "reason", "details"]
+        assert rows[1][:4] == ["1", "1", "Short", "short_title"]
+
+    def test_unknown_format(self):
+        """Test that unsupported formats are rejected"""
+        response = client.get("/api/export/posts?format=xlsx")
+
+        assert response.status_code == 400
+        assert "csv" in response.json()["detail"]
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from app.utils.json_stream import JsonArrayParser
+
+DOCUMENT = [
+    {"userId": 1, "id": 1, "title": 'Café [brackets], "quotes"', "body": "a\nb"},
+    {"userId": 2, "id": 2, "title": "", "body": "{}"},
+    123,
+    "text",
+    [1, [2]],
+]
+
+
+def parse_in_chunks(raw: bytes, size: int) -> list:
+    parser = JsonArrayParser()
+    items = []
+    for start in range(0, len(raw), size):
+        items.extend(parser.feed(raw[start : start + size]))
+    items.extend(parser.close())
+    return items
+
+
+class TestJsonArrayParser:
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10**6])
+    def test_any_chunking_yields_the_document(self, size):
+        """Test that elements are recovered whatever the chunk boundaries"""
+        raw = json.dumps(DOCUMENT, indent=2, ensure_ascii=False).encode()
+
+        assert parse_in_chunks(raw, size) == DOCUMENT
+
+    def test_elements_arrive_before_the_end(self):
+        """Test that completed elements are returned as soon as they are fed"""
+        parser = JsonArrayParser()
+
+        assert parser.feed(b'[{"id": 1}, {"id"') == [{"id": 1}]
+        assert parser.feed(b": 2}]") == [{"id": 2}]
+        assert parser.close() == []
+
+    def test_empty_array(self):
+        """Test that an empty array parses to no elements"""
+        assert parse_in_chunks(b" [ ] ", 1) == []
+
+    @pytest.mark.parametrize(
+        "raw",
+        [b'{"id": 1}', b"[1 2]", b"[1,,2]", b"[1,]", b"[1, 2", b"[1] 2", b""],
+    )
+    def test_malformed_documents_raise(self, raw):
+        """Test that non-arrays, bad separators and truncation are rejected"""
+        with pytest.raises(ValueError):
+            parse_in_chunks(raw, 1)
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.models import Post
+from app.services.jsonplaceholder_service import JSONPlaceholderService
+from app.services.resilience import CircuitBreaker, ResilientClient, UpstreamError
+from benchmarks.fake_upstream import generate_posts
+
+
+class TestGetPostsByUsers:
+    def test_fetches_each_user_with_bounded_concurrency(self):
+        """Test batch fetching keeps order and caps parallel upstream calls"""
+        service = JSONPlaceholderService()
+        service.max_concurrent_requests = 2
+        active = 0
+        peak = 0
+
+        async def fake_get_posts_by_user(user_id):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return [Post(userId=user_id, id=user_id * 10, title="Title", body="Body")]
+
+        with patch.object(service, "get_posts_by_user", fake_get_posts_by_user):
+            posts = asyncio.run(service.get_posts_by_users([3, 1, 2, 5]))
+
+        assert [p.userId for p in posts] == [3, 1, 2, 5]
+        assert peak == 2
+
+
+def chunked_transport(posts: list, chunk_size: int = 50) -> httpx.MockTransport:
+    raw = json.dumps(posts).encode()
+    served = {"bytes": 0}
+
+    async def body():
+        for start in range(0, len(raw), chunk_size):
+            served["bytes"] += chunk_size
+            yield raw[start : start + chunk_size]
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body()))
+    transport.served = served
+    return transport
+
+
+class TestStreamPosts:
+    def make_service(self, transport: httpx.MockTransport) -> JSONPlaceholderService:
+        return JSONPlaceholderService(
+            base_url="http://upstream.test",
+            client=ResilientClient(transport=transport, max_retries=0),
+        )
+
+    async def collect(self, service: JSONPlaceholderService, **kwargs) -> list:
+        try:
+            return [batch async for batch in service.stream_posts(**kwargs)]
+        finally:
+            await service.aclose()
+
+    def test_streams_feed_in_batches(self):
+        """Test that the chunked feed is parsed into ordered batches"""
+        posts = generate_posts(25)
+        service = self.make_service(chunked_transport(posts))
+
+        batches = asyncio.run(self.collect(service, batch_size=10))
+
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        assert [p.id for batch in batches for p in batch] == [p["id"] for p in posts]
+
+    def test_limit_stops_the_download(self):
+        """Test that a limit ends reading before the whole feed arrives"""
+        posts = generate_posts(500)
+        transport = chunked_transport(posts)
+        service = self.make_service(transport)
+
+        batches = asyncio.run(self.collect(service, limit=7, batch_size=5))
+
+        assert [[p.id for p in batch] for batch in batches] == [
+            [1, 2, 3, 4, 5],
+            [6, 7],
+        ]
+        assert transport.served["bytes"] < len(json.dumps(posts)) / 10
+
+    def test_malformed_feed_raises(self):
+        """Test that an unparseable feed surfaces as an upstream error"""
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=b'[{"id": 1}, oops]')
+        )
+        service = self.make_service(transport)
+        service.serve_stale = False
+
+        with pytest.raises(UpstreamError):
+            asyncio.run(self.collect(service))
+
+    def test_malformed_feed_falls_back_to_stale_posts(self):
+        """Test that a malformed body is served from cache and trips the breaker"""
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=b'[{"id": 1}, oops]')
+        )
+        service = self.make_service(transport)
+        service.cache["posts"] = generate_posts(3)
+
+        batches = asyncio.run(self.collect(service))
+
+        assert [p.id for batch in batches for p in batch] == [1, 2, 3]
+        assert service.client.breaker._failures == 1
+
+    def test_broken_body_falls_back_to_stale_posts(self):
+        """Test that a body read failing before the first batch serves cache"""
+
+        async def body():
+            yield b'[{"userId": 1, "id": 1, '
+            raise httpx.ReadError("connection reset")
+
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=body())
+        )
+        service = self.make_service(transport)
+        service.cache["posts"] = generate_posts(3)
+
+        batches = asyncio.run(self.collect(service))
+
+        assert [p.id for batch in batches for p in batch] == [1, 2, 3]
+        assert service.client.breaker._failures == 1
+
+    def test_complete_body_closes_half_open_circuit(self):
+        """Test that a half-open probe succeeds once its body was read"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        service = JSONPlaceholderService(
+            base_url="http://upstream.test",
+            client=ResilientClient(
+                transport=chunked_transport(generate_posts(5)),
+                max_retries=0,
+                breaker=breaker,
+            ),
+        )
+
+        asyncio.run(self.collect(service))
+
+        assert breaker.state == CircuitBreaker.CLOSED
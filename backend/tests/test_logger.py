@@ -0,0 +1,102 @@
+import json
+import logging
+import queue
+
+from app.utils.logger import (
+    DeferredQueueHandler,
+    JsonFormatter,
+    TextFormatter,
+    debug_event,
+    setup_logger,
+)
+
+
+def make_record(msg="Fetched %s posts", args=(3,), **extra) -> logging.LogRecord:
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestFormatters:
+    def test_json_formatter_includes_fields(self):
+        """Test one JSON object per record with structured fields merged in"""
+        line = JsonFormatter().format(make_record(fields={"total": 7}))
+
+        payload = json.loads(line)
+        assert payload["message"] == "Fetched 3 posts"
+        assert payload["level"] == "INFO"
+        assert payload["total"] == 7
+
+    def test_text_formatter_appends_fields(self):
+        """Test that text output keeps its format and shows event fields"""
+        formatter = TextFormatter("%(levelname)s: %(message)s")
+
+        assert formatter.format(make_record()) == "INFO: Fetched 3 posts"
+        assert formatter.format(make_record(fields={"total": 7})).endswith("total=7")
+
+
+class TestQueuePipeline:
+    def test_handler_defers_formatting(self):
+        """Test that records are enqueued without rendering the message"""
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+
+        handler.handle(make_record())
+
+        queued = log_queue.get_nowait()
+        assert queued.msg == "Fetched %s posts"
+        assert queued.args == (3,)
+
+    def test_mutable_args_are_rendered_as_logged(self):
+        """Test that later changes to list or dict arguments do not leak in"""
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        ids = [1, 2]
+        counts = {"posts": 3}
+
+        handler.handle(make_record("Users %s", (ids,)))
+        handler.handle(make_record("%(posts)s posts", (counts,)))
+        ids.append(3)
+        counts["posts"] = 4
+
+        assert log_queue.get_nowait().getMessage() == "Users [1, 2]"
+        assert log_queue.get_nowait().getMessage() == "3 posts"
+
+    def test_listener_writes_json_lines(self, capsys):
+        """Test the full pipeline from logger call to stderr"""
+        logger = setup_logger("app.tests.pipeline", "INFO", "json")
+        logger.propagate = False
+
+        logger.info("Served %s in %.1fms", "/api/posts", 1.25)
+        logger.debug("Not written at INFO")
+        # Stopping flushes the queue; restart for the exit-time flush
+        listener = logger.handlers[0].listener
+        listener.stop()
+        listener.start()
+
+        lines = capsys.readouterr().err.strip().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == [
+            "Served /api/posts in 1.2ms"
+        ]
+
+
+class TestDebugEvents:
+    def test_events_are_gated_by_level(self, caplog):
+        """Test that debug events cost nothing unless DEBUG is enabled"""
+        caplog.set_level(logging.INFO, logger="app")
+        debug_event("anomalies.detected", sample_rate=1.0, total=3)
+        assert not caplog.records
+
+        caplog.set_level(logging.DEBUG, logger="app")
+        debug_event("anomalies.detected", sample_rate=1.0, total=3)
+        assert caplog.records[0].fields == {"total": 3}
+
+    def test_events_are_sampled(self, caplog):
+        """Test that the sample rate bounds how many events are kept"""
+        caplog.set_level(logging.DEBUG, logger="app")
+
+        for _ in range(200):
+            debug_event("words.frequency", sample_rate=0.0)
+        debug_event("words.frequency", sample_rate=1.0)
+
+        assert len(caplog.records) == 1
@@ -0,0 +1,183 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_post_store
+from app.config import settings
+from app.main import app
+from app.models import Post
+from app.services.anomaly_detector import anomaly_detector
+from app.services.jsonplaceholder_service import jsonplaceholder_service
+from app.services.post_store import PostStore
+from app.services.snapshot_service import snapshot_store
+from benchmarks.fake_upstream import generate_posts
+
+client = TestClient(app)
+
+POSTS_DATA = generate_posts(60, users=4)
+
+
+def make_store(tmp_path, posts_data=POSTS_DATA) -> PostStore:
+    store = PostStore(str(tmp_path / "posts.db"))
+    store.ingest(posts_data)
+    return store
+
+
+def anomaly_keys(anomalies):
+    return sorted((a.id, a.reason, a.details) for a in anomalies)
+
+
+class TestPostStoreIngestion:
+    def test_ingest_replaces_dataset(self, tmp_path):
+        """Test upserts, deletions and preserved first ingestion time"""
+        store = make_store(tmp_path)
+        first_seen = store._query("SELECT ingested_at FROM posts WHERE id = 1", [])
+
+        changed = [dict(p) for p in POSTS_DATA[:10]]
+        changed[1]["title"] = "Edited"
+        store.ingest(changed)
+
+        assert store.count() == 10
+        assert store.get_posts(limit=2)[1].title == "Edited"
+        assert store._query("SELECT ingested_at FROM posts WHERE id = 1", []) == (
+            first_seen
+        )
+        assert [p.id for p in store.search("edited")] == [2]
+
+    def test_uses_wal_and_indexes(self, tmp_path):
+        """Test journal mode and that anomaly filters hit the indexes"""
+        store = make_store(tmp_path)
+
+        assert store._query("PRAGMA journal_mode", [])[0][0] == "wal"
+        plan = store._query(
+            "EXPLAIN QUERY PLAN SELECT id FROM posts WHERE title_length < 15", []
+        )
+        assert "idx_posts_title_length" in str(plan)
+        plan = store._query(
+            "EXPLAIN QUERY PLAN SELECT id FROM posts WHERE user_id = 2", []
+        )
+        assert "idx_posts_user_title" in str(plan)
+
+    def test_existing_database_is_ready_while_fresh(self, tmp_path):
+        """Test that a reopened store serves its dataset only within max_age"""
+        make_store(tmp_path).close()
+        path = str(tmp_path / "posts.db")
+
+        assert PostStore(path).ready
+        assert not PostStore(path, max_age=0).ready
+        assert not PostStore(str(tmp_path / "empty.db")).ready
+
+    def test_store_goes_stale_without_ingestion(self, tmp_path):
+        """Test that a store no longer being fed stops answering queries"""
+        store = make_store(tmp_path)
+
+        with patch("time.time", return_value=store.ingested_at + store.max_age + 1):
+            assert not store.ready
+
+    def test_unchanged_dataset_only_renews_ingestion_time(self, tmp_path):
+        """Test that re-ingesting the same feed skips the table rewrite"""
+        store = make_store(tmp_path)
+        first_ingest = store.ingested_at
+        changes = store._conn.total_changes
+
+        store.ingest([dict(p) for p in POSTS_DATA])
+
+        # Only the two ingest_meta rows are written
+        assert store._conn.total_changes - changes == 2
+        assert store.ingested_at >= first_ingest
+        assert store.count() == len(POSTS_DATA)
+
+
+class TestPostStoreQueries:
+    def test_anomalies_match_detector(self, tmp_path):
+        """Test that indexed detection agrees with the in-memory detector"""
+        store = make_store(tmp_path)
+        posts = [Post(**p) for p in POSTS_DATA]
+
+        assert anomaly_keys(store.detect_anomalies()) == anomaly_keys(
+            anomaly_detector.detect_anomalies(posts)
+        )
+        assert anomaly_keys(store.detect_anomalies(limit=25)) == anomaly_keys(
+            anomaly_detector.detect_anomalies(posts[:25])
+        )
+        assert anomaly_keys(store.detect_anomalies(user_ids=[2])) == anomaly_keys(
+            a for a in anomaly_detector.detect_anomalies(posts) if a.userId == 2
+        )
+
+    def test_get_posts_filters(self, tmp_path):
+        """Test limit and user filters in id order"""
+        store = make_store(tmp_path)
+
+        assert [p.id for p in store.get_posts(limit=3)] == [1, 2, 3]
+        assert {p.userId for p in store.get_posts(user_ids=[1, 3])} == {1, 3}
+
+    def test_search_ranks_and_filters(self, tmp_path):
+        """Test BM25 ordering, AND semantics and that input is not FTS syntax"""
+        store = make_store(
+            tmp_path,
+            [
+                {"userId": 1, "id": 1, "title": "apple pie", "body": "apple apple"},
+                {"userId": 2, "id": 2, "title": "pie recipes", "body": "apple once"},
+                {"userId": 2, "id": 3, "title": "banana", "body": "bread"},
+            ],
+        )
+
+        assert [p.id for p in store.search("apple")] == [1, 2]
+        assert [p.id for p in store.search("apple pie", user_id=2)] == [2]
+        assert store.search("apple banana") == []
+        assert store.search('"NEAR( OR') == []
+        assert sorted(p.id for p in store.search("banana OR recipes")) == [2, 3]
+
+
+class TestPostStoreEndpoints:
+    def test_routes_answer_from_store(self, tmp_path):
+        """Test posts, anomalies and search without calling upstream"""
+        store = make_store(tmp_path)
+
+        with (
+            patch.dict(app.dependency_overrides, {get_post_store: lambda: store}),
+            patch(
+                "app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts"
+            ) as mock_get_posts,
+        ):
+            posts = client.get("/api/posts/?user_ids=2&limit=3").json()
+            anomalies = client.get("/api/anomalies/?limit=30&user_id=1").json()
+            search = client.get(f"/api/search/?q={POSTS_DATA[4]['title']}").json()
+
+        assert not mock_get_posts.called
+        assert [p["userId"] for p in posts["posts"]] == [2, 2, 2]
+        assert {a["userId"] for a in anomalies["anomalies"]} <= {1}
+        assert search["results"][0]["id"] == 5
+
+    def test_stale_store_falls_back_to_upstream(self, tmp_path):
+        """Test that an outdated store is bypassed in favor of upstream"""
+        store = make_store(tmp_path)
+        store.ingested_at -= store.max_age + 1
+
+        with (
+            patch.dict(app.dependency_overrides, {get_post_store: lambda: store}),
+            patch(
+                "app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts"
+            ) as mock_get_posts,
+        ):
+            mock_get_posts.return_value = [Post(**p) for p in POSTS_DATA[:2]]
+            posts = client.get("/api/posts/").json()
+
+        assert mock_get_posts.called
+        assert len(posts["posts"]) == 2
+
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_lifespan_opens_configured_store(self, mock_get_posts, tmp_path):
+        """Test that the store is opened on startup rather than at import"""
+        mock_get_posts.return_value = [Post(**p) for p in POSTS_DATA[:2]]
+        path = tmp_path / "posts.db"
+
+        try:
+            with patch.object(settings, "sqlite_path", str(path)):
+                with TestClient(app):
+                    assert path.exists()
+                    assert jsonplaceholder_service.store is app.state.post_store
+        finally:
+            snapshot_store.clear()
+
+        assert jsonplaceholder_service.store is None
@@ -0,0 +1,122 @@
+import threading
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.text_profiles import NormalizationProfile
+from app.utils.profiling import StackSampler, to_collapsed, to_speedscope
+from tests.fake_stream import STREAM_POSTS, stream_of
+
+client = TestClient(app)
+
+TOKEN = "s3cret"
+ADMIN = {"X-Admin-Token": TOKEN}
+
+POSTS = [
+    Post(userId=i % 5 + 1, id=i, title=f"Sponsored title number {i}", body="Body")
+    for i in range(1, 200)
+]
+
+
+def busy_wait(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+class TestStackSampler:
+    def test_samples_target_thread(self):
+        """Test that the hot function shows up in both output formats"""
+        sampler = StackSampler(interval=0.001, thread_ids=[threading.get_ident()])
+        sampler.start()
+        busy_wait(0.1)
+        sampler.stop()
+
+        collapsed = to_collapsed(sampler.samples)
+        assert "busy_wait (test_profiling.py:" in collapsed
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+        profile = to_speedscope(sampler, "test")
+        names = [frame["name"] for frame in profile["shared"]["frames"]]
+        assert "busy_wait" in names
+        samples = profile["profiles"][0]["samples"]
+        assert len(samples) == len(profile["profiles"][0]["weights"])
+        assert all(0 <= index < len(names) for sample in samples for index in sample)
+
+
+class TestRequestProfiling:
+    @patch(STREAM_POSTS)
+    def test_profile_replaces_response(self, mock_stream_posts):
+        """Test that ?profile=true returns a profile of the request"""
+        mock_stream_posts.side_effect = stream_of(POSTS)
+
+        with patch("app.api.middleware.settings.admin_token", TOKEN):
+            response = client.get(
+                "/api/summary/?limit=150&profile=true&profile_format=speedscope",
+                headers=ADMIN,
+            )
+
+        assert response.status_code == 200
+        assert response.headers["x-profiled-status"] == "200"
+        assert response.json()["profiles"][0]["type"] == "sampled"
+
+    @patch(STREAM_POSTS)
+    def test_profile_samples_analysis_threads(self, mock_stream_posts):
+        """Test that analysis running in worker threads shows up in the profile"""
+        mock_stream_posts.side_effect = stream_of(POSTS, batch_size=50)
+        extract_words = NormalizationProfile.extract_words
+
+        def slow_extract_words(profile, text):
+            busy_wait(0.001)
+            return extract_words(profile, text)
+
+        with (
+            patch("app.api.middleware.settings.admin_token", TOKEN),
+            patch.object(NormalizationProfile, "extract_words", slow_extract_words),
+        ):
+            response = client.get(
+                "/api/summary/?limit=150&profile=true&profile_format=collapsed",
+                headers=ADMIN,
+            )
+
+        assert response.status_code == 200
+        assert "add (text_analyzer.py:" in response.text
+
+    @patch(STREAM_POSTS)
+    def test_profile_requires_token(self, mock_stream_posts):
+        """Test token enforcement, and that the flag is inert when disabled"""
+        mock_stream_posts.side_effect = stream_of(POSTS)
+
+        with patch("app.api.middleware.settings.admin_token", TOKEN):
+            forbidden = client.get("/api/summary/?profile=true")
+        with patch("app.api.middleware.settings.admin_token", None):
+            ignored = client.get("/api/summary/?profile=true", headers=ADMIN)
+
+        assert forbidden.status_code == 403
+        assert "topUsers" in ignored.json()
+
+
+class TestWindowProfiling:
+    def test_collapsed_window_profile(self):
+        """Test the process-wide window profile endpoint"""
+        with patch("app.api.auth.settings.admin_token", TOKEN):
+            response = client.get(
+                "/api/admin/profile?seconds=0.05&format=collapsed", headers=ADMIN
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text.startswith("thread ")
+
+    def test_admin_surface_hidden_without_token(self):
+        """Test 404 when disabled and 403 with a wrong token"""
+        with patch("app.api.auth.settings.admin_token", None):
+            assert client.get("/api/admin/profile", headers=ADMIN).status_code == 404
+        with patch("app.api.auth.settings.admin_token", TOKEN):
+            response = client.get(
+                "/api/admin/profile", headers={"X-Admin-Token": "wrong"}
+            )
+            assert response.status_code == 403
@@ -0,0 +1,200 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.snapshot_service import build_snapshot, snapshot_store
+from app.utils.errors import QueryTooExpensiveError
+from app.utils.query_cost import BatchSampler, QueryCostEstimator, query_cost_estimator
+from tests.fake_stream import STREAM_POSTS, stream_of
+
+client = TestClient(app)
+
+
+def make_posts(count: int = 12) -> list:
+    return [
+        Post(
+            userId=i % 4 + 1,
+            id=i + 1,
+            title=f"Post number {i} about topic{i % 3}",
+            body=f"Body text with word{i} and shared words",
+        )
+        for i in range(count)
+    ]
+
+
+class TestQueryCostEstimator:
+    def test_within_budget_is_unchanged(self):
+        """Test that affordable summaries are admitted as requested"""
+        estimator = QueryCostEstimator(summary_budget=1000, anomalies_budget=1000)
+
+        cost = estimator.plan_summary(100, 3, 20, include_words=True)
+
+        assert cost.estimate == 100 + 3 * 20 + 20
+        assert cost.top_users == 3
+        assert cost.sample_stride == 1
+        assert cost.downgrades == []
+
+    def test_caps_top_users_before_sampling(self):
+        """Test that oversized outputs are capped to half the budget"""
+        estimator = QueryCostEstimator(summary_budget=1000, anomalies_budget=0)
+
+        cost = estimator.plan_summary(200, 100, 10, include_words=True)
+
+        assert cost.top_users == 25
+        assert cost.sample_stride == 1
+        assert cost.downgrades == ["top_users=25"]
+        assert cost.estimate <= 1000
+
+    def test_samples_analysis_over_budget(self):
+        """Test that an oversized analysis switches to approximate mode"""
+        estimator = QueryCostEstimator(summary_budget=1000, anomalies_budget=0)
+
+        cost = estimator.plan_summary(10_000, 3, 20, include_words=False)
+
+        assert cost.top_users == 3
+        assert cost.sample_stride == 11
+        assert cost.downgrades == ["sample=1/11"]
+        assert cost.estimate <= 1000
+
+    def test_precomputed_summary_has_no_analysis_cost(self):
+        """Test that snapshot-served summaries only pay for their output"""
+        estimator = QueryCostEstimator(summary_budget=100, anomalies_budget=0)
+
+        cost = estimator.plan_summary(10_000, 3, 20, False, analyze=False)
+
+        assert cost.estimate == 23
+        assert cost.downgrades == []
+
+    def test_zero_budget_disables_admission(self):
+        """Test that a budget of 0 admits everything but still estimates"""
+        estimator = QueryCostEstimator(summary_budget=0, anomalies_budget=0)
+
+        summary = estimator.plan_summary(10**6, 10**6, 20, include_words=True)
+        anomalies = estimator.plan_anomalies(10**6)
+
+        assert summary.downgrades == []
+        assert summary.headers()["X-Query-Cost-Budget"] == "unlimited"
+        assert anomalies.estimate == 10**6
+
+    def test_anomalies_over_budget_are_rejected(self):
+        """Test that anomaly queries are rejected rather than sampled"""
+        estimator = QueryCostEstimator(summary_budget=0, anomalies_budget=500)
+
+        assert estimator.plan_anomalies(400, 50).estimate == 450
+        with pytest.raises(QueryTooExpensiveError) as excinfo:
+            estimator.plan_anomalies(1000)
+        assert excinfo.value.estimate == 1000
+        assert excinfo.value.budget == 500
+
+    def test_posts_to_analyze_uses_observed_size(self):
+        """Test that limits are bounded by the last observed dataset size"""
+        estimator = QueryCostEstimator(summary_budget=0, anomalies_budget=0)
+        estimator.observe_dataset_size(250)
+
+        assert estimator.posts_to_analyze(None) == 250
+        assert estimator.posts_to_analyze(40) == 40
+        assert estimator.posts_to_analyze(10_000) == 250
+
+
+class TestBatchSampler:
+    def test_samples_evenly_across_batches(self):
+        """Test that every n-th post is kept regardless of batch boundaries"""
+        posts = make_posts(10)
+        sampler = BatchSampler(3)
+
+        async def collect():
+            return [
+                batch
+                async for batch in sampler.sample(stream_of(posts, batch_size=4)())
+            ]
+
+        batches = asyncio.run(collect())
+
+        assert [p.id for batch in batches for p in batch] == [1, 4, 7, 10]
+        assert sampler.seen == 10
+
+
+class TestQueryCostHeaders:
+    def teardown_method(self):
+        snapshot_store.clear()
+
+    @patch(STREAM_POSTS)
+    def test_summary_reports_costs(self, mock_stream_posts):
+        """Test that on-demand summaries report estimated and actual cost"""
+        mock_stream_posts.side_effect = stream_of(make_posts())
+
+        with patch.object(query_cost_estimator, "dataset_size", 12):
+            response = client.get("/api/summary/?top_users=2&top_words=5")
+
+        assert response.status_code == 200
+        assert response.headers["X-Query-Cost-Estimate"] == str(12 + 2 * 20 + 5)
+        assert response.headers["X-Query-Cost-Actual"] == str(12 + 2 * 20 + 5)
+        assert "X-Query-Time-Ms" in response.headers
+        assert "X-Query-Downgraded" not in response.headers
+
+    @patch(STREAM_POSTS)
+    def test_over_budget_summary_is_approximate(self, mock_stream_posts):
+        """Test that an over-budget summary samples posts but counts them all"""
+        mock_stream_posts.side_effect = stream_of(make_posts())
+
+        with (
+            patch.object(query_cost_estimator, "dataset_size", 12),
+            patch.object(query_cost_estimator, "summary_budget", 12),
+        ):
+            response = client.get(
+                "/api/summary/?top_users=1&top_words=5&fields=userId,uniqueWordCount"
+            )
+
+        assert response.status_code == 200
+        assert response.headers["X-Query-Downgraded"] == "sample=1/2"
+        assert response.headers["X-Query-Cost-Estimate"] == "12"
+        assert int(response.headers["X-Query-Cost-Actual"]) <= 12
+        assert response.json()["totalPosts"] == 12
+
+    def test_snapshot_summary_caps_top_users(self):
+        """Test that snapshot-served summaries cap oversized top_users"""
+        snapshot_store.publish(build_snapshot(make_posts(), version=3))
+
+        with patch.object(query_cost_estimator, "summary_budget", 100):
+            response = client.get("/api/summary/?top_users=1000&top_words=5")
+
+        assert response.status_code == 200
+        assert response.headers["X-Query-Downgraded"] == "top_users=2"
+        assert len(response.json()["topUsers"]) == 2
+        assert response.headers["X-Query-Cost-Estimate"] == str(2 * 20 + 5)
+
+    def test_over_budget_anomalies_are_rejected(self):
+        """Test that over-budget anomaly queries get 400 before any work"""
+        with (
+            patch.object(query_cost_estimator, "dataset_size", 10_000),
+            patch.object(query_cost_estimator, "anomalies_budget", 500),
+            patch(STREAM_POSTS) as mock_stream_posts,
+        ):
+            response = client.get("/api/anomalies/")
+
+        assert response.status_code == 400
+        assert "limit" in response.json()["detail"]
+        mock_stream_posts.assert_not_called()
+
+    @patch(STREAM_POSTS)
+    def test_anomalies_report_costs(self, mock_stream_posts):
+        """Test that admitted anomaly queries report their costs"""
+        mock_stream_posts.side_effect = stream_of(make_posts())
+
+        with patch.object(query_cost_estimator, "dataset_size", 12):
+            response = client.get("/api/anomalies/?limit=8")
+
+        assert response.status_code == 200
+        total = response.json()["total"]
+        assert response.headers["X-Query-Cost-Estimate"] == "8"
+        assert response.headers["X-Query-Cost-Actual"] == str(8 + total)
+
+    def test_outputs_must_be_positive(self):
+        """Test that negative or zero output sizes are rejected"""
+        assert client.get("/api/summary/?top_users=0").status_code == 422
+        assert client.get("/api/summary/?top_words=-1").status_code == 422
+        assert client.get("/api/anomalies/?limit=-5").status_code == 422
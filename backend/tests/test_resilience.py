@@ -0,0 +1,207 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.jsonplaceholder_service import JSONPlaceholderService
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientClient,
+    UpstreamError,
+)
+from benchmarks.fake_upstream import FakeUpstream
+
+client = TestClient(app)
+
+BASE_URL = "http://upstream.test"
+
+
+def make_client(fake: FakeUpstream, **kwargs) -> ResilientClient:
+    options = {"attempt_timeout": 1.0, "max_retries": 2, "backoff_base": 0.001}
+    options.update(kwargs)
+    return ResilientClient(transport=httpx.ASGITransport(app=fake.app), **options)
+
+
+async def fetch(resilient: ResilientClient) -> httpx.Response:
+    try:
+        return await resilient.get(f"{BASE_URL}/posts")
+    finally:
+        await resilient.aclose()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResilientClient:
+    def test_retries_transient_failures(self):
+        """Test that transient 5xx responses are retried with backoff"""
+        fake = FakeUpstream()
+        fake.fail_next = 2
+
+        response = asyncio.run(fetch(make_client(fake)))
+
+        assert response.status_code == 200
+        assert fake.requests == 3
+
+    def test_gives_up_after_max_retries(self):
+        """Test that persistent failures surface as UpstreamError"""
+        fake = FakeUpstream()
+        fake.fail_next = 10
+
+        with pytest.raises(UpstreamError) as exc_info:
+            asyncio.run(fetch(make_client(fake, max_retries=1)))
+
+        assert exc_info.value.status_code == 503
+        assert fake.requests == 2
+
+    def test_client_errors_are_not_retried(self):
+        """Test that 4xx responses fail immediately"""
+        fake = FakeUpstream()
+        resilient = make_client(fake)
+
+        async def run():
+            try:
+                return await resilient.get(f"{BASE_URL}/missing")
+            finally:
+                await resilient.aclose()
+
+        with pytest.raises(UpstreamError) as exc_info:
+            asyncio.run(run())
+
+        assert exc_info.value.status_code == 404
+        assert resilient.breaker.state == CircuitBreaker.CLOSED
+
+    def test_slow_attempt_times_out_and_retries(self):
+        """Test that the per-attempt timeout cuts off a slow upstream"""
+        fake = FakeUpstream()
+        fake.latency_script = [1.0]
+
+        started = time.monotonic()
+        response = asyncio.run(fetch(make_client(fake, attempt_timeout=0.05)))
+
+        assert response.status_code == 200
+        assert fake.requests == 2
+        assert time.monotonic() - started < 0.5
+
+    def test_hedges_request_slower_than_p95(self):
+        """Test that a hedged duplicate wins over a straggling primary"""
+        fake = FakeUpstream()
+        fake.latency_script = [1.0, 0.0]
+        resilient = make_client(fake, hedging_enabled=True, attempt_timeout=2.0)
+        for _ in range(resilient.latency.min_samples):
+            resilient.latency.record(0.01)
+
+        started = time.monotonic()
+        response = asyncio.run(fetch(resilient))
+
+        assert response.status_code == 200
+        assert fake.requests == 2
+        assert time.monotonic() - started < 0.5
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_fails_fast(self):
+        """Test that an open circuit rejects calls without touching upstream"""
+        fake = FakeUpstream()
+        fake.fail_next = 100
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        resilient = make_client(fake, max_retries=5, breaker=breaker)
+
+        async def run():
+            with pytest.raises(CircuitOpenError) as exc_info:
+                await resilient.get(f"{BASE_URL}/posts")
+            await resilient.aclose()
+            return exc_info.value
+
+        error = asyncio.run(run())
+
+        assert fake.requests == 2
+        assert breaker.state == CircuitBreaker.OPEN
+        assert error.retry_after == 10
+
+    def test_half_open_probe_closes_circuit(self):
+        """Test recovery through a single half-open probe"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        assert not breaker.allow_request()
+
+        clock.now = 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens_circuit(self):
+        """Test that a failing half-open probe restarts the reset timeout"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_after == 10
+
+
+class TestServiceFallback:
+    def test_serves_cached_posts_when_upstream_is_down(self):
+        """Test that the last good dataset is served while upstream fails"""
+        fake = FakeUpstream()
+        service = JSONPlaceholderService(
+            base_url=BASE_URL, client=make_client(fake, max_retries=0)
+        )
+
+        async def run():
+            fresh = await service.get_posts()
+            fake.fail_next = 10
+            stale = await service.get_posts(limit=5)
+            stale_user = await service.get_posts_by_user(2)
+            await service.aclose()
+            return fresh, stale, stale_user
+
+        fresh, stale, stale_user = asyncio.run(run())
+
+        assert len(fresh) == 100
+        assert [p.id for p in stale] == [1, 2, 3, 4, 5]
+        assert stale_user and all(p.userId == 2 for p in stale_user)
+
+    def test_raises_without_cached_posts(self):
+        """Test that failures propagate when there is nothing to fall back to"""
+        fake = FakeUpstream()
+        fake.fail_next = 10
+        service = JSONPlaceholderService(
+            base_url=BASE_URL, client=make_client(fake, max_retries=0)
+        )
+
+        with pytest.raises(UpstreamError):
+            asyncio.run(service.get_posts())
+
+
+class TestCircuitOpenResponses:
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_posts_route_returns_503_when_circuit_open(self, mock_get_posts):
+        """Test that an open circuit maps to 503 with Retry-After"""
+        mock_get_posts.side_effect = CircuitOpenError(retry_after=12.2)
+
+        response = client.get("/api/posts/")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "13"
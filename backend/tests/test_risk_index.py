@@ -0,0 +1,144 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Anomaly, Post
+from app.services.risk_index import RiskStats, UserRiskIndex, risk_index, risk_stats
+from app.services.snapshot_service import build_snapshot, snapshot_store
+
+client = TestClient(app)
+
+
+def make_posts() -> list:
+    posts = [
+        Post(userId=1, id=1, title="Short", body="Body"),
+        Post(userId=1, id=2, title="A perfectly normal title", body="Body"),
+        Post(userId=3, id=3, title="Another normal title here", body="Body"),
+    ]
+    # User 2 posts the same title five times: duplicates and a bot cluster
+    posts += [
+        Post(userId=2, id=10 + i, title="Buy now, limited offer", body="Body")
+        for i in range(5)
+    ]
+    return posts
+
+
+class TestRiskStats:
+    def test_stats_combine_anomaly_reasons(self):
+        """Test ratios of short and duplicate titles plus bot clusters"""
+        anomalies = [
+            Anomaly(userId=1, id=1, title="Short", reason="short_title"),
+            Anomaly(userId=2, id=2, title="Same", reason="duplicate_title"),
+            Anomaly(userId=2, id=3, title="Same", reason="duplicate_title"),
+            Anomaly(userId=2, id=2, title="Same", reason="bot_like_behavior"),
+            Anomaly(userId=2, id=3, title="Same", reason="bot_like_behavior"),
+        ]
+
+        stats = risk_stats({1: 4, 2: 2, 3: 1}, anomalies)
+
+        assert stats[1] == RiskStats(posts=4, short_titles=1)
+        assert stats[1].score == 0.25
+        assert stats[2] == RiskStats(posts=2, duplicate_posts=2, bot_clusters=1)
+        assert stats[2].score == 2.0
+        assert stats[3].score == 0.0
+
+
+class TestUserRiskIndex:
+    def test_top_orders_by_score_then_user(self):
+        """Test that the riskiest users come first, ties broken by user ID"""
+        index = UserRiskIndex()
+        index.replace(
+            {
+                1: RiskStats(posts=2, short_titles=1),
+                2: RiskStats(posts=2, duplicate_posts=2, bot_clusters=1),
+                3: RiskStats(posts=4, short_titles=2),
+                4: RiskStats(posts=1),
+            }
+        )
+
+        assert [u.userId for u in index.top(3)] == [2, 1, 3]
+        assert len(index.top(10)) == 4
+
+    def test_replace_moves_only_changed_users(self):
+        """Test that updates re-rank changed users and drop missing ones"""
+        index = UserRiskIndex()
+        index.replace({1: RiskStats(posts=1), 2: RiskStats(posts=1, short_titles=1)})
+
+        changed = index.replace(
+            {
+                1: RiskStats(posts=1, bot_clusters=1),
+                2: RiskStats(posts=1, short_titles=1),
+            }
+        )
+        assert changed == 1
+        assert [u.userId for u in index.top(2)] == [1, 2]
+
+        assert index.replace({2: RiskStats(posts=1, short_titles=1)}) == 1
+        assert [u.userId for u in index.top(2)] == [2]
+        assert len(index) == 1
+
+    def test_snapshots_are_applied_in_the_background(self):
+        """Test that readers keep a complete view while the index is updated"""
+        index = UserRiskIndex()
+        index.on_snapshot(None, build_snapshot(make_posts(), version=1))
+        index.wait(timeout=5)
+        view = index.frozen()
+
+        index.on_snapshot(None, build_snapshot(make_posts()[:2], version=2))
+        index.wait(timeout=5)
+
+        assert (index.version, len(index)) == (2, 1)
+        assert (view.version, len(view)) == (1, 3)
+        assert [u.userId for u in view.top(2)] == [2, 1]
+
+
+class TestTopUsersEndpoint:
+    def teardown_method(self):
+        snapshot_store.clear()
+
+    def test_served_from_snapshot_index(self):
+        """Test that the index follows published snapshots"""
+        snapshot_store.publish(build_snapshot(make_posts(), version=7))
+
+        response = client.get("/api/anomalies/top-users?k=2")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert risk_index.version == 7
+        assert data["snapshotVersion"] == 7
+        assert data["totalUsers"] == 3
+        assert [u["userId"] for u in data["users"]] == [2, 1]
+        assert data["users"][0]["botClusters"] == 1
+        assert data["users"][0]["duplicatePosts"] == 5
+
+    def test_rendering_never_rewinds_the_index(self):
+        """Test that a response for another version leaves the index alone"""
+        snapshot_store.publish(build_snapshot(make_posts(), version=7))
+        risk_index.wait(timeout=5)
+        risk_index.apply_snapshot(build_snapshot(make_posts()[:2], version=8))
+
+        try:
+            data = client.get("/api/anomalies/top-users?k=5").json()
+
+            assert data["snapshotVersion"] == 7
+            assert data["totalUsers"] == 3
+            assert risk_index.version == 8
+            assert len(risk_index) == 1
+        finally:
+            risk_index.apply_snapshot(snapshot_store.current)
+
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_on_demand_without_snapshot(self, mock_get_posts):
+        """Test that the ranking is computed when no snapshot is published"""
+        mock_get_posts.return_value = make_posts()
+
+        response = client.get("/api/anomalies/top-users?k=1")
+
+        assert response.status_code == 200
+        assert response.json()["snapshotVersion"] is None
+        assert [u["userId"] for u in response.json()["users"]] == [2]
+
+    def test_k_is_bounded(self):
+        """Test that k must be positive"""
+        assert client.get("/api/anomalies/top-users?k=0").status_code == 422
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.search_index import (
+    BLOCK_SIZE,
+    PostingList,
+    SearchIndex,
+    decode_varints,
+    encode_varints,
+    parse_query,
+)
+from app.services.snapshot_service import build_snapshot, snapshot_store
+
+client = TestClient(app)
+
+POSTS = [
+    Post(userId=1, id=1, title="Apple pie recipe", body="apple apple butter"),
+    Post(userId=2, id=2, title="Pie crust secrets", body="apple and flour"),
+    Post(userId=2, id=3, title="Banana bread", body="ripe banana"),
+    Post(userId=3, id=4, title="Cherry tart", body="cherry season"),
+]
+
+
+def ids(results):
+    return [post.id for post, _ in results]
+
+
+class TestPostingList:
+    def test_varints_round_trip(self):
+        """Test varint coding of small and large values"""
+        values = [0, 1, 127, 128, 300, 2**40]
+
+        assert decode_varints(encode_varints(values)) == values
+
+    def test_lookup_across_blocks(self):
+        """Test that lookups find ids spread over several compressed blocks"""
+        pairs = [(doc_id, doc_id % 3 + 1) for doc_id in range(0, 1000, 2)]
+        plist = PostingList(pairs)
+
+        assert len(plist.blocks) == -(-len(pairs) // BLOCK_SIZE)
+        assert list(plist.items()) == pairs
+        assert plist.lookup([1, 2, 500, 998, 2000]) == {2: 3, 500: 3, 998: 3}
+
+
+class TestSearchIndex:
+    def test_and_or_and_user_filter(self):
+        """Test AND within clauses, OR between them and the author filter"""
+        index = SearchIndex()
+        index.update(POSTS)
+
+        assert parse_query("apple pie OR banana") == [["apple", "pie"], ["banana"]]
+        assert sorted(ids(index.search("apple pie"))) == [1, 2]
+        assert sorted(ids(index.search("cherry OR banana"))) == [3, 4]
+        assert ids(index.search("apple", user_id=2)) == [2]
+        assert index.search("apple banana") == []
+        assert index.search("missing") == []
+
+    def test_bm25_prefers_higher_term_frequency(self):
+        """Test that the post mentioning the term more often ranks first"""
+        index = SearchIndex()
+        index.update(POSTS)
+
+        results = index.search("apple")
+
+        assert ids(results) == [1, 2]
+        assert results[0][1] > results[1][1] > 0
+
+    def test_incremental_update_rebuilds_only_touched_terms(self):
+        """Test edits and removals without rebuilding unrelated postings"""
+        index = SearchIndex()
+        index.update(POSTS)
+        cherry = index._state.postings["cherry"]
+
+        edited = Post(userId=2, id=3, title="Apple bread", body="ripe apple")
+        assert index.update([POSTS[0], POSTS[1], edited, POSTS[3]])
+        assert index._state.postings["cherry"] is cherry
+        assert "banana" not in index._state.postings
+        assert sorted(ids(index.search("apple"))) == [1, 2, 3]
+
+        assert index.update(POSTS[:1])
+        assert index.document_count == 1
+        assert index.search("cherry") == []
+        assert ids(index.search("pie", user_id=2)) == []
+        assert not index.update(POSTS[:1])
+
+
+class TestSearchEndpoint:
+    def test_search_served_from_snapshot_index(self):
+        """Test that a published snapshot feeds the index used by the route"""
+        try:
+            snapshot_store.publish(build_snapshot(POSTS, version=1))
+            with patch(
+                "app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts"
+            ) as mock_get_posts:
+                response = client.get("/api/search/?q=banana OR cherry&user_id=3")
+
+            assert not mock_get_posts.called
+        finally:
+            snapshot_store.clear()
+
+        assert response.status_code == 200
+        assert [post["id"] for post in response.json()["results"]] == [4]
+
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_search_on_demand_without_snapshot(self, mock_get_posts):
+        """Test that the index is synced from upstream when no snapshot exists"""
+        mock_get_posts.return_value = POSTS
+
+        response = client.get("/api/search/?q=pie")
+
+        assert mock_get_posts.called
+        assert sorted(post["id"] for post in response.json()["results"]) == [1, 2]
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import pickle
+
+import pytest
+
+from app.models import Post
+from app.services.shared_snapshot import (
+    SharedSnapshotReader,
+    SharedSnapshotWriter,
+    decode_snapshot,
+    encode_snapshot,
+    secure_directory,
+)
+from app.services.snapshot_service import build_snapshot, snapshot_store
+
+POSTS = [
+    Post(userId=1, id=1, title="Short", body="Body 1"),
+    Post(userId=2, id=2, title="A perfectly normal title", body="Body 2"),
+]
+
+
+class TestSnapshotEncoding:
+    def test_round_trip_preserves_snapshot(self):
+        """Test that a decoded generation equals the original snapshot"""
+        snapshot = build_snapshot(POSTS, version=4)
+
+        decoded = decode_snapshot(encode_snapshot(snapshot))
+
+        assert decoded == snapshot
+        assert decoded.posts_by_user[2][0].title == "A perfectly normal title"
+
+    def test_pickled_generations_are_rejected(self):
+        """Test that generation files are never unpickled"""
+        with pytest.raises(ValueError):
+            decode_snapshot(pickle.dumps({"version": 1}))
+
+
+class TestSharedSnapshotGenerations:
+    def test_reader_attaches_to_new_generations_only(self, tmp_path):
+        """Test that workers load each published generation exactly once"""
+        writer = SharedSnapshotWriter(str(tmp_path))
+        reader = SharedSnapshotReader(str(tmp_path))
+
+        assert reader.load_if_changed() is None
+
+        writer.write(build_snapshot(POSTS, version=1))
+        first = reader.load_if_changed()
+        assert first.version == 1
+        assert reader.load_if_changed() is None
+
+        writer.write(build_snapshot(POSTS[:1], version=2))
+        second = reader.load_if_changed()
+        assert second.version == 2
+        assert len(second.posts) == 1
+
+    def test_writer_prunes_old_generations(self, tmp_path):
+        """Test that only the newest generations are kept on shared storage"""
+        writer = SharedSnapshotWriter(str(tmp_path), keep_generations=2)
+
+        for version in range(1, 5):
+            writer.write(build_snapshot(POSTS, version=version))
+
+        generations = sorted(n for n in os.listdir(tmp_path) if n.endswith(".bin"))
+        assert generations == ["snapshot-0000000003.bin", "snapshot-0000000004.bin"]
+
+    def test_poll_publishes_to_local_store(self, tmp_path):
+        """Test that an attached worker serves the shared generation"""
+        SharedSnapshotWriter(str(tmp_path)).write(build_snapshot(POSTS, version=9))
+        reader = SharedSnapshotReader(str(tmp_path))
+
+        try:
+            asyncio.run(reader.poll())
+            assert snapshot_store.current.version == 9
+        finally:
+            snapshot_store.clear()
+
+
+class TestSharedDirectorySecurity:
+    def test_writer_creates_private_directory(self, tmp_path):
+        """Test that the writer creates the directory readable only by its owner"""
+        directory = tmp_path / "shared"
+
+        SharedSnapshotWriter(str(directory))
+
+        assert directory.stat().st_mode & 0o777 == 0o700
+
+    def test_writer_refuses_existing_open_directory(self, tmp_path):
+        """Test that a pre-existing directory open to others is left alone"""
+        os.chmod(tmp_path, 0o1777)
+
+        with pytest.raises(PermissionError):
+            SharedSnapshotWriter(str(tmp_path))
+
+        assert tmp_path.stat().st_mode & 0o7777 == 0o1777
+
+    def test_reader_refuses_directory_writable_by_others(self, tmp_path):
+        """Test that workers do not load generations others could have written"""
+        SharedSnapshotWriter(str(tmp_path)).write(build_snapshot(POSTS, version=1))
+        os.chmod(tmp_path, 0o777)
+
+        with pytest.raises(PermissionError):
+            SharedSnapshotReader(str(tmp_path)).load_if_changed()
+
+    def test_symlinked_directory_is_refused(self, tmp_path):
+        """Test that a symlink cannot redirect workers to another directory"""
+        target = tmp_path / "target"
+        target.mkdir(mode=0o700)
+        link = tmp_path / "link"
+        link.symlink_to(target)
+
+        with pytest.raises(PermissionError):
+            secure_directory(str(link))
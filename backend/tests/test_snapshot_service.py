@@ -0,0 +1,158 @@
+import asyncio
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.anomaly_detector import anomaly_detector
+from app.services.snapshot_service import SnapshotStore, build_snapshot, snapshot_store
+from app.services.spill_analyzer import SpilledAnomalyTracker
+from app.utils.memory import memory_budget
+from tests.fake_stream import STREAM_POSTS, stream_of
+
+client = TestClient(app)
+
+POSTS = [
+    Post(userId=1, id=1, title="Short", body="Body 1"),
+    Post(userId=1, id=2, title="Hello world of technology", body="Body 2"),
+    Post(userId=2, id=3, title="Hello again my friends", body="Body 3"),
+]
+
+
+class TestBuildSnapshot:
+    def test_build_snapshot_precomputes_analyses(self):
+        """Test that a snapshot contains every precomputed view"""
+        snapshot = build_snapshot(POSTS, version=7)
+
+        assert snapshot.version == 7
+        assert snapshot.generated_at.tzinfo is not None
+        assert len(snapshot.posts) == 3
+        assert snapshot.total_users == 2
+        assert [p.id for p in snapshot.posts_by_user[1]] == [1, 2]
+        assert [a.id for a in snapshot.anomalies_by_user[1]] == [1]
+        assert snapshot.anomaly_summary["total_anomalies"] == 1
+        assert snapshot.word_frequencies[0].word == "hello"
+        assert snapshot.user_summaries[0].uniqueWordCount >= 2
+
+    def test_spilled_build_matches_in_memory(self, tmp_path):
+        """Test that a snapshot analyzed from spill files has the same views"""
+        posts = POSTS + [
+            Post(userId=2, id=10 + i, title="Same old title", body="") for i in range(5)
+        ]
+
+        with patch("app.config.settings.spill_dir", str(tmp_path)):
+            spilled = build_snapshot(posts, version=1, spill=True)
+        in_memory = build_snapshot(posts, version=1)
+
+        assert list(spilled.anomalies) == anomaly_detector.detect_anomalies(posts)
+        assert spilled.anomalies == in_memory.anomalies
+        assert spilled.word_frequencies == in_memory.word_frequencies
+        assert [u.userId for u in spilled.user_summaries] == [
+            u.userId for u in in_memory.user_summaries
+        ]
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestSnapshotStore:
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_refresh_publishes_new_versions(self, mock_get_posts):
+        """Test that each refresh swaps in a snapshot with a higher version"""
+        mock_get_posts.return_value = POSTS
+        store = SnapshotStore()
+
+        assert store.current is None
+
+        first = asyncio.run(store.refresh())
+        assert store.current is first
+
+        second = asyncio.run(store.refresh())
+        assert store.current is second
+        assert second.version == first.version + 1
+
+    @patch("app.utils.memory.memory_budget.limit_bytes", 1)
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_refresh_spills_over_budget(self, mock_get_posts):
+        """Test that a refresh that does not fit the budget analyzes on disk"""
+        mock_get_posts.return_value = POSTS
+
+        with patch(
+            "app.services.snapshot_service.SpilledAnomalyTracker",
+            wraps=SpilledAnomalyTracker,
+        ) as mock_spilled:
+            snapshot = asyncio.run(SnapshotStore().refresh())
+
+        assert mock_spilled.called
+        assert snapshot.anomaly_summary["total_anomalies"] == 1
+        assert memory_budget.reserved == 0
+
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_refresh_failure_keeps_previous_snapshot(self, mock_get_posts):
+        """Test that a failed scheduled refresh does not drop the served snapshot"""
+        store = SnapshotStore()
+        snapshot = build_snapshot(POSTS, version=1)
+        store.publish(snapshot)
+        mock_get_posts.side_effect = Exception("API Error")
+
+        async def run_once():
+            store.start(interval=60)
+            await asyncio.sleep(0.05)
+            await store.stop()
+
+        asyncio.run(run_once())
+
+        assert store.current is snapshot
+
+
+class TestSnapshotRoutes:
+    def setup_method(self):
+        snapshot_store.publish(build_snapshot(POSTS, version=3))
+
+    def teardown_method(self):
+        snapshot_store.clear()
+
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_summary_served_from_snapshot(self, mock_get_posts):
+        """Test that the summary route reads the snapshot without fetching"""
+        response = client.get("/api/summary/?top_users=1&top_words=2")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["snapshotVersion"] == 3
+        assert data["generatedAt"] is not None
+        assert data["totalPosts"] == 3
+        assert len(data["topUsers"]) == 1
+        assert len(data["mostFrequentWords"]) == 2
+        mock_get_posts.assert_not_called()
+
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_anomalies_served_from_snapshot(self, mock_get_posts):
+        """Test that the anomalies route reads the snapshot and its user index"""
+        response = client.get("/api/anomalies/?user_id=2")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["snapshotVersion"] == 3
+        assert data["total"] == 0
+        assert data["summary"]["total_anomalies"] == 0
+        mock_get_posts.assert_not_called()
+
+    @patch(STREAM_POSTS)
+    def test_limited_analysis_bypasses_snapshot(self, mock_stream_posts):
+        """Test that analyzing a subset still computes on demand"""
+        mock_stream_posts.side_effect = stream_of(POSTS)
+
+        response = client.get("/api/anomalies/?limit=1")
+
+        assert response.status_code == 200
+        assert response.json()["snapshotVersion"] is None
+        mock_stream_posts.assert_called_once_with(limit=1)
+
+    def test_posts_by_user_served_from_snapshot(self):
+        """Test that per-user posts come from the snapshot index"""
+        response = client.get("/api/posts/1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["snapshotVersion"] == 3
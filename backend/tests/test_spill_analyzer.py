@@ -0,0 +1,225 @@
+import asyncio
+import random
+import threading
+
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.main import app
+from app.models import Post
+from app.services.anomaly_detector import AnomalyTracker, anomaly_detector
+from app.services.spill_analyzer import (
+    SpilledAnomalyTracker,
+    SpilledTextStats,
+    analyze_batches,
+)
+from app.services.text_analyzer import TextStats, text_analyzer
+from app.utils.memory import MemoryBudget, estimate_analysis_bytes, memory_budget
+from benchmarks.fake_upstream import generate_posts
+from tests.fake_stream import STREAM_POSTS, stream_of
+
+client = TestClient(app)
+
+VOCABULARY = ["alpha", "beta", "gamma", "delta", "omega", "sale", "offer", "deal"]
+
+
+def make_posts(count: int = 400, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    posts = [Post(**data) for data in generate_posts(count, users=13)]
+    for post in posts[::3]:
+        post.title = " ".join(rng.choices(VOCABULARY, k=rng.randint(1, 6)))
+    return posts
+
+
+def batches_of(posts: list, size: int = 25) -> list:
+    return [posts[start : start + size] for start in range(0, len(posts), size)]
+
+
+def user_rows(users: list) -> list:
+    return [
+        (u.userId, u.uniqueWordCount, u.totalPosts, sorted(u.uniqueWords))
+        for u in users
+    ]
+
+
+class TestBatchAccumulators:
+    def test_text_stats_match_in_memory(self):
+        """Test that batch-by-batch aggregation equals whole-list analysis"""
+        posts = make_posts()
+        stats = TextStats(text_analyzer)
+        for batch in batches_of(posts):
+            stats.add(batch)
+
+        assert stats.word_frequencies() == text_analyzer.calculate_word_frequency(posts)
+        assert user_rows(stats.top_users(5)) == user_rows(
+            text_analyzer.get_top_users_by_unique_words(posts, 5)
+        )
+        assert (stats.total_posts, stats.total_users) == (len(posts), 13)
+
+    def test_anomaly_tracker_matches_in_memory(self):
+        """Test that batch-by-batch detection finds the same anomalies in order"""
+        posts = make_posts()
+        for post in posts[:12]:
+            post.title = "Same title again and again"
+        tracker = AnomalyTracker(anomaly_detector)
+        for batch in batches_of(posts):
+            tracker.add(batch)
+
+        assert tracker.anomalies() == anomaly_detector.detect_anomalies(posts)
+
+
+class TestSpilledAccumulators:
+    def test_text_stats_match_in_memory(self, tmp_path):
+        """Test that spilled word and user aggregates equal the in-memory ones"""
+        posts = make_posts()
+        partial = TextStats(text_analyzer)
+        partial.add(posts[:150])
+        spilled = SpilledTextStats(text_analyzer, str(tmp_path), partitions=4)
+        spilled.absorb(partial)
+        for batch in batches_of(posts[150:]):
+            spilled.add(batch)
+
+        assert (
+            spilled.word_frequencies(20)
+            == (text_analyzer.calculate_word_frequency(posts)[:20])
+        )
+        assert user_rows(spilled.top_users(5)) == user_rows(
+            text_analyzer.get_top_users_by_unique_words(posts, 5)
+        )
+        assert (spilled.total_posts, spilled.total_users) == (len(posts), 13)
+        # Spill files are removed once the analysis is closed
+        spilled.close()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_anomalies_match_in_memory(self):
+        """Test that partitioned detection finds the same anomalies in order"""
+        posts = make_posts()
+        for post in posts[100:112]:
+            post.title = "Same title again and again"
+        partial = AnomalyTracker(anomaly_detector)
+        partial.add(posts[:105])
+        spilled = SpilledAnomalyTracker(anomaly_detector, partitions=4)
+        spilled.absorb(partial)
+        spilled.add(posts[105:])
+
+        try:
+            assert spilled.anomalies() == anomaly_detector.detect_anomalies(posts)
+        finally:
+            spilled.close()
+
+
+class TestAnalyzeBatches:
+    async def stream(self, posts: list):
+        for batch in batches_of(posts):
+            yield batch
+
+    def analyze(self, posts: list, spill_dir: str):
+        return asyncio.run(
+            analyze_batches(
+                self.stream(posts),
+                TextStats(text_analyzer),
+                lambda: SpilledTextStats(text_analyzer, spill_dir, partitions=4),
+                lambda stats: (type(stats).__name__, stats.word_frequencies()),
+            )
+        )
+
+    def test_within_budget_stays_in_memory(self, tmp_path):
+        """Test that a fitting analysis neither spills nor leaks reservations"""
+        posts = make_posts(100)
+
+        name, words = self.analyze(posts, str(tmp_path))
+
+        assert name == "TextStats"
+        assert words == text_analyzer.calculate_word_frequency(posts)
+        assert memory_budget.reserved == 0
+
+    def test_spills_once_budget_is_exhausted(self, tmp_path):
+        """Test that the analysis moves to disk midway with the same result"""
+        posts = make_posts(100)
+        limit = estimate_analysis_bytes(posts[:60])
+
+        with patch("app.utils.memory.memory_budget.limit_bytes", limit):
+            name, words = self.analyze(posts, str(tmp_path))
+
+        assert name == "SpilledTextStats"
+        assert words == text_analyzer.calculate_word_frequency(posts)
+        assert memory_budget.reserved == 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_batches_are_analyzed_off_the_event_loop(self, tmp_path):
+        """Test that in-memory accumulation and finishing run in a worker thread"""
+        threads = []
+
+        class RecordingStats(TextStats):
+            def add(self, posts):
+                threads.append(threading.get_ident())
+                super().add(posts)
+
+        def finish(stats):
+            threads.append(threading.get_ident())
+            return stats.total_posts
+
+        async def analyze():
+            return await analyze_batches(
+                self.stream(make_posts(20)),
+                RecordingStats(text_analyzer),
+                lambda: SpilledTextStats(text_analyzer, str(tmp_path)),
+                finish,
+            )
+
+        assert asyncio.run(analyze()) == 20
+        assert threads and threading.get_ident() not in threads
+
+
+class TestMemoryBudget:
+    def test_reservations_are_bounded(self):
+        """Test that concurrent reservations share one budget"""
+        budget = MemoryBudget(limit_bytes=100)
+
+        with budget.reserve(60) as first:
+            with budget.reserve(60) as second:
+                assert first and not second
+            assert budget.reserved == 60
+        assert budget.reserved == 0
+
+    def test_zero_disables_budget(self):
+        """Test that a zero budget grants every reservation"""
+        with MemoryBudget(limit_bytes=0).reserve(10**12) as granted:
+            assert granted
+
+    def test_estimate_grows_with_text(self):
+        """Test that larger posts are estimated larger"""
+        small = Post(userId=1, id=1, title="Hi", body="")
+        large = Post(userId=1, id=1, title="Hi " * 100, body="x" * 1000)
+
+        assert estimate_analysis_bytes([large]) > estimate_analysis_bytes([small])
+
+
+class TestOverBudgetRoutes:
+    @patch("app.utils.memory.memory_budget.limit_bytes", 1)
+    @patch(STREAM_POSTS)
+    def test_summary_spills_over_budget(self, mock_stream_posts):
+        """Test that an over-budget summary is answered from spill files"""
+        posts = make_posts(60)
+        mock_stream_posts.side_effect = stream_of(posts, batch_size=20)
+
+        with patch(
+            "app.api.routes.summary.SpilledTextStats", wraps=SpilledTextStats
+        ) as mock_spilled:
+            response = client.get("/api/summary/?top_words=5")
+
+        assert response.status_code == 200
+        assert mock_spilled.called
+        assert response.json()["totalPosts"] == 60
+
+    @patch("app.utils.memory.memory_budget.limit_bytes", 1)
+    @patch(STREAM_POSTS)
+    def test_anomalies_spill_over_budget(self, mock_stream_posts):
+        """Test that over-budget anomaly detection still answers in full"""
+        posts = make_posts(60)
+        mock_stream_posts.side_effect = stream_of(posts, batch_size=20)
+
+        response = client.get("/api/anomalies/")
+
+        assert response.status_code == 200
+        assert response.json()["total"] == len(anomaly_detector.detect_anomalies(posts))
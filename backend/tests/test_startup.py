@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.snapshot_service import snapshot_store
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Self time of the app's own modules on `import app.main` (measured ~45ms)
+APP_IMPORT_BUDGET_MS = 250
+
+# Only needed once a feature is configured or the first request is sent
+DEFERRED_MODULES = ["httpx", "sqlite3", "pyarrow", "app.services.shared_snapshot"]
+
+
+def import_profile() -> Dict[str, Tuple[int, int]]:
+    """Return {module: (self_us, cumulative_us)} for a fresh `import app.main`"""
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if k not in ("SQLITE_PATH", "SHARED_SNAPSHOT_DIR")
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+class TestColdStart:
+    def test_optional_modules_are_not_imported(self):
+        """Test that heavy optional modules stay off the import path"""
+        profile = import_profile()
+
+        assert "app.main" in profile
+        assert [name for name in DEFERRED_MODULES if name in profile] == []
+
+    def test_app_import_time_budget(self):
+        """Test that the app's own modules import within budget"""
+        profile = import_profile()
+
+        app_self_ms = (
+            sum(
+                self_us
+                for name, (self_us, _) in profile.items()
+                if name == "app" or name.startswith("app.")
+            )
+            / 1000
+        )
+
+        assert app_self_ms < APP_IMPORT_BUDGET_MS
+
+
+class TestReadiness:
+    def test_not_ready_before_startup(self):
+        """Test that /ready fails while /health already passes"""
+        client = TestClient(app)
+
+        with patch("app.main.jsonplaceholder_service.client._client", None):
+            ready = client.get("/ready")
+
+        assert client.get("/health").status_code == 200
+        assert ready.status_code == 503
+        assert ready.json()["checks"]["upstreamClient"] is False
+
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_ready_after_warm_up_and_first_snapshot(self, mock_get_posts):
+        """Test that /ready turns green once the lifespan warm-up finished"""
+        mock_get_posts.return_value = [
+            Post(userId=1, id=1, title="A perfectly normal title", body="Body")
+        ]
+
+        try:
+            with TestClient(app) as client:
+                deadline = time.monotonic() + 5
+                response = client.get("/ready")
+                while response.status_code != 200 and time.monotonic() < deadline:
+                    time.sleep(0.02)
+                    response = client.get("/ready")
+        finally:
+            snapshot_store.clear()
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "status": "ready",
+            "checks": {"upstreamClient": True, "snapshot": True},
+        }
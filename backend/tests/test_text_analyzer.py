@@ -85,3 +85,14 @@ class TestTextAnalyzer:
 
         top_users = self.analyzer.get_top_users_by_unique_words([], top_n=3)
         assert top_users == []
+
+    def test_unique_words_skipped_when_not_requested(self):
+        """Test that counts are kept while the word lists are not built"""
+        posts = [Post(userId=1, id=1, title="alpha beta gamma", body="Body")]
+
+        top_users = self.analyzer.get_top_users_by_unique_words(
+            posts, top_n=1, include_words=False
+        )
+
+        assert top_users[0].uniqueWordCount == 3
+        assert top_users[0].uniqueWords is None
@@ -0,0 +1,184 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.snapshot_service import build_snapshot, snapshot_store
+from app.services.text_analyzer import TextStats
+from app.services.text_profiles import (
+    NormalizationProfile,
+    fold_unicode,
+    light_stem,
+    load_profiles,
+    parse_profiles,
+)
+from tests.fake_stream import STREAM_POSTS, stream_of
+
+client = TestClient(app)
+
+POSTS = [
+    Post(userId=1, id=1, title="The Café offers deals", body="Body"),
+    Post(userId=1, id=2, title="These cafe offers are great", body="Body"),
+    Post(userId=2, id=3, title="Great deals about nothing", body="Body"),
+]
+
+
+class TestNormalizationProfile:
+    def test_default_rules(self):
+        """Test the original rules: lowercase, punctuation, stop words, length"""
+        profile = NormalizationProfile("default")
+
+        assert profile.extract_words("The Café, at 10 offers!") == ["café", "offers"]
+
+    def test_folding_and_stemming(self):
+        """Test that folded and stemmed tokens merge variants of a word"""
+        profile = NormalizationProfile("p", ["these"], fold=True, stem=True)
+
+        assert profile.extract_words("THESE Cafés running") == ["cafe", "run"]
+        assert fold_unicode("Ærøskøbing Straße") == "ærøskøbing strasse"
+        assert [light_stem(w) for w in ("stories", "stopped", "class")] == [
+            "story",
+            "stop",
+            "class",
+        ]
+
+    @patch("app.services.text_profiles.TOKEN_CACHE_SIZE", 2)
+    def test_token_cache_is_bounded(self):
+        """Test that the per-profile token cache never grows past its size"""
+        profile = NormalizationProfile("p")
+
+        words = profile.extract_words("alpha beta gamma delta alpha")
+
+        assert words == ["alpha", "beta", "gamma", "delta", "alpha"]
+        assert len(profile._tokens) <= 2
+
+
+class TestProfileLoading:
+    def test_extends_and_stop_word_files(self, tmp_path):
+        """Test inheritance, extra stop words and stop word files"""
+        (tmp_path / "ads.txt").write_text("# ad words\nbuy\nsale\n")
+
+        profiles = parse_profiles(
+            {
+                "ads": {
+                    "extends": "english",
+                    "stop_words": ["offer"],
+                    "stop_words_file": "ads.txt",
+                    "min_length": 4,
+                }
+            },
+            str(tmp_path),
+        )
+
+        ads = profiles["ads"]
+        assert {"buy", "sale", "offer", "about"} <= ads.stop_words
+        assert (ads.min_length, ads.fold, ads.stem) == (4, True, False)
+        assert "default" in profiles
+
+    @pytest.mark.parametrize(
+        "spec",
+        [{"x": {"extends": "missing"}}, {"x": []}, {"true": {}}],
+    )
+    def test_invalid_profiles(self, spec):
+        """Test unknown parents, malformed entries and the reserved name"""
+        with pytest.raises(ValueError):
+            parse_profiles(spec)
+
+    def test_bad_file_falls_back_to_builtins(self, tmp_path):
+        """Test that a broken profiles file does not stop the service"""
+        path = tmp_path / "profiles.json"
+        path.write_text("{not json")
+
+        assert set(load_profiles(str(path))) == {
+            "default",
+            "english",
+            "english-stemmed",
+        }
+
+    def test_load_file(self, tmp_path):
+        """Test loading profiles from a JSON file"""
+        path = tmp_path / "profiles.json"
+        path.write_text(json.dumps({"short": {"min_length": 1}}))
+
+        assert load_profiles(str(path))["short"].extract_words("a b") == ["a", "b"]
+
+
+class TestSummaryProfiles:
+    def teardown_method(self):
+        snapshot_store.clear()
+
+    def test_profile_on_snapshot(self):
+        """Test that a non-default profile is analyzed from the snapshot"""
+        snapshot_store.publish(build_snapshot(POSTS, version=1))
+
+        default = client.get("/api/summary/").json()
+        english = client.get("/api/summary/?text_profile=english").json()
+
+        words = {w["word"]: w["count"] for w in english["mostFrequentWords"]}
+        assert words["cafe"] == 2
+        assert "these" not in words
+        assert english["snapshotVersion"] == 1
+        assert "these" in {w["word"] for w in default["mostFrequentWords"]}
+
+    def test_profile_analyzed_once_per_snapshot(self):
+        """Test that requests for one profile slice shared statistics"""
+        snapshot_store.publish(build_snapshot(POSTS, version=1))
+        refreshed = build_snapshot(POSTS, version=2)
+
+        with patch.object(
+            TextStats, "add", autospec=True, side_effect=TextStats.add
+        ) as mock_add:
+            first = client.get("/api/summary/?text_profile=english&top_words=1").json()
+            second = client.get("/api/summary/?text_profile=english&top_users=1").json()
+            assert mock_add.call_count == 1
+
+            snapshot_store.publish(refreshed)
+            client.get("/api/summary/?text_profile=english")
+            assert mock_add.call_count == 2
+
+        assert len(first["mostFrequentWords"]) == 1
+        assert len(second["topUsers"]) == 1
+
+    @patch(STREAM_POSTS)
+    def test_profile_on_demand(self, mock_stream_posts):
+        """Test that on-demand summaries use the selected profile"""
+        mock_stream_posts.side_effect = stream_of(POSTS)
+
+        response = client.get("/api/summary/?text_profile=english-stemmed")
+
+        words = {w["word"]: w["count"] for w in response.json()["mostFrequentWords"]}
+        assert words["offer"] == 2
+        assert words["deal"] == 2
+
+    def test_word_frequencies_are_capped(self):
+        """Test that profile summaries return at most the default 50 words"""
+        posts = [
+            Post(userId=1, id=i, title=f"word{i} filler", body="Body")
+            for i in range(80)
+        ]
+        snapshot_store.publish(build_snapshot(posts, version=1))
+
+        english = client.get("/api/summary/?text_profile=english&top_words=500")
+        default = client.get("/api/summary/?top_words=500")
+
+        assert len(english.json()["mostFrequentWords"]) == 50
+        assert len(default.json()["mostFrequentWords"]) == 50
+
+    def test_profile_flag_is_not_a_text_profile(self):
+        """Test that the request profiler's ?profile= is ignored by the summary"""
+        snapshot_store.publish(build_snapshot(POSTS, version=1))
+
+        response = client.get("/api/summary/?profile=english")
+
+        assert response.status_code == 200
+        assert "these" in {w["word"] for w in response.json()["mostFrequentWords"]}
+
+    def test_unknown_profile(self):
+        """Test that unknown profiles are rejected with the available ones"""
+        response = client.get("/api/summary/?text_profile=klingon")
+
+        assert response.status_code == 400
+        assert "english" in response.json()["detail"]
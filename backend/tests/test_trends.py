@@ -0,0 +1,150 @@
+import threading
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Post
+from app.services.snapshot_service import build_snapshot
+from app.services.trends import TrendTracker
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def post(post_id: int, user_id: int, title: str) -> Post:
+    return Post(userId=user_id, id=post_id, title=title, body="body")
+
+
+BASELINE = [
+    post(1, 1, "Quarterly product launch recap"),
+    post(2, 2, "Seasonal discount campaign notes"),
+    post(3, 2, "Product roadmap for next season"),
+]
+
+
+class TestTrendTracker:
+    def test_only_new_or_changed_posts_are_ingested(self):
+        """Test ingestion timestamps and that re-seen posts are skipped"""
+        clock = FakeClock()
+        tracker = TrendTracker(clock=clock)
+
+        assert tracker.ingest(BASELINE) == 3
+        clock.now += 120
+        edited = post(3, 2, "Edited roadmap")
+        assert tracker.ingest([*BASELINE[:2], edited]) == 1
+
+        assert tracker.ingested_at(1) == 1_000_000.0
+        assert tracker.ingested_at(3) == 1_000_120.0
+        assert tracker.ingested_at(99) is None
+
+    def test_window_covers_only_its_buckets(self):
+        """Test that window aggregates exclude older buckets"""
+        clock = FakeClock()
+        tracker = TrendTracker(bucket_seconds=60, clock=clock)
+        tracker.ingest(BASELINE)
+        clock.now += 600
+        tracker.ingest([post(4, 3, "Flash sale today")])
+
+        assert tracker.window(300).total_posts == 1
+        assert tracker.window(900).total_posts == 4
+        assert tracker.window(300).words["flash"] == 1
+
+    def test_old_buckets_are_evicted(self):
+        """Test that retention bounds the number of buckets kept"""
+        clock = FakeClock()
+        tracker = TrendTracker(bucket_seconds=60, retention_seconds=300, clock=clock)
+
+        for post_id in range(20):
+            tracker.ingest([post(post_id, 1, f"Post number {post_id}")])
+            clock.now += 60
+
+        assert len(tracker._buckets) == 5
+
+    def test_ingestion_state_is_bounded(self):
+        """Test that expired posts keep only a hash, and only while present"""
+        clock = FakeClock()
+        tracker = TrendTracker(bucket_seconds=60, retention_seconds=300, clock=clock)
+        tracker.ingest(BASELINE)
+
+        clock.now += 600
+        # Unchanged posts are not re-recorded once their bucket has expired
+        assert tracker.ingest(BASELINE[:2]) == 0
+        assert tracker._ingested == {}
+        assert set(tracker._settled) == {1, 2}
+        assert tracker.ingested_at(1) is None
+
+        # Posts dropped from the dataset are forgotten, and new if they return
+        assert tracker.ingest(BASELINE[:1]) == 0
+        assert set(tracker._settled) == {1}
+        assert tracker.ingest(BASELINE) == 2
+
+    def test_snapshots_are_ingested_off_the_calling_thread(self):
+        """Test that the snapshot listener hands ingestion to its worker"""
+        tracker = TrendTracker()
+        threads = []
+        ingest = tracker.ingest
+
+        def recording_ingest(posts):
+            threads.append(threading.get_ident())
+            return ingest(posts)
+
+        tracker.ingest = recording_ingest
+        tracker.on_snapshot(None, build_snapshot(BASELINE, version=1))
+        tracker.wait(timeout=5)
+
+        assert threads and threads[0] != threading.get_ident()
+        assert tracker.ingested_at(1) is not None
+
+    def test_rising_words_and_spiking_users(self):
+        """Test the comparison between the last window and the one before"""
+        clock = FakeClock()
+        tracker = TrendTracker(bucket_seconds=60, clock=clock)
+        tracker.ingest(BASELINE)
+        clock.now += 3600
+        tracker.ingest(
+            [post(10 + i, 2, "Ad") for i in range(3)]
+            + [
+                post(20, 1, "Product launch follow up"),
+                post(21, 1, "Launch party highlights"),
+            ]
+        )
+
+        current, previous, rising, spiking = tracker.trends(3600)
+
+        assert (current.total_posts, previous.total_posts) == (5, 3)
+        launch = next(trend for trend in rising if trend.word == "launch")
+        assert (launch.count, launch.previousCount) == (2, 1)
+        assert rising[0].growth >= launch.growth
+        assert [trend.userId for trend in spiking] == [2]
+        assert spiking[0].anomalies == 6
+        assert spiking[0].previousAnomalyRate == 0.0
+
+
+class TestTrendsEndpoint:
+    @patch("app.services.jsonplaceholder_service.jsonplaceholder_service.get_posts")
+    def test_get_trends(self, mock_get_posts):
+        """Test the endpoint ingests live posts without a snapshot"""
+        mock_get_posts.return_value = BASELINE
+
+        with patch("app.api.routes.trends.trend_tracker", TrendTracker()):
+            response = client.get("/api/trends/?window_minutes=30&top=5")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["postsInWindow"] == 3
+        assert data["postsInPreviousWindow"] == 0
+        assert len(data["risingWords"]) == 5
+
+    def test_window_beyond_retention_is_rejected(self):
+        """Test that windows longer than half the retention return 400"""
+        response = client.get("/api/trends/?window_minutes=100000")
+
+        assert response.status_code == 400
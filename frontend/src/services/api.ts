@@ -51,6 +51,31 @@ export const ApiService = {
     }
   },
 
+  async getPostsByUsers(userIds: number[]): Promise<PostsResponse> {
+    try {
+      const params = new URLSearchParams()
+      params.append('user_ids', userIds.join(','))
+
+      const url = `${API_BASE_URL}/api/posts/?${params.toString()}`
+      const response = await fetch(url)
+
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`)
+      }
+
+      const data: PostsResponse = await response.json()
+      return data
+    } catch (error) {
+      if (error instanceof TypeError && error.message.includes('fetch')) {
+        throw new Error('Network error: Unable to connect to the server')
+      }
+
+      throw error instanceof Error
+        ? error
+        : new Error('An unexpected error occurred')
+    }
+  },
+
   async getAnomalies(
     limit?: number,
     userId?: number